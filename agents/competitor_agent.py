@@ -1,15 +1,31 @@
 """Обновленный агент для анализа конкурентов с улучшенным скрапингом"""
 
 import asyncio
-from typing import Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
+from agents.reanalysis import init_worker, prepare_content
 from scrapers.enhanced_website_scraper import EnhancedWebsiteScraper
+from scrapers.http_client import HttpClient
 from scrapers.social_scraper import SocialScraper
+from scrapers.social_handles import SocialHandleResolver
 from analyzers.content_analyzer import ContentAnalyzer
+from analyzers.text_preprocessor import TextPreprocessor
+from analyzers.similarity_index import MinHashLSHIndex
+from analyzers.change_detector import ChangeDetector, compact
 from analyzers.market_analyzer import MarketAnalyzer
 from reports.report_generator import ReportGenerator
+from reports.dashboard import DashboardGenerator
+from storage.page_store import PageStore
+from storage.snapshots import SnapshotStore, company_slug
+from storage.metrics_store import MetricsStore
+from storage.social_history import SocialHistoryStore
+from storage.serialization import ResultSerializer
+from storage.parquet_export import ParquetExporter
+from storage.run_store import RunStore
 
 
 class CompetitorAgent:
@@ -17,21 +33,102 @@ class CompetitorAgent:
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.website_scraper = EnhancedWebsiteScraper(config.get('scraping', {}))
-        self.social_scraper = SocialScraper(config.get('social', {}))
+        # Хранилища, индекс сходства и рыночная таблица работают в одном отдельном потоке:
+        # обращения к ним выполняются по очереди и не блокируют event loop, а соединения
+        # SQLite создаются в этом же потоке (check_same_thread)
+        self._state_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='agent-state')
+        # Общий HTTP-клиент: лимиты по хостам действуют для всех скраперов сразу
+        self.http = HttpClient(config.get('scraping', {}))
+        self.page_store = None
+        if config.get('history', {}).get('store_pages', True):
+            self.page_store = PageStore(config.get('history', {}))
+        self.website_scraper = EnhancedWebsiteScraper(
+            config.get('scraping', {}), self.http, self.page_store
+        )
+        self.social_history = SocialHistoryStore(config.get('database', {}))
+        self.social_scraper = SocialScraper(
+            config.get('social', {}), self.social_history, self.http
+        )
+        self.handle_resolver, self.metrics_store, self.run_store = self._state_thread.submit(
+            self._open_databases, config.get('database', {})
+        ).result()
+        self.similarity_index = MinHashLSHIndex.load(config.get('analysis', {}))
+        self.text_preprocessor = TextPreprocessor(config.get('analysis', {}), self.similarity_index)
         self.content_analyzer = ContentAnalyzer(config.get('analysis', {}))
-        self.market_analyzer = MarketAnalyzer(config.get('market', {}))
+        self.market_analyzer = MarketAnalyzer(
+            config.get('market', {}), self.similarity_index, self.metrics_store
+        )
+        # Рыночная таблица заполняется сохраненными результатами при первом анализе
+        self._market_seeded = False
+        self._closed = False
         self.report_generator = ReportGenerator(config.get('reports', {}))
+        self.snapshot_store = SnapshotStore(config.get('history', {}))
+        self.change_detector = ChangeDetector(config.get('history', {}))
+        self.result_serializer = ResultSerializer(config.get('results', {}))
+        self.parquet_exporter = ParquetExporter(config.get('export', {}))
+        self.dashboard = None
+        if config.get('reports', {}).get('dashboard', True):
+            self.dashboard = DashboardGenerator(config.get('reports', {}), self.result_serializer)
+    
+    def _open_databases(self, config: Dict[str, Any]) -> Tuple[SocialHandleResolver, MetricsStore, RunStore]:
+        """Хранилища на SQLite (вызывается в потоке хранилищ)"""
+        return SocialHandleResolver(config), MetricsStore(config), RunStore(config)
+    
+    async def _in_state_thread(self, func: Callable, *args) -> Any:
+        """Вызов в потоке хранилищ"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._state_thread, partial(func, *args))
     
     async def analyze_competitor(self, company_name: str, output_dir: str) -> Dict[str, Any]:
         """Полный анализ конкурента с улучшенным веб-скрапингом"""
         
+        return (await self.analyze_competitors([company_name], output_dir))[company_name]
+    
+    async def analyze_competitors(self, companies: List[str],
+                                  output_dir: str) -> Dict[str, Dict[str, Any]]:
+        """Анализ нескольких конкурентов
+        
+        Сначала собираются данные всех компаний, затем локальный анализ контента выполняется
+        одним проходом по корпусу всех их страниц и постов (IDF ключевых слов считается
+        по всему набору, а не по одной компании), после чего строятся рыночный анализ
+        и отчеты.
+        """
+        
+        collected = {}
+        prepared = {}
+        for company_name in companies:
+            collected[company_name], prepared[company_name] = await self._collect(company_name)
+        await self._in_state_thread(self._save_similarity_index)
+        
+        # 4. ИИ-анализ контента
+        print("🤖 Анализируем собранный контент с помощью ИИ...")
+        analyses = await self.content_analyzer.analyze_batch(
+            {
+                company_name: (results['website_data'], results['social_data'])
+                for company_name, results in collected.items()
+            },
+            prepared
+        )
+        for company_name, results in collected.items():
+            results['content_analysis'] = analyses[company_name]
+        
+        # Рыночное сравнение видит весь рынок до расчета позиций отдельных компаний
+        await self._in_state_thread(self._update_market, collected)
+        for company_name, results in collected.items():
+            await self._complete(company_name, results, output_dir)
+        
+        return collected
+    
+    async def _collect(self, company_name: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Сбор данных компании, очистка текста и поиск изменений с прошлого запуска"""
+        
         results = {
             'company': company_name,
             'website_data': {},
             'social_data': {},
             'content_analysis': {},
             'market_analysis': {},
+            'changes': {},
             'timestamp': datetime.now()
         }
         
@@ -42,28 +139,202 @@ class CompetitorAgent:
         
         # 2. Сбор данных из социальных сетей
         print(f"📱 Анализируем социальные сети {company_name}...")
-        social_data = await self.social_scraper.scrape_social_profiles(company_name)
+        social_links = website_data.get('main_page', {}).get('social_links', [])
+        handles = await self._in_state_thread(
+            self.handle_resolver.resolve, company_name, social_links
+        )
+        social_data = await self.social_scraper.scrape_social_profiles(company_name, handles)
         results['social_data'] = social_data
         
-        # 3. ИИ-анализ контента
-        print("🤖 Анализируем собранный контент с помощью ИИ...")
-        content_analysis = await self.content_analyzer.analyze(
-            website_data, social_data
+        # 3. Очистка текста страниц от шаблонных блоков
+        prepared_content = await self._in_state_thread(
+            self.text_preprocessor.prepare, website_data, company_name
+        )
+        
+        # Изменения с прошлого запуска
+        snapshot = {
+            'company': company_name,
+            'timestamp': results['timestamp'],
+            'website_data': website_data,
+            'social_data': social_data
+        }
+        results['changes'] = await self._in_state_thread(
+            self._detect_changes, company_name, snapshot
         )
-        results['content_analysis'] = content_analysis
         
-        # 4. Рыночный анализ
+        return results, prepared_content
+    
+    def _detect_changes(self, company_name: str, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Сравнение с прошлым снимком и сохранение нового (в потоке хранилищ)"""
+        
+        # В снимке только структурированные сущности и хеши текста страниц
+        snapshot = compact(snapshot)
+        changes = self.change_detector.detect(self.snapshot_store.latest(company_name), snapshot)
+        self.snapshot_store.save(company_name, snapshot)
+        return changes
+    
+    def _load_universe(self) -> Dict[str, Dict[str, Any]]:
+        """Последние сохраненные результаты всех компаний по slug"""
+        
+        universe = {}
+        for slug in self.result_serializer.companies():
+            results = self.result_serializer.latest(slug)
+            if results is not None:
+                universe[company_slug(results['company'])] = results
+        return universe
+    
+    def _update_market(self, companies: Dict[str, Dict[str, Any]],
+                       universe: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Обновление рыночной таблицы компаниями запуска (в потоке хранилищ)
+        
+        При первом вызове таблица заполняется сохраненными результатами всех компаний:
+        без этого сравнение с рынком в новом процессе видело бы только компании,
+        проанализированные в нем.
+        """
+        
+        market_frame = self.market_analyzer.market_frame
+        if not self._market_seeded:
+            if universe is None:
+                universe = self._load_universe()
+            for results in universe.values():
+                market_frame.update(results['company'], results)
+            self._market_seeded = True
+        for company_name, results in companies.items():
+            market_frame.update(company_name, results)
+    
+    def _save_similarity_index(self):
+        """Сохранение индекса сходства, если он менялся (в потоке хранилищ)"""
+        
+        if self.similarity_index.path and self.similarity_index.changed:
+            self.similarity_index.save()
+    
+    def _save_results(self, company_name: str, results: Dict[str, Any]):
+        """Сохранение результатов запуска во все хранилища (в потоке хранилищ)"""
+        
+        self.result_serializer.save(company_name, results)
+        self.run_store.save_run(results)
+        self.parquet_exporter.export(results)
+    
+    async def _complete(self, company_name: str, results: Dict[str, Any], output_dir: str):
+        """Рыночный анализ, сохранение результатов и отчеты по компании"""
+        
+        # 5. Рыночный анализ
         print("📊 Проводим рыночный анализ...")
-        market_analysis = await self.market_analyzer.analyze(
-            company_name, results
+        await self._in_state_thread(self.metrics_store.record, company_name, results)
+        results['market_analysis'] = await self._in_state_thread(
+            self.market_analyzer.analyze, company_name, results
         )
-        results['market_analysis'] = market_analysis
+        await self._in_state_thread(self._save_results, company_name, results)
         
-        # 5. Генерация расширенного отчета
+        # 6. Генерация расширенного отчета
         print("📋 Генерируем детальный отчет...")
         await self.report_generator.generate_report(results, output_dir)
+        if self.dashboard is not None:
+            await asyncio.to_thread(self.dashboard.build, output_dir)
+    
+    async def reanalyze(self, companies: List[str], output_dir: str,
+                        workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Повторный анализ последних сохраненных запусков без скрапинга
+        
+        companies - названия компаний (пустой список - все сохраненные). Текст страниц
+        готовится в пуле процессов по компании на задачу, локальный анализ контента - одним
+        проходом по корпусу пересчитываемых компаний; рыночное сравнение строится по всем
+        сохраненным компаниям, даже если пересчитываются не все. Изменения и временные ряды
+        метрик остаются от исходного запуска: собранные данные не меняются.
+        """
         
-        return results
+        universe = await self._in_state_thread(self._load_universe)
+        
+        stored = {}
+        for slug in map(company_slug, companies) if companies else universe:
+            if slug not in universe:
+                print(f"⚠️ Нет сохраненных данных для {slug}")
+                continue
+            stored[universe[slug]['company']] = universe[slug]
+        
+        if not stored:
+            return {}
+        
+        print(f"🧹 Готовим текст страниц {len(stored)} компаний...")
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(self.config,)
+        ) as executor:
+            outcomes = await asyncio.gather(*[
+                loop.run_in_executor(
+                    executor, prepare_content, company_name, results.get('website_data', {})
+                )
+                for company_name, results in stored.items()
+            ], return_exceptions=True)
+        
+        prepared = {}
+        for (company_name, results), outcome in zip(stored.items(), outcomes):
+            if isinstance(outcome, Exception):
+                print(f"⚠️ Не удалось подготовить текст {company_name}: {outcome}")
+                continue
+            results['website_data'], prepared_content = outcome
+            if prepared_content is None:
+                print(f"⚠️ Нет сохраненного HTML страниц {company_name}: текст остается прежним")
+                continue
+            prepared[company_name] = prepared_content
+        
+        print(f"🤖 Анализируем контент {len(stored)} компаний...")
+        analyses = await self.content_analyzer.analyze_batch(
+            {
+                company_name: (results.get('website_data', {}), results.get('social_data', {}))
+                for company_name, results in stored.items()
+            },
+            prepared
+        )
+        for company_name, results in stored.items():
+            previous = results.get('content_analysis') or {}
+            if company_name not in prepared:
+                # Без подготовленного текста бюджет и ИИ-анализ остаются от исходного запуска
+                for field in ('content_budget', 'ai_insights'):
+                    if field in previous:
+                        analyses[company_name][field] = previous[field]
+            results['content_analysis'] = analyses[company_name]
+        
+        # Рыночное сравнение видит весь рынок до расчета позиций отдельных компаний
+        print("📊 Проводим рыночный анализ...")
+        await self._in_state_thread(self._update_market, stored, universe)
+        for company_name, results in stored.items():
+            results['market_analysis'] = await self._in_state_thread(
+                self.market_analyzer.analyze, company_name, results
+            )
+            await self._in_state_thread(self._save_results, company_name, results)
+        
+        print("📋 Генерируем отчеты...")
+        await asyncio.gather(*[
+            self.report_generator.generate_report(results, output_dir)
+            for results in stored.values()
+        ])
+        if self.dashboard is not None:
+            await asyncio.to_thread(self.dashboard.build, output_dir)
+        
+        return stored
+    
+    async def close(self):
+        """Закрытие HTTP-сессии и хранилищ (вызывается в том же event loop, что и анализ)"""
+        if self._closed:
+            return
+        self._closed = True
+        await self.http.close()
+        await self._in_state_thread(self._close_state)
+        self._state_thread.shutdown()
+        if self.page_store is not None:
+            self.page_store.close()
+        if self.report_generator.chart_renderer is not None:
+            # Процессы рендеринга графиков живут до закрытия агента
+            await asyncio.to_thread(self.report_generator.chart_renderer.close)
+    
+    def _close_state(self):
+        """Сохранение индекса и закрытие соединений SQLite (в потоке хранилищ)"""
+        self._save_similarity_index()
+        self.social_history.close()
+        self.handle_resolver.close()
+        self.metrics_store.close()
+        self.run_store.close()
     
     async def schedule_analysis(self, companies: List[str], schedule: str):
         """Запланированный анализ нескольких конкурентов"""
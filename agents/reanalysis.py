@@ -0,0 +1,95 @@
+"""Задачи повторного анализа для пула процессов
+
+Каждый процесс пула один раз открывает хранилище страниц и создает препроцессор текста
+(init_worker), после чего готовит текст компаний по одной (prepare_content). Анализ
+контента выполняется затем в основном процессе одним проходом по корпусу всех компаний.
+
+Индекс сходства в пуле не используется: у каждого процесса была бы своя копия, и пометка
+дубликатов зависела бы от распределения компаний по процессам. Страницы сохраняют
+пометку 'duplicate_of' исходного запуска.
+
+Сохраненные результаты содержат уже очищенный текст ('clean_text'): сырые блоки
+страниц при первом анализе заменяются. Поэтому блоки заново извлекаются из исходного
+HTML той же версии страницы (PageStore), и очистка выполняется с текущими настройками.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from analyzers.text_preprocessor import TextPreprocessor
+from scrapers.enhanced_website_scraper import bs4, extract_text_blocks
+from storage.page_store import PageStore
+
+
+# Препроцессор и хранилище страниц текущего процесса пула
+_worker: Optional[Tuple[TextPreprocessor, Optional[PageStore]]] = None
+
+# Поля, которые prepare выставляет заново
+PREPARED_FIELDS = ('clean_text',)
+
+
+def init_worker(config: Dict[str, Any]):
+    """Инициализация процесса пула"""
+
+    global _worker
+    history_config = config.get('history', {})
+    page_store = PageStore(history_config) if history_config.get('store_pages', True) else None
+    _worker = (TextPreprocessor(config.get('analysis', {})), page_store)
+
+
+def _site_pages(website_data: Dict) -> List[Tuple[Optional[str], Dict]]:
+    """Страницы сайта с адресами: главная страница и дополнительные"""
+
+    pages = [(website_data.get('url'), website_data.get('main_page'))]
+    pages.extend(
+        (page.get('url'), page) for page in website_data.get('additional_pages', {}).values()
+        if isinstance(page, dict)
+    )
+    return [(url, page) for url, page in pages if isinstance(page, dict)]
+
+
+def restore_text_blocks(website_data: Dict, page_store: Optional[PageStore]) -> bool:
+    """Возврат сырых блоков текста страницам, уже прошедшим очистку
+
+    Блоки извлекаются из HTML, загруженного в момент fetched_at страницы. Если HTML
+    есть не для всех очищенных страниц, данные не меняются и возвращается False:
+    очистка части сайта исказила бы поиск шаблонных блоков.
+    """
+
+    prepared = [
+        (url, page) for url, page in _site_pages(website_data)
+        if 'text_blocks' not in page and 'clean_text' in page
+    ]
+    if not prepared or page_store is None:
+        return False
+
+    restored = []
+    for url, page in prepared:
+        fetched_at = page.get('fetched_at')
+        html = None
+        if url and fetched_at:
+            html = page_store.get(url, datetime.fromisoformat(fetched_at))
+        if html is None:
+            return False
+        restored.append((page, extract_text_blocks(bs4.BeautifulSoup(html, 'html.parser'))))
+
+    for page, blocks in restored:
+        for field in PREPARED_FIELDS:
+            page.pop(field, None)
+        page['text_blocks'] = blocks
+    return True
+
+
+def prepare_content(company_name: str,
+                    website_data: Dict) -> Tuple[Dict, Optional[Dict[str, Any]]]:
+    """Очистка текста страниц одной компании (как в CompetitorAgent._collect)
+
+    Возвращает website_data после prepare (страницы меняются на месте) и чанки со
+    статистикой; None вместо них - текст восстановить не удалось и остается прежним
+    """
+
+    text_preprocessor, page_store = _worker
+    has_blocks = any('text_blocks' in page for _, page in _site_pages(website_data))
+    if not has_blocks and not restore_text_blocks(website_data, page_store):
+        return website_data, None
+    return website_data, text_preprocessor.prepare(website_data, company_name)
@@ -0,0 +1,219 @@
+"""HTTP API для анализа конкурентов по запросу
+
+Сервис отдает сохраненные результаты и запускает analyze_competitor:
+- результаты моложе окна свежести отдаются из кеша (в памяти - уже сериализованный JSON,
+  при промахе - последний запуск из ResultSerializer);
+- одновременные запросы одной компании ждут один и тот же анализ, а не запускают свои;
+- одновременно выполняется не больше max_concurrent анализов и ждут очереди не больше
+  max_pending: сверх этого новые анализы отклоняются с 503 и Retry-After (или отдаются
+  устаревшие результаты, если они есть), чтобы всплеск запросов не перегрузил скраперы.
+
+Маршруты:
+    GET  /health                        - состояние очереди анализов
+    GET  /companies                     - компании с сохраненными результатами
+    GET  /companies/{company}           - последние сохраненные результаты без анализа
+    POST /companies/{company}/analyze   - свежие результаты; ?max_age=<сек>, ?force=1
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, NamedTuple, Optional
+
+from aiohttp import web
+
+from agents.competitor_agent import CompetitorAgent
+from storage.serialization import dumps_json
+from storage.snapshots import company_slug
+
+
+# Оценка длительности анализа до первого завершенного (для Retry-After), сек
+INITIAL_DURATION = 60.0
+
+
+class CachedResult(NamedTuple):
+    """Результаты запуска компании, сериализованные в JSON"""
+
+    timestamp: datetime
+    body: bytes
+
+
+class Overloaded(Exception):
+    """Очередь анализов заполнена"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Очередь анализов заполнена, повторите через {retry_after} с")
+        self.retry_after = retry_after
+
+
+class CompetitorService:
+    """Кеширующий фронт агента с объединением запросов и ограничением очереди"""
+
+    def __init__(self, config: Dict[str, Any], agent: CompetitorAgent):
+        self.config = config
+        self.agent = agent
+        self.output_dir = config.get('output_dir', 'reports/')
+        self.freshness = config.get('freshness_hours', 24) * 3600
+        self.max_concurrent = max(int(config.get('max_concurrent', 2)), 1)
+        self.max_pending = max(int(config.get('max_pending', 8)), 0)
+        self.cache_size = config.get('cache_size', 128)
+
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._cache: 'OrderedDict[str, CachedResult]' = OrderedDict()
+        # Сглаженная длительность анализа для оценки Retry-After
+        self._duration = INITIAL_DURATION
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/health', self.handle_health)
+        app.router.add_get('/companies', self.handle_companies)
+        app.router.add_get('/companies/{company}', self.handle_stored)
+        app.router.add_post('/companies/{company}/analyze', self.handle_analyze)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return self._json({
+            'running': self.running,
+            'pending': self.pending,
+            'max_concurrent': self.max_concurrent,
+            'max_pending': self.max_pending,
+            'cached': len(self._cache),
+            'average_duration': round(self._duration, 1)
+        })
+
+    async def handle_companies(self, request: web.Request) -> web.Response:
+        companies = await asyncio.to_thread(self.agent.result_serializer.companies)
+        return self._json({'companies': companies})
+
+    async def handle_stored(self, request: web.Request) -> web.Response:
+        slug = company_slug(request.match_info['company'])
+        cached = await self.cached(slug)
+        if cached is None:
+            return self._json({'error': f"Нет сохраненных результатов для {slug}"}, status=404)
+        return self._result(cached, 'stored')
+
+    async def handle_analyze(self, request: web.Request) -> web.Response:
+        company_name = request.match_info['company']
+        slug = company_slug(company_name)
+        try:
+            max_age = float(request.query.get('max_age', self.freshness))
+        except ValueError:
+            return self._json({'error': "max_age должен быть числом секунд"}, status=400)
+        force = request.query.get('force', '').lower() in ('1', 'true', 'yes')
+
+        cached = await self.cached(slug)
+        if cached is not None and not force and self._age(cached) <= max_age:
+            return self._result(cached, 'hit')
+
+        try:
+            task, source = self._analysis(slug, company_name)
+        except Overloaded as e:
+            if cached is not None:
+                # Лучше устаревшие данные, чем отказ
+                return self._result(cached, 'stale')
+            return self._json(
+                {'error': str(e)}, status=503, headers={'Retry-After': str(e.retry_after)}
+            )
+
+        try:
+            # Отключение клиента не должно отменять анализ, который ждут другие запросы
+            result = await asyncio.shield(task)
+        except Exception as e:
+            return self._json({'error': f"Ошибка анализа {company_name}: {e}"}, status=502)
+        return self._result(result, source)
+
+    @property
+    def running(self) -> int:
+        return min(len(self._inflight), self.max_concurrent)
+
+    @property
+    def pending(self) -> int:
+        return max(len(self._inflight) - self.max_concurrent, 0)
+
+    async def cached(self, slug: str) -> Optional[CachedResult]:
+        """Последние результаты компании: из памяти или с диска"""
+
+        cached = self._cache.get(slug)
+        if cached is not None:
+            self._cache.move_to_end(slug)
+            return cached
+
+        results = await asyncio.to_thread(self.agent.result_serializer.latest, slug)
+        if results is None:
+            return None
+        return self._remember(slug, results)
+
+    def _analysis(self, slug: str, company_name: str):
+        """Задача анализа компании: уже идущая (coalesced) или новая, если есть место в очереди"""
+
+        task = self._inflight.get(slug)
+        if task is not None:
+            return task, 'coalesced'
+
+        if len(self._inflight) >= self.max_concurrent + self.max_pending:
+            raise Overloaded(self._retry_after())
+
+        task = asyncio.create_task(self._analyze(slug, company_name))
+        self._inflight[slug] = task
+        task.add_done_callback(lambda done: self._finished(slug, done))
+        return task, 'miss'
+
+    def _finished(self, slug: str, task: asyncio.Task):
+        self._inflight.pop(slug, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Ошибка видна ждущим запросам; здесь она фиксируется, даже если все отключились
+            print(f"❌ Ошибка анализа {slug}: {task.exception()}")
+
+    async def _analyze(self, slug: str, company_name: str) -> CachedResult:
+        async with self._slots:
+            started = time.monotonic()
+            results = await self.agent.analyze_competitor(company_name, self.output_dir)
+            elapsed = time.monotonic() - started
+            self._duration += 0.2 * (elapsed - self._duration)
+        return self._remember(slug, results)
+
+    def _retry_after(self) -> int:
+        """Оценка времени, через которое освободится место в очереди"""
+
+        waves = (self.pending + 1) / self.max_concurrent
+        return max(int(math.ceil(self._duration * waves)), 1)
+
+    def _remember(self, slug: str, results: Dict[str, Any]) -> CachedResult:
+        timestamp = results.get('timestamp') or datetime.now()
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        cached = CachedResult(timestamp, dumps_json(results))
+
+        self._cache[slug] = cached
+        self._cache.move_to_end(slug)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return cached
+
+    def _age(self, cached: CachedResult) -> float:
+        return (datetime.now() - cached.timestamp).total_seconds()
+
+    def _result(self, cached: CachedResult, source: str) -> web.Response:
+        return web.Response(
+            body=cached.body,
+            content_type='application/json',
+            headers={'X-Cache': source, 'Age': str(max(int(self._age(cached)), 0))}
+        )
+
+    def _json(self, payload: Dict[str, Any], status: int = 200,
+              headers: Dict[str, str] = None) -> web.Response:
+        return web.Response(
+            body=dumps_json(payload), status=status, content_type='application/json',
+            headers=headers
+        )
+
+    async def _on_cleanup(self, app: web.Application):
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.agent.close()
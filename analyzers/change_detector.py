@@ -0,0 +1,270 @@
+"""Структурное сравнение снимков данных компании между запусками"""
+
+import hashlib
+import json
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from scrapers.records import Record
+
+
+# Поля-ключи для сопоставления элементов списков по имени списка
+LIST_KEYS = {
+    'call_to_actions': ('text', 'url'),
+    'social_links': ('platform', 'url'),
+    'pricing': ('name',),
+    'plans': ('name',),
+    'products': ('name',),
+    'testimonials': ('text',),
+    'recent_posts': ('id',),
+    'competitors': ('name',)
+}
+
+# Общие ключи для списков словарей без явного правила
+GENERIC_KEYS = ('id', 'url', 'name', 'title')
+
+# Изменчивые поля, не отражающие изменений у конкурента
+DEFAULT_IGNORED_FIELDS = [
+    'timestamp', 'load_time', 'total_time', 'timing', 'fetched_at', 'text_blocks',
+    'clean_text', 'duplicate_of', 'error', 'date', 'new_posts'
+]
+
+# Текст страниц: в снимке вместо него хранится только хеш
+TEXT_FIELDS = ('text_blocks', 'clean_text')
+TEXT_HASH_FIELD = 'text_hash'
+
+# Человекочитаемые названия сущностей в журнале изменений
+FIELD_LABELS = {
+    'call_to_actions': 'призыв к действию',
+    'technologies': 'технология',
+    'value_propositions': 'ценностное предложение',
+    'pricing': 'тарифный план',
+    'plans': 'тарифный план',
+    'products': 'продукт',
+    'social_links': 'ссылка на соцсеть',
+    'navigation_menu': 'пункт меню',
+    'testimonials': 'отзыв',
+    'h1_tags': 'заголовок H1',
+    'description': 'описание',
+    'title': 'заголовок',
+    'followers': 'подписчики',
+    'total_followers': 'подписчики',
+    'price': 'цена',
+    TEXT_HASH_FIELD: 'текст страницы'
+}
+
+OPERATION_LABELS = {
+    'added': 'Добавлен(а)',
+    'removed': 'Удален(а)',
+    'changed': 'Изменен(а)'
+}
+
+
+def compact(value: Any) -> Any:
+    """Копия данных для снимка: записи - словарями, текст страниц - только хешем"""
+
+    if isinstance(value, Record):
+        return {name: compact(item) for name, item in value.items()}
+    if isinstance(value, dict):
+        result = {key: compact(item) for key, item in value.items() if key not in TEXT_FIELDS}
+        text = value.get('clean_text') or '\n'.join(value.get('text_blocks') or ())
+        if text:
+            result[TEXT_HASH_FIELD] = hashlib.blake2b(text.encode('utf-8'), digest_size=12).hexdigest()
+        return result
+    if isinstance(value, (list, tuple)):
+        return [compact(item) for item in value]
+    return value
+
+
+class StructuralDiff:
+    """Diff вложенных dict/list: сначала сравниваются хеши поддеревьев, списки - по ключам"""
+
+    def __init__(self, ignored_fields: Iterable[str] = None):
+        self.ignored_fields = set(DEFAULT_IGNORED_FIELDS if ignored_fields is None else ignored_fields)
+
+    def diff(self, old: Any, new: Any, root: str = '') -> List[Dict[str, Any]]:
+        """Список изменений между двумя деревьями"""
+
+        old_hashes: Dict[int, str] = {}
+        new_hashes: Dict[int, str] = {}
+        self._hash(old, old_hashes)
+        self._hash(new, new_hashes)
+
+        changes: List[Dict[str, Any]] = []
+        self._diff(old, new, root, None, changes, old_hashes, new_hashes)
+        return changes
+
+    def _hash(self, node: Any, cache: Dict[int, str]) -> str:
+        """Хеш поддерева снизу вверх; хеши контейнеров кешируются по id"""
+
+        if isinstance(node, dict):
+            parts = [
+                f"{key}={self._hash(value, cache)}"
+                for key, value in sorted(node.items(), key=lambda item: str(item[0]))
+                if key not in self.ignored_fields
+            ]
+            digest = self._digest('{' + ','.join(parts) + '}')
+            cache[id(node)] = digest
+            return digest
+
+        if isinstance(node, list):
+            # Хеш списка не зависит от порядка: элементы сопоставляются по ключам
+            parts = sorted(self._hash(item, cache) for item in node)
+            digest = self._digest('[' + ','.join(parts) + ']')
+            cache[id(node)] = digest
+            return digest
+
+        return self._digest(json.dumps(node, ensure_ascii=False, sort_keys=True, default=str))
+
+    def _digest(self, value: str) -> str:
+        return hashlib.blake2b(value.encode('utf-8'), digest_size=12).hexdigest()
+
+    def _diff(self, old: Any, new: Any, path: str, field: Optional[str],
+              changes: List[Dict[str, Any]], old_hashes: Dict[int, str], new_hashes: Dict[int, str]):
+        """Рекурсивное сравнение с пропуском совпадающих по хешу поддеревьев"""
+
+        if isinstance(old, (dict, list)) and type(old) is type(new):
+            if old_hashes.get(id(old)) == new_hashes.get(id(new)):
+                return
+        elif old == new:
+            return
+
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in list(old) + [key for key in new if key not in old]:
+                if key in self.ignored_fields:
+                    continue
+                child_path = f"{path}.{key}" if path else str(key)
+                if key not in new:
+                    changes.append(self._change('removed', child_path, key, old[key], None))
+                elif key not in old:
+                    changes.append(self._change('added', child_path, key, None, new[key]))
+                else:
+                    self._diff(old[key], new[key], child_path, key, changes, old_hashes, new_hashes)
+            return
+
+        if isinstance(old, list) and isinstance(new, list):
+            self._diff_lists(old, new, path, field, changes, old_hashes, new_hashes)
+            return
+
+        changes.append(self._change('changed', path, field, old, new))
+
+    def _diff_lists(self, old: List, new: List, path: str, field: Optional[str],
+                    changes: List[Dict[str, Any]], old_hashes: Dict[int, str], new_hashes: Dict[int, str]):
+        """Сопоставление элементов списков по ключу, а не по позиции"""
+
+        old_items = self._keyed(old, field, old_hashes)
+        new_items = self._keyed(new, field, new_hashes)
+
+        for key, old_item in old_items.items():
+            item_path = f"{path}[{key}]"
+            if key not in new_items:
+                changes.append(self._change('removed', item_path, field, old_item, None))
+            else:
+                self._diff(old_item, new_items[key], item_path, field, changes, old_hashes, new_hashes)
+
+        for key, new_item in new_items.items():
+            if key not in old_items:
+                changes.append(self._change('added', f"{path}[{key}]", field, None, new_item))
+
+    def _keyed(self, items: List, field: Optional[str], hashes: Dict[int, str]) -> Dict[str, Any]:
+        """Словарь ключ -> элемент списка"""
+
+        key_fields = LIST_KEYS.get(field)
+        keyed: Dict[str, Any] = {}
+
+        for item in items:
+            key = self._item_key(item, key_fields, hashes)
+            # Повторяющиеся ключи различаем порядковым номером
+            unique_key, n = key, 1
+            while unique_key in keyed:
+                n += 1
+                unique_key = f"{key}#{n}"
+            keyed[unique_key] = item
+
+        return keyed
+
+    def _item_key(self, item: Any, key_fields: Optional[Tuple[str, ...]], hashes: Dict[int, str]) -> str:
+        """Ключ элемента: значения ключевых полей, само значение или хеш содержимого"""
+
+        if not isinstance(item, (dict, list)):
+            return str(item)
+
+        if isinstance(item, dict):
+            fields = key_fields or tuple(key for key in GENERIC_KEYS if item.get(key))[:1]
+            values = [str(item.get(key, '')) for key in fields]
+            if any(values):
+                return '|'.join(values)
+
+        return hashes.get(id(item)) or self._hash(item, hashes)
+
+    def _change(self, operation: str, path: str, field: Optional[str], old: Any, new: Any) -> Dict[str, Any]:
+        change = {'op': operation, 'path': path}
+        if old is not None:
+            change['old'] = old
+        if new is not None:
+            change['new'] = new
+        if field is not None and str(field) in FIELD_LABELS:
+            change['entity'] = FIELD_LABELS[str(field)]
+        return change
+
+
+class ChangeDetector:
+    """Журнал изменений компании по сравнению с предыдущим снимком"""
+
+    SECTIONS = ('website_data', 'social_data')
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.differ = StructuralDiff(config.get('ignore_fields'))
+
+    def detect(self, previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+        """Сравнение текущего снимка с предыдущим
+
+        Оба снимка сравниваются в сжатом виде (compact): снимки, сохраненные с полным
+        текстом страниц, сопоставимы с новыми по хешу текста.
+        """
+
+        if not previous:
+            return {
+                'previous_timestamp': None,
+                'first_snapshot': True,
+                'changes': [],
+                'summary': {'added': 0, 'removed': 0, 'changed': 0}
+            }
+
+        changes = []
+        for section in self.SECTIONS:
+            changes.extend(self.differ.diff(
+                compact(previous.get(section, {})), compact(current.get(section, {})), root=section
+            ))
+
+        summary = {'added': 0, 'removed': 0, 'changed': 0}
+        for change in changes:
+            summary[change['op']] += 1
+
+        return {
+            'previous_timestamp': previous.get('timestamp'),
+            'first_snapshot': False,
+            'changes': changes,
+            'summary': summary
+        }
+
+    @staticmethod
+    def describe(change: Dict[str, Any]) -> str:
+        """Краткое описание изменения для отчета"""
+
+        label = OPERATION_LABELS[change['op']]
+        entity = change.get('entity', change['path'])
+
+        if change['op'] == 'changed':
+            return f"{label} {entity}: {ChangeDetector._short(change['old'])} → {ChangeDetector._short(change['new'])}"
+        value = change.get('new') if change['op'] == 'added' else change.get('old')
+        return f"{label} {entity}: {ChangeDetector._short(value)}"
+
+    @staticmethod
+    def _short(value: Any, limit: int = 80) -> str:
+        if isinstance(value, dict):
+            value = value.get('name') or value.get('text') or value.get('url') or json.dumps(
+                value, ensure_ascii=False, default=str
+            )
+        text = str(value)
+        return text if len(text) <= limit else text[:limit - 1] + '…'
@@ -1,41 +1,121 @@
 """Анализатор контента с использованием AI"""
 
 import asyncio
-from typing import Dict, List, Any
-import openai
+from typing import Dict, List, Any, Optional, Tuple
+
+from analyzers.local_analyzer import LocalTextAnalyzer
+from utils.lazy import lazy_import
+
+openai = lazy_import('openai')
+
+
+# Инструкция модели для одного чанка текста сайта
+CHUNK_PROMPT = (
+    "Ниже фрагмент текста сайта компании-конкурента. Кратко опиши: позиционирование "
+    "и ценностное предложение, целевую аудиторию, продукты и тарифы, заявленные "
+    "преимущества. Только факты из текста, без домыслов."
+)
 
 
 class ContentAnalyzer:
     """Анализ контента с помощью ИИ"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], client: Optional[Any] = None):
         self.config = config
         self.openai_key = config.get('openai_api_key', '')
         self.model = config.get('openai_model', 'gpt-4')
+        self.max_tokens = config.get('max_tokens', 2000)
+        self.local_analyzer = LocalTextAnalyzer(config)
+        # Клиент OpenAI-совместимого API; без него и без ключа ИИ-анализ чанков пропускается
+        self.client = client
     
-    async def analyze(self, website_data: Dict, social_data: Dict) -> Dict[str, Any]:
-        """Комплексный анализ собранного контента"""
+    async def analyze(self, website_data: Dict, social_data: Dict,
+                      local_analysis: Dict[str, Any] = None,
+                      prepared_content: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Комплексный анализ собранного контента
+        
+        prepared_content - результат TextPreprocessor.prepare: чанки текста в пределах
+        бюджета токенов модели. При заданном openai_api_key (или переданном клиенте) они
+        уходят в ИИ-анализ вместо сырого текста страниц; статистика бюджета сохраняется
+        в content_budget в любом случае
+        """
+        
+        # Локальный анализ не требует обращения к API; расчет по корпусу - вне event loop
+        if local_analysis is None:
+            local_analysis = await asyncio.to_thread(
+                self.local_analyzer.analyze_company, website_data, social_data
+            )
         
         analysis = {
-            'sentiment': self._analyze_sentiment(website_data, social_data),
-            'key_topics': self._extract_topics(website_data, social_data),
+            'sentiment': self._analyze_sentiment(local_analysis),
+            'key_topics': self._extract_topics(website_data, local_analysis),
+            'keyword_scores': local_analysis['keyword_scores'],
             'brand_positioning': self._analyze_positioning(website_data),
             'content_strategy': self._analyze_content_strategy(social_data),
             'competitive_advantages': self._find_advantages(website_data)
         }
         
+        if prepared_content:
+            analysis['content_budget'] = prepared_content['stats']
+            if prepared_content['chunks'] and (self.client is not None or self.openai_key):
+                analysis['ai_insights'] = await self._analyze_chunks(prepared_content['chunks'])
+        
         return analysis
     
-    def _analyze_sentiment(self, website_data: Dict, social_data: Dict) -> Dict[str, float]:
-        """Анализ тональности контента"""
-        # Упрощенный анализ - в реальности использовать OpenAI API
+    async def _analyze_chunks(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ИИ-анализ чанков: по запросу на чанк, запросы выполняются параллельно"""
+        
+        # Без переданного клиента он создается на вызов: в пуле процессов повторного
+        # анализа у каждой компании свой event loop
+        client = self.client or openai.AsyncOpenAI(api_key=self.openai_key)
+        try:
+            return list(await asyncio.gather(*[
+                self._analyze_chunk(client, chunk) for chunk in chunks
+            ]))
+        finally:
+            if client is not self.client:
+                await client.close()
+    
+    async def _analyze_chunk(self, client: Any, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        insight = {'pages': chunk['pages'], 'tokens': chunk['tokens']}
+        try:
+            response = await client.chat.completions.create(
+                model=self.model,
+                max_tokens=self.max_tokens,
+                messages=[
+                    {'role': 'system', 'content': CHUNK_PROMPT},
+                    {'role': 'user', 'content': chunk['text']}
+                ]
+            )
+            insight['summary'] = response.choices[0].message.content
+        except Exception as e:
+            insight['error'] = str(e)
+        return insight
+    
+    async def analyze_batch(self, companies: Dict[str, Tuple[Dict, Dict]],
+                            prepared_contents: Dict[str, Dict[str, Any]] = None
+                            ) -> Dict[str, Dict[str, Any]]:
+        """Анализ нескольких компаний с общим локальным проходом по корпусу
+        
+        companies: {название компании: (website_data, social_data)}; prepared_contents -
+        результаты TextPreprocessor.prepare по компаниям (для тех, у кого они есть)
+        """
+        
+        prepared_contents = prepared_contents or {}
+        local_results = await asyncio.to_thread(self.local_analyzer.analyze_corpus, companies)
+        
         return {
-            'website_sentiment': 0.7,  # положительная
-            'social_sentiment': 0.6,
-            'overall_sentiment': 0.65
+            name: await self.analyze(
+                website_data, social_data, local_results[name], prepared_contents.get(name)
+            )
+            for name, (website_data, social_data) in companies.items()
         }
     
-    def _extract_topics(self, website_data: Dict, social_data: Dict) -> List[str]:
+    def _analyze_sentiment(self, local_analysis: Dict[str, Any]) -> Dict[str, float]:
+        """Анализ тональности контента по локальному лексикону (0 - негатив, 1 - позитив)"""
+        return dict(local_analysis['sentiment'])
+    
+    def _extract_topics(self, website_data: Dict, local_analysis: Dict[str, Any]) -> List[str]:
         """Извлечение ключевых тем"""
         topics = []
         
@@ -43,12 +123,10 @@ class ContentAnalyzer:
         if website_data.get('keywords'):
             topics.extend(website_data['keywords'][:5])
         
-        # Из заголовков контента
-        if website_data.get('content_sections'):
-            topics.extend([
-                section['title'] 
-                for section in website_data['content_sections'][:3]
-            ])
+        # Из TF-IDF по всем страницам и постам
+        for keyword in local_analysis['keywords']:
+            if keyword not in topics:
+                topics.append(keyword)
         
         return topics
     
@@ -62,11 +140,40 @@ class ContentAnalyzer:
     
     def _analyze_content_strategy(self, social_data: Dict) -> Dict[str, Any]:
         """Анализ контент-стратегии в соцсетях"""
+        
+        # Статистика по накопленной истории постов (см. SocialHistoryStore)
+        platforms = [
+            data for data in social_data.get('platforms', {}).values()
+            if 'posts_per_week' in data
+        ]
+        if not platforms:
+            return {
+                'posting_frequency': 'Средняя активность',
+                'engagement_rate': 3.2,
+                'content_types': ['Новости', 'Продукты', 'Инсайты'],
+                'best_performing_platform': social_data.get('summary', {}).get('most_active_platform', '')
+            }
+        
+        posts_per_week = sum(data['posts_per_week'] for data in platforms)
+        if posts_per_week >= 7:
+            posting_frequency = f'Высокая активность ({posts_per_week:.1f} постов в неделю)'
+        elif posts_per_week >= 2:
+            posting_frequency = f'Средняя активность ({posts_per_week:.1f} постов в неделю)'
+        else:
+            posting_frequency = f'Низкая активность ({posts_per_week:.1f} постов в неделю)'
+        
+        best_platform = max(
+            social_data['platforms'].items(),
+            key=lambda item: item[1].get('engagement_rate', 0)
+        )[0]
+        
         return {
-            'posting_frequency': 'Средняя активность',
-            'engagement_rate': 3.2,
+            'posting_frequency': posting_frequency,
+            'engagement_rate': round(
+                sum(data['engagement_rate'] for data in platforms) / len(platforms), 3
+            ),
             'content_types': ['Новости', 'Продукты', 'Инсайты'],
-            'best_performing_platform': social_data.get('summary', {}).get('most_active_platform', '')
+            'best_performing_platform': best_platform
         }
     
     def _find_advantages(self, website_data: Dict) -> List[str]:
@@ -0,0 +1,314 @@
+"""Локальный анализ ключевых слов и тональности без обращения к API"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Any, Tuple
+
+from utils.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+
+TOKEN_PATTERN = re.compile(r"[a-zа-яё]+(?:-[a-zа-яё]+)*", re.IGNORECASE)
+
+STOPWORDS = {
+    'ru': {
+        'и', 'в', 'во', 'не', 'что', 'он', 'на', 'я', 'с', 'со', 'как', 'а', 'то', 'все', 'она',
+        'так', 'его', 'но', 'да', 'ты', 'к', 'у', 'же', 'вы', 'за', 'бы', 'по', 'только', 'ее',
+        'мне', 'было', 'вот', 'от', 'меня', 'еще', 'нет', 'о', 'из', 'ему', 'теперь', 'когда',
+        'даже', 'ну', 'ли', 'если', 'уже', 'или', 'ни', 'быть', 'был', 'него', 'до', 'вас',
+        'нибудь', 'уж', 'вам', 'ведь', 'там', 'потом', 'себя', 'ничего', 'ей', 'может', 'они',
+        'тут', 'где', 'есть', 'надо', 'ней', 'для', 'мы', 'тебя', 'их', 'чем', 'была', 'сам',
+        'чтоб', 'без', 'будто', 'чего', 'раз', 'тоже', 'себе', 'под', 'будет', 'ж', 'тогда',
+        'кто', 'этот', 'того', 'потому', 'этого', 'какой', 'совсем', 'ним', 'здесь', 'этом',
+        'один', 'почти', 'мой', 'тем', 'чтобы', 'нее', 'были', 'куда', 'зачем', 'всех', 'можно',
+        'при', 'об', 'это', 'эти', 'эта', 'вашего', 'ваш', 'ваши', 'наш', 'наши', 'более', 'всё',
+        'также', 'через', 'после', 'над', 'про', 'который', 'которые', 'которая', 'свой'
+    },
+    'en': {
+        'a', 'an', 'the', 'and', 'or', 'but', 'if', 'of', 'at', 'by', 'for', 'with', 'about',
+        'to', 'from', 'in', 'on', 'up', 'out', 'as', 'into', 'over', 'under', 'is', 'are', 'was',
+        'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'not', 'no',
+        'so', 'than', 'too', 'very', 'can', 'will', 'just', 'should', 'now', 'i', 'me', 'my',
+        'we', 'our', 'ours', 'you', 'your', 'yours', 'he', 'him', 'his', 'she', 'her', 'it',
+        'its', 'they', 'them', 'their', 'what', 'which', 'who', 'whom', 'this', 'that', 'these',
+        'those', 'am', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some',
+        'such', 'only', 'own', 'same', 'there', 'here', 'when', 'where', 'why', 'how', 'again',
+        'further', 'then', 'once', 'get', 'us', 'also', 'new', 'one', 'way', 'make'
+    }
+}
+
+# Основы слов (для русского — без окончаний) с полярностью от -1 до 1
+SENTIMENT_LEXICON = {
+    'ru': {
+        'лучш': 1.0, 'отличн': 1.0, 'превосходн': 1.0, 'надежн': 0.8, 'удобн': 0.8,
+        'быстр': 0.6, 'прост': 0.5, 'выгодн': 0.8, 'качествен': 0.8, 'безопасн': 0.6,
+        'довольн': 0.8, 'рекоменду': 0.8, 'любим': 0.8, 'лидер': 0.6, 'успе': 0.7,
+        'эффективн': 0.7, 'инновац': 0.5, 'бесплатн': 0.4, 'рост': 0.4, 'помога': 0.5,
+        'спасибо': 0.8, 'благодар': 0.8, 'нрав': 0.7, 'хорош': 0.7, 'прекрасн': 1.0,
+        'плох': -0.8, 'ужасн': -1.0, 'медленн': -0.6, 'дорог': -0.4, 'сложн': -0.4,
+        'проблем': -0.6, 'ошибк': -0.6, 'сбой': -0.7, 'сбои': -0.7, 'жалоб': -0.8, 'разочаров': -0.9,
+        'недоволь': -0.8, 'отказ': -0.5, 'риск': -0.4, 'потер': -0.6, 'неудоб': -0.7,
+        'задержк': -0.5, 'обман': -1.0, 'худш': -1.0, 'слаб': -0.5, 'угроз': -0.5
+    },
+    'en': {
+        'best': 1.0, 'great': 0.9, 'excellent': 1.0, 'amazing': 1.0, 'reliable': 0.8,
+        'easy': 0.6, 'fast': 0.6, 'simple': 0.5, 'secure': 0.6, 'trusted': 0.8,
+        'love': 0.9, 'loved': 0.9, 'happy': 0.8, 'recommend': 0.8, 'leading': 0.6,
+        'leader': 0.6, 'success': 0.7, 'successful': 0.7, 'efficient': 0.7, 'powerful': 0.6,
+        'innovative': 0.5, 'free': 0.4, 'growth': 0.4, 'helps': 0.5, 'thanks': 0.8,
+        'seamless': 0.7, 'save': 0.5, 'good': 0.7, 'awesome': 0.9, 'perfect': 1.0,
+        'bad': -0.8, 'terrible': -1.0, 'awful': -1.0, 'slow': -0.6, 'expensive': -0.4,
+        'complex': -0.4, 'complicated': -0.5, 'problem': -0.6, 'problems': -0.6,
+        'issue': -0.5, 'issues': -0.5, 'error': -0.6, 'errors': -0.6, 'outage': -0.8,
+        'broken': -0.8, 'complaint': -0.8, 'disappointed': -0.9, 'fail': -0.7,
+        'failed': -0.7, 'failure': -0.7, 'risk': -0.4, 'loss': -0.6, 'delay': -0.5,
+        'worst': -1.0, 'poor': -0.7, 'scam': -1.0, 'hate': -0.9, 'weak': -0.5
+    }
+}
+
+NEGATIONS = {
+    'ru': {'не', 'нет', 'ни', 'без'},
+    'en': {'not', 'no', 'never', 'without', 'cannot'}
+}
+
+CYRILLIC_PATTERN = re.compile(r"[а-яё]")
+
+MIN_STEM_LENGTH = 3
+
+
+def collect_documents(website_data: Dict, social_data: Dict) -> List[Tuple[str, str]]:
+    """Сбор текстов компании в виде документов (источник, текст)"""
+
+    documents = []
+
+    def add_page(page: Dict):
+        if not isinstance(page, dict) or page.get('duplicate_of'):
+            return
+        # Текст, очищенный TextPreprocessor от шаблонных блоков, заменяет отдельные поля
+        if page.get('clean_text'):
+            documents.append(('website', page['clean_text']))
+            return
+        parts = [page.get('title', ''), page.get('description', '')]
+        parts.extend(page.get('h1_tags', []))
+        parts.extend(page.get('value_propositions', []))
+        parts.extend(t.get('text', '') for t in page.get('testimonials', []))
+        parts.extend(
+            f"{s.get('title', '')} {s.get('content', '')}" for s in page.get('content_sections', [])
+        )
+        parts.extend(page.get('keywords', []))
+        text = ' '.join(p for p in parts if p)
+        if text:
+            documents.append(('website', text))
+
+    if website_data:
+        # Структура EnhancedWebsiteScraper
+        if 'main_page' in website_data:
+            add_page(website_data.get('main_page', {}))
+            for page in website_data.get('additional_pages', {}).values():
+                add_page(page)
+        # Структура WebsiteScraper
+        else:
+            add_page(website_data)
+
+    for platform_data in (social_data or {}).get('platforms', {}).values():
+        for post in platform_data.get('recent_posts', []):
+            if post.get('text'):
+                documents.append(('social', post['text']))
+
+    return documents
+
+
+class LocalTextAnalyzer:
+    """Векторизованный TF-IDF и лексиконная тональность по всему корпусу сразу"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.languages = config.get('languages', ['ru', 'en'])
+        self.top_k = config.get('keywords_top_k', 10)
+
+        self.stopwords = set()
+        self.negations = set()
+        self.lexicon = {}
+        for language in self.languages:
+            self.stopwords |= STOPWORDS.get(language, set())
+            self.negations |= NEGATIONS.get(language, set())
+            self.lexicon.update(SENTIMENT_LEXICON.get(language, {}))
+
+    def analyze_company(self, website_data: Dict, social_data: Dict) -> Dict[str, Any]:
+        """Анализ одной компании"""
+        return self.analyze_corpus({'_': (website_data, social_data)})['_']
+
+    def analyze_corpus(self, companies: Dict[str, Tuple[Dict, Dict]]) -> Dict[str, Dict[str, Any]]:
+        """Анализ всех страниц и постов всех компаний за один проход
+
+        companies: {название компании: (website_data, social_data)}
+        """
+
+        names = list(companies)
+        doc_company = []
+        doc_social = []
+        texts = []
+
+        for company_idx, name in enumerate(names):
+            website_data, social_data = companies[name]
+            for source, text in collect_documents(website_data, social_data):
+                doc_company.append(company_idx)
+                doc_social.append(source == 'social')
+                texts.append(text)
+
+        results = {
+            name: {
+                'keywords': [],
+                'keyword_scores': {},
+                'sentiment': {'website_sentiment': 0.5, 'social_sentiment': 0.5, 'overall_sentiment': 0.5},
+                'documents': 0
+            }
+            for name in names
+        }
+        if not texts:
+            return results
+
+        vocabulary, token_ids, token_docs = self._tokenize(texts)
+        n_docs = len(texts)
+        n_terms = len(vocabulary)
+        doc_company = np.asarray(doc_company, dtype=np.int64)
+        doc_social = np.asarray(doc_social, dtype=bool)
+
+        counts = np.bincount(doc_company, minlength=len(names))
+        for company_idx, name in enumerate(names):
+            results[name]['documents'] = int(counts[company_idx])
+
+        self._score_keywords(names, vocabulary, token_ids, token_docs, doc_company, n_docs, n_terms, results)
+        self._score_sentiment(names, vocabulary, token_ids, token_docs, doc_company, doc_social, results)
+
+        return results
+
+    def _tokenize(self, texts: List[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Токенизация корпуса в плоские массивы (id термина, id документа)"""
+
+        vocab_index = {}
+        token_ids = []
+        token_docs = []
+
+        for doc_idx, text in enumerate(texts):
+            tokens = TOKEN_PATTERN.findall(text.lower().replace('ё', 'е'))
+            ids = [vocab_index.setdefault(token, len(vocab_index)) for token in tokens]
+            token_ids.extend(ids)
+            token_docs.extend([doc_idx] * len(ids))
+
+        vocabulary = list(vocab_index)
+        return (
+            vocabulary,
+            np.asarray(token_ids, dtype=np.int64),
+            np.asarray(token_docs, dtype=np.int64)
+        )
+
+    def _score_keywords(self, names, vocabulary, token_ids, token_docs, doc_company,
+                        n_docs, n_terms, results):
+        """TF-IDF по документам с агрегацией до уровня компании"""
+
+        keyword_mask = np.fromiter(
+            (len(term) >= 3 and term not in self.stopwords for term in vocabulary),
+            dtype=bool, count=n_terms
+        )
+        keep = keyword_mask[token_ids]
+        ids = token_ids[keep]
+        docs = token_docs[keep]
+        if ids.size == 0:
+            return
+
+        # Разреженная матрица документ x термин в координатном виде
+        pair_keys, pair_counts = np.unique(docs * n_terms + ids, return_counts=True)
+        pair_docs = pair_keys // n_terms
+        pair_terms = pair_keys % n_terms
+
+        doc_lengths = np.bincount(docs, minlength=n_docs)
+        doc_freq = np.bincount(pair_terms, minlength=n_terms)
+        idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1.0
+
+        tfidf = pair_counts / doc_lengths[pair_docs] * idf[pair_terms]
+
+        # Сумма TF-IDF по документам компании
+        company_keys, inverse = np.unique(
+            doc_company[pair_docs] * n_terms + pair_terms, return_inverse=True
+        )
+        company_scores = np.bincount(inverse, weights=tfidf)
+        key_company = company_keys // n_terms
+        key_term = company_keys % n_terms
+
+        # Сортировка внутри каждой компании по убыванию веса
+        order = np.lexsort((-company_scores, key_company))
+        key_company = key_company[order]
+        key_term = key_term[order]
+        company_scores = company_scores[order]
+
+        starts = np.searchsorted(key_company, np.arange(len(names)), side='left')
+        ends = np.searchsorted(key_company, np.arange(len(names)), side='right')
+
+        for company_idx, name in enumerate(names):
+            start, end = starts[company_idx], min(ends[company_idx], starts[company_idx] + self.top_k)
+            terms = [vocabulary[t] for t in key_term[start:end]]
+            results[name]['keywords'] = terms
+            results[name]['keyword_scores'] = {
+                term: round(float(score), 4)
+                for term, score in zip(terms, company_scores[start:end])
+            }
+
+    def _score_sentiment(self, names, vocabulary, token_ids, token_docs, doc_company,
+                         doc_social, results):
+        """Лексиконная тональность с учетом отрицаний"""
+
+        polarity = np.fromiter(
+            (self._lookup_polarity(term) for term in vocabulary),
+            dtype=np.float64, count=len(vocabulary)
+        )
+        is_negation = np.fromiter(
+            (term in self.negations for term in vocabulary),
+            dtype=bool, count=len(vocabulary)
+        )
+
+        token_polarity = polarity[token_ids]
+        # Отрицание действует на следующий токен того же документа
+        negated = np.zeros(token_ids.size, dtype=bool)
+        if token_ids.size > 1:
+            negated[1:] = is_negation[token_ids[:-1]] & (token_docs[1:] == token_docs[:-1])
+        token_polarity = np.where(negated, -token_polarity, token_polarity)
+
+        polar = token_polarity != 0
+        token_company = doc_company[token_docs[polar]]
+        token_group = token_company * 2 + doc_social[token_docs[polar]]
+
+        n_groups = len(names) * 2
+        sums = np.bincount(token_group, weights=token_polarity[polar], minlength=n_groups).reshape(-1, 2)
+        hits = np.bincount(token_group, minlength=n_groups).reshape(-1, 2)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            group_scores = np.where(hits > 0, 0.5 + 0.5 * sums / hits, 0.5)
+            overall = np.where(
+                hits.sum(axis=1) > 0,
+                0.5 + 0.5 * sums.sum(axis=1) / hits.sum(axis=1),
+                0.5
+            )
+
+        for company_idx, name in enumerate(names):
+            results[name]['sentiment'] = {
+                'website_sentiment': round(float(group_scores[company_idx, 0]), 3),
+                'social_sentiment': round(float(group_scores[company_idx, 1]), 3),
+                'overall_sentiment': round(float(overall[company_idx]), 3)
+            }
+
+    def _lookup_polarity(self, term: str) -> float:
+        """Поиск термина в лексиконе по самой длинной совпадающей основе"""
+
+        if term in self.lexicon:
+            return self.lexicon[term]
+        # Основы используются только для русского: английские слова сравниваются целиком
+        if not CYRILLIC_PATTERN.match(term):
+            return 0.0
+        for length in range(len(term) - 1, MIN_STEM_LENGTH - 1, -1):
+            stem = term[:length]
+            if stem in self.lexicon:
+                return self.lexicon[stem]
+        return 0.0
@@ -1,30 +1,46 @@
 """Рыночный анализатор"""
 
-import asyncio
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from analyzers.similarity_index import MinHashLSHIndex
+from analyzers.market_frame import MarketFrame
+from storage.metrics_store import MetricsStore
 
 
 class MarketAnalyzer:
     """Анализ рыночной позиции компании"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], similarity_index: Optional[MinHashLSHIndex] = None,
+                 metrics_store: Optional[MetricsStore] = None):
         self.config = config
         self.depth = config.get('market_analysis_depth', 'medium')
+        self.similarity_index = similarity_index
+        self.metrics_store = metrics_store
+        # Метрики всех проанализированных компаний для сравнения по рынку
+        self.market_frame = MarketFrame(config)
     
-    async def analyze(self, company_name: str, collected_data: Dict) -> Dict[str, Any]:
-        """Комплексный рыночный анализ"""
+    def analyze(self, company_name: str, collected_data: Dict) -> Dict[str, Any]:
+        """Комплексный рыночный анализ
+        
+        Синхронный: рыночная таблица, индекс сходства и соединение MetricsStore используются
+        в одном потоке (CompetitorAgent вызывает анализ в потоке своих хранилищ).
+        Метрики компании уже должны быть в market_frame: таблицу пополняет вызывающий,
+        сразу всем запуском, чтобы рыночные расчеты не повторялись для каждой компании
+        """
         
         market_analysis = {
-            'market_position': await self._analyze_market_position(company_name),
-            'competitors': await self._find_competitors(company_name),
-            'market_trends': await self._analyze_trends(company_name),
-            'swot_analysis': self._generate_swot(collected_data),
-            'recommendations': self._generate_recommendations(collected_data)
+            'market_position': self._analyze_market_position(company_name),
+            'competitors': self._find_competitors(company_name),
+            'similar_competitors': self._find_similar_competitors(company_name),
+            'market_trends': self._analyze_trends(company_name),
+            'market_comparison': self.market_frame.comparison(company_name),
+            'swot_analysis': self._generate_swot(company_name),
+            'recommendations': self._generate_recommendations(company_name)
         }
         
         return market_analysis
     
-    async def _analyze_market_position(self, company_name: str) -> Dict[str, Any]:
+    def _analyze_market_position(self, company_name: str) -> Dict[str, Any]:
         """Анализ рыночной позиции"""
         # В реальности здесь был бы поиск через Google/Yandex API
         return {
@@ -34,7 +50,7 @@ class MarketAnalyzer:
             'brand_recognition': 'Развивающийся бренд'
         }
     
-    async def _find_competitors(self, company_name: str) -> List[Dict[str, str]]:
+    def _find_competitors(self, company_name: str) -> List[Dict[str, str]]:
         """Поиск конкурентов"""
         # Упрощенный список - в реальности через поисковые API
         return [
@@ -55,9 +71,19 @@ class MarketAnalyzer:
             }
         ]
     
-    async def _analyze_trends(self, company_name: str) -> Dict[str, List[str]]:
+    def _find_similar_competitors(self, company_name: str) -> List[Dict[str, Any]]:
+        """Конкуренты с наиболее похожим позиционированием по MinHash-индексу страниц"""
+        
+        if self.similarity_index is None:
+            return []
+        
+        top_n = self.config.get('similar_competitors_count', 5)
+        return self.similarity_index.most_similar_companies(company_name, top_n)
+    
+    def _analyze_trends(self, company_name: str) -> Dict[str, Any]:
         """Анализ рыночных трендов"""
         return {
+            'company_metrics': self._company_metric_trends(company_name),
             'growing_trends': [
                 'Цифровая трансформация',
                 'Автоматизация процессов',
@@ -74,27 +100,33 @@ class MarketAnalyzer:
             ]
         }
     
-    def _generate_swot(self, data: Dict) -> Dict[str, List[str]]:
-        """SWOT анализ на основе собранных данных"""
+    def _company_metric_trends(self, company_name: str) -> Dict[str, Dict[str, Any]]:
+        """Тренды метрик компании из временных рядов (дельты и средние уже рассчитаны)"""
         
-        strengths = []
-        weaknesses = []
-        opportunities = []
-        threats = []
+        if self.metrics_store is None:
+            return {}
         
-        # Анализ сильных сторон
-        website_data = data.get('website_data', {})
-        if website_data.get('products'):
-            strengths.append('Разнообразная продуктовая линейка')
+        return {
+            metric: {
+                'value': point['value'],
+                'delta': point['delta'],
+                'growth_rate': point['growth_rate'],
+                'moving_average_7': point['ma_7'],
+                'moving_average_30': point['ma_30'],
+                'points': point['seq']
+            }
+            for metric, point in self.metrics_store.latest(company_name).items()
+        }
+    
+    def _generate_swot(self, company_name: str) -> Dict[str, List[str]]:
+        """SWOT анализ на основе сравнения с остальными компаниями рынка"""
         
-        if website_data.get('technologies'):
-            strengths.append('Использование современных технологий')
+        market_swot = self.market_frame.swot(company_name)
         
-        # Анализ слабых сторон
-        social_data = data.get('social_data', {})
-        total_followers = social_data.get('summary', {}).get('total_followers', 0)
-        if total_followers < 5000:
-            weaknesses.append('Низкая активность в социальных сетях')
+        strengths = list(market_swot['strengths'])
+        weaknesses = list(market_swot['weaknesses'])
+        opportunities = list(market_swot['opportunities'])
+        threats = list(market_swot['threats'])
         
         # Возможности и угрозы (базовые)
         opportunities.extend([
@@ -114,25 +146,10 @@ class MarketAnalyzer:
             'threats': threats
         }
     
-    def _generate_recommendations(self, data: Dict) -> List[str]:
+    def _generate_recommendations(self, company_name: str) -> List[str]:
         """Генерация рекомендаций"""
         
-        recommendations = []
-        
-        # Анализ социальных сетей
-        social_data = data.get('social_data', {})
-        total_followers = social_data.get('summary', {}).get('total_followers', 0)
-        
-        if total_followers < 5000:
-            recommendations.append('Усилить присутствие в социальных сетях')
-        
-        # Анализ сайта
-        website_data = data.get('website_data', {})
-        if not website_data.get('pricing'):
-            recommendations.append('Добавить прозрачную информацию о ценах')
-        
-        if len(website_data.get('technologies', [])) < 3:
-            recommendations.append('Показать больше технических преимуществ')
+        recommendations = list(self.market_frame.swot(company_name)['recommendations'])
         
         # Базовые рекомендации
         recommendations.extend([
@@ -0,0 +1,279 @@
+"""Колоночная таблица метрик всех проанализированных компаний для сравнения по рынку"""
+
+from __future__ import annotations
+
+import operator
+from typing import Dict, List, Any, Optional
+
+from utils.lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+
+# Метрики и направление: True - больше лучше, False - меньше лучше
+METRICS = {
+    'followers': True,
+    'quality_score': True,
+    'cta_count': True,
+    'technology_count': True,
+    'pricing_plans': True,
+    'products_count': True,
+    'load_time': False
+}
+
+METRIC_LABELS = {
+    'followers': 'аудитории в соцсетях',
+    'quality_score': 'качеству сайта',
+    'cta_count': 'количеству призывов к действию',
+    'technology_count': 'технологическому стеку',
+    'pricing_plans': 'количеству тарифных планов',
+    'products_count': 'продуктовой линейке',
+    'load_time': 'скорости загрузки'
+}
+
+# Правила с абсолютными порогами: (раздел, колонка, оператор, порог, текст)
+ABSOLUTE_RULES = [
+    ('strengths', 'products_count', '>', 0, 'Разнообразная продуктовая линейка'),
+    ('strengths', 'technology_count', '>', 0, 'Использование современных технологий'),
+    ('weaknesses', 'followers', '<', 5000, 'Низкая активность в социальных сетях'),
+    ('recommendations', 'followers', '<', 5000, 'Усилить присутствие в социальных сетях'),
+    ('recommendations', 'pricing_plans', '==', 0, 'Добавить прозрачную информацию о ценах'),
+    ('recommendations', 'technology_count', '<', 3, 'Показать больше технических преимуществ')
+]
+
+OPERATORS = {
+    '>': operator.gt,
+    '<': operator.lt,
+    '==': operator.eq
+}
+
+
+def extract_metrics(collected_data: Dict) -> Dict[str, float]:
+    """Числовые метрики компании из результатов CompetitorAgent"""
+
+    website_data = collected_data.get('website_data', {}) or {}
+    social_data = collected_data.get('social_data', {}) or {}
+    main_page = website_data.get('main_page', {}) or {}
+    additional_pages = website_data.get('additional_pages', {}) or {}
+    technical = website_data.get('technical', {}) or {}
+
+    technologies = main_page.get('technologies') or website_data.get('technologies', [])
+    pricing_page = additional_pages.get('pricing_page') or {}
+    pricing_plans = pricing_page.get('plans_found', len(website_data.get('pricing', [])))
+
+    return {
+        'followers': social_data.get('summary', {}).get('total_followers', 0),
+        'quality_score': website_data.get('summary', {}).get('site_quality_score', np.nan),
+        'cta_count': len(main_page.get('call_to_actions', [])),
+        'technology_count': len(technologies),
+        'pricing_plans': pricing_plans,
+        'products_count': len(website_data.get('products', [])),
+        'load_time': technical.get('load_time', np.nan)
+    }
+
+
+class MarketFrame:
+    """Сравнение компаний векторными операциями над всей таблицей метрик"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        # Меньше компаний - рыночные перцентили не имеют смысла
+        self.min_market_size = config.get('min_market_size', 5)
+        self.top_percentile = config.get('top_percentile', 0.75)
+        self.bottom_percentile = config.get('bottom_percentile', 0.25)
+
+        self._rows: Dict[str, Dict[str, float]] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        self._percentiles: Optional[pd.DataFrame] = None
+        self._rankings: Optional[pd.DataFrame] = None
+        self._swot: Optional[Dict[str, Dict[str, List[str]]]] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, company: str) -> bool:
+        return company in self._rows
+
+    def update(self, company: str, collected_data: Dict):
+        """Добавление или обновление метрик компании
+
+        Рыночные расчеты сбрасываются, только если метрики изменились
+        """
+
+        metrics = extract_metrics(collected_data)
+        if self._rows.get(company) == metrics:
+            return
+        self._rows[company] = metrics
+        self._frame = None
+        self._percentiles = None
+        self._rankings = None
+        self._swot = None
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Таблица метрик: строки - компании, колонки - метрики"""
+
+        if self._frame is None:
+            self._frame = pd.DataFrame.from_dict(
+                self._rows, orient='index', columns=list(METRICS), dtype='float64'
+            )
+        return self._frame
+
+    def percentiles(self) -> pd.DataFrame:
+        """Перцентиль компании по каждой метрике (1.0 - лучший результат на рынке)"""
+
+        if self._percentiles is not None:
+            return self._percentiles
+
+        frame = self.frame
+        higher = [metric for metric, better_high in METRICS.items() if better_high]
+        lower = [metric for metric, better_high in METRICS.items() if not better_high]
+
+        self._percentiles = pd.concat([
+            frame[higher].rank(pct=True, ascending=True),
+            frame[lower].rank(pct=True, ascending=False)
+        ], axis=1)[list(METRICS)]
+        return self._percentiles
+
+    def rankings(self) -> pd.DataFrame:
+        """Место компании по каждой метрике и по сумме перцентилей"""
+
+        if self._rankings is not None:
+            return self._rankings
+
+        frame = self.frame
+        ranks = pd.DataFrame(index=frame.index)
+        for metric, better_high in METRICS.items():
+            ranks[metric] = frame[metric].rank(ascending=not better_high, method='min')
+        ranks['overall'] = self.percentiles().mean(axis=1).rank(ascending=False, method='min')
+        self._rankings = ranks
+        return ranks
+
+    def comparison(self, company: str) -> Dict[str, Any]:
+        """Положение компании на рынке для отчета"""
+
+        if company not in self._rows:
+            return {}
+
+        percentiles = self.percentiles().loc[company]
+        ranks = self.rankings().loc[company]
+        medians = self.frame.median()
+
+        return {
+            'market_size': len(self),
+            'overall_rank': self._to_number(ranks['overall']),
+            'metrics': {
+                metric: {
+                    'value': self._to_number(self.frame.at[company, metric]),
+                    'market_median': self._to_number(medians[metric]),
+                    'percentile': self._to_number(percentiles[metric]),
+                    'rank': self._to_number(ranks[metric])
+                }
+                for metric in METRICS
+            }
+        }
+
+    def swot(self, company: str) -> Dict[str, List[str]]:
+        """SWOT и рекомендации компании (рассчитываются сразу для всего рынка)"""
+
+        if self._swot is None:
+            self._swot = self._compute_swot()
+        return self._swot.get(company, {
+            'strengths': [], 'weaknesses': [], 'opportunities': [], 'threats': [], 'recommendations': []
+        })
+
+    def _compute_swot(self) -> Dict[str, Dict[str, List[str]]]:
+        """Векторный расчет SWOT по всем компаниям: матрица компании x правила"""
+
+        frame = self.frame
+        companies = frame.index.tolist()
+        sections = ['strengths', 'weaknesses', 'opportunities', 'threats', 'recommendations']
+
+        rule_sections: List[str] = []
+        rule_texts: List[Any] = []
+        masks: List[np.ndarray] = []
+
+        # Абсолютные пороги работают при любом размере рынка
+        for section, metric, comparison, threshold, text in ABSOLUTE_RULES:
+            values = frame[metric].to_numpy()
+            masks.append(OPERATORS[comparison](np.nan_to_num(values, nan=0.0), threshold))
+            rule_sections.append(section)
+            rule_texts.append(text)
+
+        if len(frame) >= self.min_market_size:
+            self._add_market_rules(frame, rule_sections, rule_texts, masks)
+
+        matrix = np.column_stack(masks) if masks else np.zeros((len(companies), 0), dtype=bool)
+
+        result = {}
+        for row, company in enumerate(companies):
+            swot = {section: [] for section in sections}
+            for rule in np.flatnonzero(matrix[row]):
+                text = rule_texts[rule]
+                if callable(text):
+                    text = text(row)
+                swot[rule_sections[rule]].append(text)
+            result[company] = swot
+
+        return result
+
+    def _add_market_rules(self, frame: pd.DataFrame, rule_sections: List[str],
+                          rule_texts: List[Any], masks: List[np.ndarray]):
+        """Правила относительно рынка: перцентили, медианы и лидеры"""
+
+        percentiles = self.percentiles().to_numpy()
+        companies = frame.index.to_numpy()
+
+        for column, (metric, better_high) in enumerate(METRICS.items()):
+            label = METRIC_LABELS[metric]
+            metric_pct = percentiles[:, column]
+
+            top = np.nan_to_num(metric_pct, nan=0.0) >= self.top_percentile
+            masks.append(top)
+            rule_sections.append('strengths')
+            rule_texts.append(
+                lambda row, pct=metric_pct, label=label:
+                f'Опережает {self._share(pct[row])} конкурентов по {label}'
+            )
+
+            bottom = np.nan_to_num(metric_pct, nan=1.0) <= self.bottom_percentile
+            masks.append(bottom)
+            rule_sections.append('weaknesses')
+            rule_texts.append(f'Отстает от большинства конкурентов по {label}')
+
+            masks.append(bottom)
+            rule_sections.append('recommendations')
+            rule_texts.append(f'Подтянуть показатели по {label} до медианы рынка')
+
+            # Угроза: лидер рынка по метрике - другая компания
+            values = frame[metric]
+            if values.nunique() > 1:
+                leader = values.idxmax() if better_high else values.idxmin()
+                masks.append(companies != leader)
+                rule_sections.append('threats')
+                rule_texts.append(f'{leader} - лидер рынка по {label}')
+
+        # Возможность: большинство рынка не публикует цены
+        no_pricing = (frame['pricing_plans'].fillna(0) == 0).to_numpy()
+        if no_pricing.mean() > 0.5:
+            masks.append(np.ones(len(frame), dtype=bool))
+            rule_sections.append('opportunities')
+            rule_texts.append('Большинство конкурентов не публикует цены - прозрачные тарифы выделят компанию')
+
+        low_social = (frame['followers'].fillna(0) < 5000).to_numpy()
+        if low_social.mean() > 0.5:
+            masks.append(np.ones(len(frame), dtype=bool))
+            rule_sections.append('opportunities')
+            rule_texts.append('Рынок слабо представлен в соцсетях - можно занять лидирующую позицию')
+
+    def _share(self, percentile: float) -> str:
+        """Доля рынка, которую компания опережает, в процентах"""
+        return f'{int(round(percentile * 100))}%'
+
+    def _to_number(self, value) -> Optional[float]:
+        """Значение pandas в число для JSON (NaN -> None)"""
+        if pd.isna(value):
+            return None
+        value = float(value)
+        return int(value) if value.is_integer() else round(value, 3)
@@ -0,0 +1,260 @@
+"""MinHash + LSH индекс для поиска дубликатов страниц и похожих конкурентов"""
+
+from __future__ import annotations
+
+import pickle
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+
+MERSENNE_PRIME = (1 << 31) - 1
+MAX_HASH = (1 << 32) - 1
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Количество шинглов, хешируемых за один шаг (ограничивает размер временной матрицы)
+HASH_BATCH_SIZE = 4096
+
+
+class MinHashLSHIndex:
+    """Инкрементальный индекс MinHash-сигнатур страниц с LSH-бакетами"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.num_perm = config.get('minhash_permutations', 128)
+        self.bands = config.get('lsh_bands', 32)
+        self.rows = self.num_perm // self.bands
+        self.shingle_size = config.get('shingle_size', 5)
+        self.duplicate_threshold = config.get('duplicate_threshold', 0.8)
+        self.path = config.get('similarity_index_path')
+
+        rng = np.random.default_rng(config.get('minhash_seed', 1))
+        self._a = rng.integers(1, MERSENNE_PRIME, self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, self.num_perm, dtype=np.uint64)
+
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._doc_company: Dict[str, str] = {}
+        self._company_docs: Dict[str, set] = {}
+        self._doc_bands: Dict[str, List[bytes]] = {}
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(self.bands)]
+        self._company_signatures: Dict[str, np.ndarray] = {}
+        # Индекс менялся после загрузки или последнего сохранения
+        self.changed = False
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash-сигнатура текста по словесным шинглам"""
+
+        words = WORD_PATTERN.findall(text.lower())
+        if not words:
+            return None
+
+        size = min(self.shingle_size, len(words))
+        shingles = {
+            ' '.join(words[i:i + size]) for i in range(len(words) - size + 1)
+        }
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+
+        signature = np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        for start in range(0, hashes.size, HASH_BATCH_SIZE):
+            batch = hashes[start:start + HASH_BATCH_SIZE]
+            permuted = (np.outer(self._a, batch) + self._b[:, None]) % MERSENNE_PRIME
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+
+        return signature
+
+    def add(self, doc_id: str, text: str, company: str) -> List[Tuple[str, float]]:
+        """Добавление страницы в индекс
+
+        Возвращает найденные до добавления почти-дубликаты: [(doc_id, сходство)]
+        """
+
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        self.remove(doc_id)
+        duplicates = self._query_signature(signature, self.duplicate_threshold)
+        self._insert(doc_id, signature, company)
+        return duplicates
+
+    def add_canonical(self, doc_id: str, text: str, company: str) -> List[Tuple[str, float]]:
+        """Добавление страницы, только если она не копия другой проиндексированной страницы
+
+        Возвращает почти-дубликаты среди других страниц; если они есть, страница не
+        индексируется (и удаляется, если была проиндексирована раньше). В индексе остается
+        одна каноническая страница, и при повторных запусках она не помечается
+        дубликатом собственной копии
+        """
+
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        duplicates = [
+            match for match in self._query_signature(signature, self.duplicate_threshold)
+            if match[0] != doc_id
+        ]
+        if duplicates:
+            self.remove(doc_id)
+            return duplicates
+
+        self._insert(doc_id, signature, company)
+        return []
+
+    def remove(self, doc_id: str):
+        """Удаление страницы из LSH-бакетов"""
+
+        if doc_id not in self._signatures:
+            return
+        self.changed = True
+        for band, key in enumerate(self._doc_bands.pop(doc_id, [])):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+        self._signatures.pop(doc_id, None)
+        company = self._doc_company.pop(doc_id, None)
+        if company is not None:
+            self._company_docs[company].discard(doc_id)
+            self._rebuild_company_signature(company)
+
+    def find_duplicates(self, text: str, threshold: float = None) -> List[Tuple[str, float]]:
+        """Поиск почти-дубликатов текста среди проиндексированных страниц"""
+
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        return self._query_signature(signature, threshold or self.duplicate_threshold)
+
+    def most_similar_companies(self, company: str, top_n: int = 5) -> List[Dict[str, Any]]:
+        """Конкуренты с наиболее похожим содержимым сайтов и соцсетей"""
+
+        signature = self._company_signatures.get(company)
+        if signature is None or len(self._company_signatures) < 2:
+            return []
+
+        names = [name for name in self._company_signatures if name != company]
+        matrix = np.stack([self._company_signatures[name] for name in names])
+        similarity = (matrix == signature).mean(axis=1)
+
+        top = np.argsort(-similarity, kind='stable')[:top_n]
+        return [
+            {'company': names[i], 'similarity': round(float(similarity[i]), 3)}
+            for i in top if similarity[i] > 0
+        ]
+
+    def save(self, path: str = None):
+        """Сохранение индекса на диск"""
+
+        target = Path(path or self.path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            'params': (self.num_perm, self.bands, self.shingle_size),
+            'a': self._a,
+            'b': self._b,
+            'signatures': self._signatures,
+            'doc_company': self._doc_company
+        }
+        tmp_file = target.with_suffix(target.suffix + '.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_file.replace(target)
+        self.changed = False
+
+    @classmethod
+    def load(cls, config: Dict[str, Any]) -> 'MinHashLSHIndex':
+        """Загрузка индекса с диска (или пустой индекс, если файла нет)"""
+
+        index = cls(config)
+        if not index.path or not Path(index.path).exists():
+            return index
+
+        with open(index.path, 'rb') as f:
+            state = pickle.load(f)
+
+        # Сигнатуры несовместимы при смене параметров - начинаем заново
+        if state['params'] != (index.num_perm, index.bands, index.shingle_size):
+            return index
+
+        index._a = state['a']
+        index._b = state['b']
+        index._signatures = state['signatures']
+        index._doc_company = state['doc_company']
+        for doc_id, company in index._doc_company.items():
+            index._company_docs.setdefault(company, set()).add(doc_id)
+        for doc_id, signature in index._signatures.items():
+            band_keys = index._band_keys(signature)
+            index._doc_bands[doc_id] = band_keys
+            for band, key in enumerate(band_keys):
+                index._buckets[band].setdefault(key, set()).add(doc_id)
+        for company in list(index._company_docs):
+            index._rebuild_company_signature(company)
+
+        return index
+
+    def _insert(self, doc_id: str, signature: np.ndarray, company: str):
+        """Запись сигнатуры страницы в бакеты и сигнатуру компании"""
+
+        self.remove(doc_id)
+        self.changed = True
+
+        band_keys = self._band_keys(signature)
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, set()).add(doc_id)
+
+        self._signatures[doc_id] = signature
+        self._doc_company[doc_id] = company
+        self._company_docs.setdefault(company, set()).add(doc_id)
+        self._doc_bands[doc_id] = band_keys
+
+        # Сигнатура объединения шинглов всех страниц компании - поэлементный минимум
+        if company in self._company_signatures:
+            np.minimum(self._company_signatures[company], signature,
+                       out=self._company_signatures[company])
+        else:
+            self._company_signatures[company] = signature.copy()
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """Ключи LSH-бакетов: по одному на полосу сигнатуры"""
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _query_signature(self, signature: np.ndarray, threshold: float) -> List[Tuple[str, float]]:
+        """Кандидаты из LSH-бакетов с проверкой оценки сходства Жаккара"""
+
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        matches = []
+        for doc_id in candidates:
+            similarity = float((self._signatures[doc_id] == signature).mean())
+            if similarity >= threshold:
+                matches.append((doc_id, round(similarity, 3)))
+
+        return sorted(matches, key=lambda item: -item[1])
+
+    def _rebuild_company_signature(self, company: str):
+        """Пересчет сигнатуры компании после удаления страницы"""
+
+        signatures = [self._signatures[doc_id] for doc_id in self._company_docs.get(company, ())]
+        if signatures:
+            self._company_signatures[company] = np.minimum.reduce(signatures)
+        else:
+            self._company_signatures.pop(company, None)
+            self._company_docs.pop(company, None)
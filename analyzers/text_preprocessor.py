@@ -0,0 +1,236 @@
+"""Подготовка текста страниц перед анализом: удаление шаблонных блоков и разбиение на чанки"""
+
+import hashlib
+import math
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+from analyzers.similarity_index import MinHashLSHIndex
+
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?…])\s+")
+
+
+def normalize_block(text: str) -> str:
+    """Нормализация блока текста для сравнения между страницами"""
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def estimate_tokens(text: str) -> int:
+    """Оценка количества токенов без внешнего токенизатора
+
+    Латиница в среднем дает ~4 символа на токен, кириллица ~2.5
+    """
+
+    tokens = 0
+    for piece in TOKEN_PIECE_PATTERN.findall(text):
+        if piece.isascii():
+            tokens += math.ceil(len(piece) / 4)
+        else:
+            tokens += math.ceil(len(piece) / 2.5)
+    return tokens
+
+
+class TextPreprocessor:
+    """Удаление повторяющихся блоков сайта и нарезка текста по бюджету токенов"""
+
+    def __init__(self, config: Dict[str, Any], similarity_index: Optional[MinHashLSHIndex] = None):
+        self.config = config
+        self.similarity_index = similarity_index
+        self.model = config.get('openai_model', 'gpt-4')
+        self.chunk_tokens = config.get('chunk_tokens', config.get('max_tokens', 2000))
+        self.max_chunks = config.get('max_chunks', 4)
+        # Блок считается шаблонным, если встречается на такой доле страниц сайта
+        self.boilerplate_ratio = config.get('boilerplate_ratio', 0.5)
+        self.min_block_length = config.get('min_block_length', 3)
+        self._encoder = self._load_encoder()
+
+    def _load_encoder(self):
+        """Точный токенизатор модели, если установлен tiktoken"""
+        try:
+            import tiktoken
+            return tiktoken.encoding_for_model(self.model)
+        except Exception:
+            return None
+
+    def count_tokens(self, text: str) -> int:
+        """Подсчет токенов текста"""
+        if self._encoder is not None:
+            return len(self._encoder.encode(text))
+        return estimate_tokens(text)
+
+    def prepare(self, website_data: Dict, company: str = None) -> Dict[str, Any]:
+        """Очистка страниц сайта и разбиение на чанки для ИИ-анализа
+
+        website_data изменяется на месте: сырые блоки страниц ('text_blocks') заменяются
+        очищенным текстом ('clean_text'), чтобы сырые блоки не попадали в сохраненные
+        результаты. Страницы без 'text_blocks' (уже подготовленные) пропускаются.
+        Страницы, почти совпадающие с уже проиндексированными, помечаются 'duplicate_of'
+        и в анализ не попадают; без индекса сходства остается пометка, уже стоящая
+        на странице (повторный анализ сохраненных результатов)
+        """
+
+        company = company or website_data.get('company', '')
+
+        pages = self._collect_pages(website_data)
+        boilerplate = self._detect_boilerplate([blocks for _, _, blocks in pages])
+
+        stats = {
+            'pages': len(pages),
+            'blocks_total': 0,
+            'boilerplate_blocks': len(boilerplate),
+            'blocks_removed': 0,
+            'duplicate_pages': 0,
+            'tokens_raw': 0,
+            'tokens_clean': 0,
+            'tokens_sent': 0,
+            'chunks': 0,
+            'chunks_dropped': 0
+        }
+
+        clean_blocks = []
+        for name, page, blocks in pages:
+            kept = []
+            seen = set()
+            for block in blocks:
+                stats['blocks_total'] += 1
+                stats['tokens_raw'] += self.count_tokens(block)
+                key = self._block_key(block)
+                if key in boilerplate or key in seen:
+                    stats['blocks_removed'] += 1
+                    continue
+                seen.add(key)
+                kept.append(block)
+
+            page.pop('text_blocks', None)
+            page['clean_text'] = '\n'.join(kept)
+
+            if self.similarity_index is None:
+                duplicate_of = page.get('duplicate_of')
+            else:
+                duplicate_of = self._find_duplicate(company, name, page['clean_text'])
+            if duplicate_of:
+                page['duplicate_of'] = duplicate_of
+                stats['duplicate_pages'] += 1
+                continue
+
+            clean_blocks.extend((name, block) for block in kept)
+
+        chunks = self._build_chunks(clean_blocks)
+        stats['tokens_clean'] = sum(chunk['tokens'] for chunk in chunks)
+
+        if len(chunks) > self.max_chunks:
+            stats['chunks_dropped'] = len(chunks) - self.max_chunks
+            chunks = chunks[:self.max_chunks]
+
+        stats['chunks'] = len(chunks)
+        stats['tokens_sent'] = sum(chunk['tokens'] for chunk in chunks)
+
+        return {'chunks': chunks, 'stats': stats}
+
+    def _find_duplicate(self, company: str, page_name: str, text: str) -> Optional[str]:
+        """Поиск почти-дубликата страницы среди других страниц; уникальная страница индексируется
+
+        Копии в индекс не попадают, поэтому исходная страница остается канонической и
+        при следующих запусках не помечается дубликатом своей копии
+        """
+
+        if self.similarity_index is None or not text:
+            return None
+
+        duplicates = self.similarity_index.add_canonical(f"{company}:{page_name}", text, company)
+        return duplicates[0][0] if duplicates else None
+
+    def _collect_pages(self, website_data: Dict) -> List[Tuple[str, Dict, List[str]]]:
+        """Страницы сайта с сырыми блоками текста, главная страница первой"""
+
+        pages = []
+        candidates = [('main_page', website_data.get('main_page', {}))]
+        candidates.extend(website_data.get('additional_pages', {}).items())
+
+        for name, page in candidates:
+            if not isinstance(page, dict) or 'text_blocks' not in page:
+                continue
+            blocks = [normalize_block(block) for block in page['text_blocks']]
+            blocks = [block for block in blocks if len(block) >= self.min_block_length]
+            pages.append((name, page, blocks))
+
+        return pages
+
+    def _block_key(self, block: str) -> str:
+        """Ключ блока без учета регистра и цифр (даты, счетчики в футере)"""
+        canonical = re.sub(r"\d+", '0', block.lower())
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+    def _detect_boilerplate(self, pages_blocks: List[List[str]]) -> set:
+        """Поиск блоков, повторяющихся на большинстве страниц сайта"""
+
+        if len(pages_blocks) < 2:
+            return set()
+
+        page_counts = {}
+        for blocks in pages_blocks:
+            for key in {self._block_key(block) for block in blocks}:
+                page_counts[key] = page_counts.get(key, 0) + 1
+
+        threshold = max(2, math.ceil(len(pages_blocks) * self.boilerplate_ratio))
+        return {key for key, count in page_counts.items() if count >= threshold}
+
+    def _build_chunks(self, blocks: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Упаковка блоков в чанки, не превышающие бюджет токенов"""
+
+        chunks = []
+        current_parts = []
+        current_pages = []
+        current_tokens = 0
+
+        def flush():
+            nonlocal current_parts, current_pages, current_tokens
+            if current_parts:
+                chunks.append({
+                    'text': '\n'.join(current_parts),
+                    'tokens': current_tokens,
+                    'pages': current_pages
+                })
+            current_parts, current_pages, current_tokens = [], [], 0
+
+        for page_name, block in blocks:
+            for piece in self._split_block(block):
+                tokens = self.count_tokens(piece)
+                if current_tokens + tokens > self.chunk_tokens:
+                    flush()
+                current_parts.append(piece)
+                current_tokens += tokens
+                if page_name not in current_pages:
+                    current_pages.append(page_name)
+
+        flush()
+        return chunks
+
+    def _split_block(self, block: str) -> List[str]:
+        """Разбиение слишком длинного блока по предложениям, затем по словам"""
+
+        if self.count_tokens(block) <= self.chunk_tokens:
+            return [block]
+
+        pieces = []
+        for sentence in SENTENCE_PATTERN.split(block):
+            if self.count_tokens(sentence) <= self.chunk_tokens:
+                pieces.append(sentence)
+                continue
+
+            words = []
+            words_tokens = 0
+            for word in sentence.split(' '):
+                tokens = self.count_tokens(word)
+                if words and words_tokens + tokens > self.chunk_tokens:
+                    pieces.append(' '.join(words))
+                    words, words_tokens = [], 0
+                words.append(word)
+                words_tokens += tokens
+            if words:
+                pieces.append(' '.join(words))
+
+        return pieces
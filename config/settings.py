@@ -25,29 +25,84 @@ def get_default_config() -> Dict[str, Any]:
     
     return {
         'scraping': {
-            'delay': 1,  # Задержка между запросами в секундах
             'timeout': 30,  # Таймаут запроса в секундах
+            'initial_per_host': 2,  # Начальный лимит одновременных запросов к хосту
+            'max_per_host': 8,  # Верхняя граница лимита (AIMD)
+            'max_retries': 2,  # Повторы при 429/503 и таймаутах
+            'max_retry_after': 60,  # Максимальная пауза по Retry-After в секундах
+            'latency_tolerance': 3.0,  # Рост задержки, считающийся перегрузкой хоста
+            'archive_mode': '',  # record - сохранять ответы в архив, replay - работать только из архива
+            'archive_dir': 'data/http_archive',  # Архив HTTP-ответов
             'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'max_pages': 10  # Максимальное количество страниц для анализа
+            'max_pages': 10,  # Максимальное количество страниц для анализа
+            'required_pages': ['pricing', 'about', 'customers', 'blog']  # Обход останавливается, когда найдены все
         },
         'social': {
             'platforms': ['twitter', 'linkedin', 'facebook'],
-            'max_posts': 50  # Максимальное количество постов для анализа
+            'max_posts': 50,  # Максимальное количество постов для анализа
+            'page_size': 20,  # Постов за один запрос к API платформы
+            # Ключи API по платформам; без ключа используется локальный мок
+            'twitter': {'bearer_token': ''},
+            'facebook': {'access_token': ''},
+            'linkedin': {'access_token': ''},
+            'instagram': {'access_token': ''}
         },
         'analysis': {
             'openai_api_key': '',  # Ваш OpenAI API ключ
             'openai_model': 'gpt-4',
             'max_tokens': 2000,
-            'languages': ['ru', 'en']
+            'languages': ['ru', 'en'],
+            'keywords_top_k': 10,  # Количество ключевых слов TF-IDF на компанию
+            'chunk_tokens': 2000,  # Размер чанка текста для ИИ-анализа в токенах
+            'max_chunks': 4,  # Максимум чанков на компанию
+            'boilerplate_ratio': 0.5,  # Доля страниц, на которых блок считается шаблонным
+            'duplicate_threshold': 0.8,  # Сходство Жаккара, выше которого страница - дубликат
+            'similarity_index_path': 'data/similarity_index.pkl'  # MinHash-индекс страниц
         },
         'market': {
             'search_engines': ['google', 'yandex'],
-            'market_analysis_depth': 'medium'  # low, medium, high
+            'market_analysis_depth': 'medium',  # low, medium, high
+            'similar_competitors_count': 5,  # Количество похожих конкурентов в отчете
+            'min_market_size': 5  # Минимум компаний для сравнения по перцентилям рынка
         },
         'reports': {
             'format': 'html',  # html, pdf, json
             'include_charts': True,
-            'language': 'ru'
+            'charts_cache_dir': 'data/charts',  # Кеш изображений графиков по хешу данных
+            'chart_workers': 0,  # Процессов для рендеринга графиков (0 - по числу ядер)
+            'language': 'ru',
+            'mode': 'full',  # full - полный отчет, changes - только изменения
+            'dashboard': True,  # Сводный дашборд по всем компаниям
+            'dashboard_recent_changes': 20  # Компаний в блоке последних изменений
+        },
+        'history': {
+            'snapshots_dir': 'data/snapshots',  # Снимки данных для поиска изменений
+            'keep_snapshots': 30,  # Сколько снимков хранить на компанию
+            'store_pages': True,  # Сохранять исходный HTML страниц
+            'pages_dir': 'data/pages',  # Сегменты со сжатым HTML и индекс смещений
+            'page_segment_mb': 256,  # Размер сегмента, после которого начинается новый
+            'ignore_fields': ['timestamp', 'load_time', 'total_time', 'timing', 'fetched_at',
+                              'text_blocks', 'clean_text', 'duplicate_of', 'error', 'date',
+                              'new_posts']  # Изменчивые поля
+        },
+        'results': {
+            'results_dir': 'data/results',  # Результаты запусков в компактном формате
+            'format': 'msgpack',  # msgpack, json
+            'compression': 'zstd',  # zstd или пусто - без сжатия
+            'compression_level': 3
+        },
+        'export': {
+            'parquet': True,  # Экспорт запусков в Parquet для аналитики (нужен pyarrow)
+            'parquet_dir': 'data/parquet',  # Датасет, партиционированный по дате
+            'parquet_compression': 'zstd'
+        },
+        'service': {
+            'host': '127.0.0.1',  # Адрес HTTP API (main.py --serve)
+            'port': 8080,
+            'freshness_hours': 24,  # Результаты моложе отдаются без нового анализа
+            'max_concurrent': 2,  # Одновременных анализов
+            'max_pending': 8,  # Анализов в очереди; сверх этого - 503 с Retry-After
+            'cache_size': 128  # Компаний, чьи результаты держатся в памяти
         },
         'database': {
             'type': 'sqlite',  # sqlite, postgresql
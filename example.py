@@ -49,6 +49,8 @@ async def main():
         except Exception as e:
             print(f"❌ Ошибка при анализе {company}: {e}")
     
+    await agent.close()
+    
     print("\n🎉 Анализ всех компаний завершен!")
     print("📁 Отчеты сохранены в папке reports/")
 
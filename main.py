@@ -6,30 +6,82 @@
 import click
 import asyncio
 from pathlib import Path
+from typing import Optional, Tuple
 
 from agents.competitor_agent import CompetitorAgent
 from config.settings import load_config
 
 
+async def run_analysis(agent: CompetitorAgent, targets: Tuple[str, ...], output: str):
+    try:
+        await agent.analyze_competitors(list(targets), output)
+    finally:
+        await agent.close()
+
+
+async def run_reanalysis(agent: CompetitorAgent, targets: Tuple[str, ...], output: str,
+                         workers: Optional[int]) -> int:
+    try:
+        return len(await agent.reanalyze(list(targets), output, workers))
+    finally:
+        await agent.close()
+
+
 @click.command()
-@click.option('--target', required=True, help='Название компании-конкурента для анализа')
+@click.option('--target', multiple=True, help='Название компании-конкурента для анализа (можно несколько)')
 @click.option('--config', default='config/default.yaml', help='Путь к файлу конфигурации')
 @click.option('--output', default='reports/', help='Папка для сохранения отчетов')
-def main(target: str, config: str, output: str):
+@click.option('--archive', type=click.Choice(['record', 'replay']), default=None,
+              help='record - сохранить ответы сайтов в архив, replay - анализ из архива без сети')
+@click.option('--reanalyze', is_flag=True,
+              help='Повторить анализ и отчеты по сохраненным данным без скрапинга '
+                   '(без --target - для всех сохраненных компаний)')
+@click.option('--workers', type=int, default=None, help='Процессов для повторного анализа (по умолчанию - все ядра)')
+@click.option('--serve', is_flag=True, help='Запустить HTTP API для анализа по запросу')
+@click.option('--port', type=int, default=None, help='Порт HTTP API (по умолчанию - из конфигурации)')
+def main(target: Tuple[str, ...], config: str, output: str, archive: str, reanalyze: bool,
+         workers: Optional[int], serve: bool, port: Optional[int]):
     """Запуск анализа конкурента"""
     
+    if not target and not reanalyze and not serve:
+        raise click.UsageError("Укажите --target, --reanalyze или --serve")
+    
     # Загрузка конфигурации
     config_data = load_config(config)
+    if archive:
+        config_data.setdefault('scraping', {})['archive_mode'] = archive
     
     # Создание агента
     agent = CompetitorAgent(config_data)
     
+    if serve:
+        # aiohttp.web нужен только сервису
+        from agents.service import CompetitorService, web
+        
+        service_config = {**config_data.get('service', {}), 'output_dir': output}
+        service = CompetitorService(service_config, agent)
+        web.run_app(
+            service.app(),
+            host=service_config.get('host', '127.0.0.1'),
+            port=port or service_config.get('port', 8080)
+        )
+        return 0
+    
+    if reanalyze:
+        try:
+            count = asyncio.run(run_reanalysis(agent, target, output, workers))
+            click.echo(f"Повторный анализ завершен для {count} компаний. Отчеты сохранены в {output}")
+        except Exception as e:
+            click.echo(f"Ошибка при повторном анализе: {e}", err=True)
+            return 1
+        return 0
+    
     # Запуск анализа
-    click.echo(f"Начинаем анализ конкурента: {target}")
+    click.echo(f"Начинаем анализ конкурента: {', '.join(target)}")
     
     try:
         # Асинхронный запуск анализа
-        asyncio.run(agent.analyze_competitor(target, output))
+        asyncio.run(run_analysis(agent, target, output))
         click.echo(f"Анализ завершен. Отчеты сохранены в {output}")
     except Exception as e:
         click.echo(f"Ошибка при анализе: {e}", err=True)
@@ -0,0 +1,176 @@
+"""Графики для отчетов: рендеринг в пуле процессов с кешем по хешу входных данных"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from scrapers.site_quality import quality_breakdown
+
+
+# Меняется при изменении оформления: старые изображения в кеше перестают совпадать
+CHART_STYLE_VERSION = 1
+
+
+def build_chart_specs(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Описания графиков по результатам анализа (только данные, без matplotlib)"""
+
+    specs = {}
+    platforms = (data.get('social_data', {}) or {}).get('platforms', {}) or {}
+    platforms = {name: values for name, values in platforms.items() if 'error' not in values}
+
+    if platforms:
+        specs['social_followers'] = {
+            'kind': 'bar',
+            'title': 'Подписчики по платформам',
+            'labels': list(platforms),
+            'values': [values.get('followers', 0) for values in platforms.values()]
+        }
+        engagement = [values.get('engagement_rate', 0) or 0 for values in platforms.values()]
+        if any(engagement):
+            specs['social_engagement'] = {
+                'kind': 'bar',
+                'title': 'Вовлеченность, %',
+                'labels': list(platforms),
+                'values': engagement
+            }
+
+    website_data = data.get('website_data', {}) or {}
+    if website_data.get('main_page'):
+        breakdown = quality_breakdown(
+            website_data['main_page'], website_data.get('additional_pages'), website_data.get('technical')
+        )
+        specs['quality_breakdown'] = {
+            'kind': 'barh',
+            'title': 'Оценка качества сайта по критериям',
+            'labels': [item['criterion'] for item in breakdown],
+            'values': [item['score'] for item in breakdown],
+            'limits': [item['max'] for item in breakdown]
+        }
+
+    market_analysis = data.get('market_analysis', {}) or {}
+    metrics = (market_analysis.get('market_comparison') or {}).get('metrics', {})
+    percentiles = {
+        metric: values['percentile'] for metric, values in metrics.items()
+        if values.get('percentile') is not None
+    }
+    if percentiles:
+        specs['market_percentiles'] = {
+            'kind': 'barh',
+            'title': 'Перцентиль на рынке',
+            'labels': list(percentiles),
+            'values': [round(value * 100, 1) for value in percentiles.values()],
+            'limits': [100] * len(percentiles)
+        }
+
+    similar = market_analysis.get('similar_competitors') or []
+    if similar:
+        specs['similar_competitors'] = {
+            'kind': 'barh',
+            'title': 'Сходство контента с конкурентами',
+            'labels': [item['company'] for item in similar],
+            'values': [item['similarity'] for item in similar]
+        }
+
+    return specs
+
+
+def chart_key(spec: Dict[str, Any]) -> str:
+    """Хеш входных данных графика"""
+
+    payload = json.dumps(
+        {'style': CHART_STYLE_VERSION, 'spec': spec}, sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def render_chart(spec: Dict[str, Any], path: str) -> str:
+    """Рендеринг одного графика в PNG (выполняется в дочернем процессе)"""
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    labels = spec['labels']
+    values = spec['values']
+
+    height = max(3.0, 0.45 * len(labels) + 1.2) if spec['kind'] == 'barh' else 4.0
+    fig, ax = plt.subplots(figsize=(7, height))
+    try:
+        if spec['kind'] == 'barh':
+            positions = range(len(labels))
+            if spec.get('limits'):
+                ax.barh(positions, spec['limits'], color='#e6e6e6')
+            ax.barh(positions, values, color='#007acc')
+            ax.set_yticks(list(positions))
+            ax.set_yticklabels(labels)
+            ax.invert_yaxis()
+        else:
+            ax.bar(labels, values, color='#007acc')
+        ax.set_title(spec.get('title', ''))
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        fig.tight_layout()
+
+        # Атомарная запись: параллельный процесс не прочитает недописанный файл
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        fig.savefig(tmp_path, format='png', dpi=100)
+        os.replace(tmp_path, path)
+    finally:
+        plt.close(fig)
+
+    return path
+
+
+class ChartRenderer:
+    """Рендеринг графиков вне event loop с переиспользованием неизменившихся изображений"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.cache_dir = Path(config.get('charts_cache_dir', 'data/charts'))
+        self.workers = config.get('chart_workers') or None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def render(self, specs: Dict[str, Dict[str, Any]]) -> Dict[str, Path]:
+        """Пути к изображениям графиков; рендерятся только отсутствующие в кеше"""
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+
+        names = list(specs)
+        futures = []
+        for name in names:
+            key = chart_key(specs[name])
+            path = self.cache_dir / f'{key}.png'
+            if path.exists():
+                futures.append(self._done(loop, path))
+                continue
+
+            # Одинаковые графики из параллельных отчетов рендерятся один раз
+            future = self._pending.get(key)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                future = loop.run_in_executor(self._executor, render_chart, specs[name], str(path))
+                self._pending[key] = future
+                future.add_done_callback(lambda _, key=key: self._pending.pop(key, None))
+            futures.append(future)
+
+        paths = await asyncio.gather(*futures)
+        return {name: Path(path) for name, path in zip(names, paths)}
+
+    def _done(self, loop: asyncio.AbstractEventLoop, path: Path) -> asyncio.Future:
+        future = loop.create_future()
+        future.set_result(str(path))
+        return future
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
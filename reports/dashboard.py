@@ -0,0 +1,246 @@
+"""Сводный дашборд по всем компаниям с инкрементальной пересборкой"""
+
+import html
+import math
+import os
+from datetime import datetime
+from pathlib import Path
+from string import Template
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from analyzers.change_detector import ChangeDetector
+from analyzers.market_frame import extract_metrics
+from reports.report_generator import write_atomic
+from storage.serialization import ResultSerializer, dumps_json, loads_json
+
+
+DASHBOARD_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Дашборд конкурентов</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
+        .header { background: #f4f4f4; padding: 20px; border-radius: 5px; }
+        .section { margin: 30px 0; padding: 20px; border-left: 4px solid #007acc; }
+        .metric { background: #f9f9f9; padding: 10px; margin: 10px 0; border-radius: 3px; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        th, td { padding: 8px 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background-color: #f2f2f2; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📈 Дашборд конкурентов</h1>
+        <p><strong>Компаний:</strong> $companies_count &nbsp; <strong>Обновлен:</strong> $generated_at</p>
+    </div>
+
+    <div class="section">
+        <h2>🏆 Рейтинг по качеству сайта</h2>
+        <table>
+            <tr><th>#</th><th>Компания</th><th>Оценка</th><th>Подписчики</th></tr>
+            $ranking_rows
+        </table>
+    </div>
+
+    <div class="section">
+        <h2>📊 Сравнение компаний</h2>
+        <table>
+            <tr><th>Компания</th><th>Анализ</th><th>Оценка</th><th>Подписчики</th><th>CTA</th>
+                <th>Технологии</th><th>Тарифы</th><th>Продукты</th><th>Загрузка, с</th></tr>
+            $comparison_rows
+        </table>
+    </div>
+
+    <div class="section">
+        <h2>🔄 Последние изменения</h2>
+        $changes
+    </div>
+</body>
+</html>
+""")
+
+COMPARISON_ROW_TEMPLATE = Template(
+    "<tr><td>$company</td><td>$timestamp</td><td>$quality_score</td><td>$followers</td>"
+    "<td>$cta_count</td><td>$technology_count</td><td>$pricing_plans</td>"
+    "<td>$products_count</td><td>$load_time</td></tr>"
+)
+
+RANKING_ROW_TEMPLATE = Template(
+    "<tr><td>$position</td><td>$company</td><td>$quality_score</td><td>$followers</td></tr>"
+)
+
+CHANGES_TEMPLATE = Template("""
+        <div class="metric">
+            <strong>$company</strong> ($timestamp): добавлено $added, удалено $removed, изменено $changed
+            <ul>$items</ul>
+        </div>
+""")
+
+CACHE_VERSION = 1
+
+
+class DashboardGenerator:
+    """Дашборд по последним результатам всех компаний из ResultSerializer
+
+    HTML-фрагменты компаний кешируются рядом с дашбордом и пересобираются
+    только для компаний, у которых появился новый файл результатов.
+    """
+
+    def __init__(self, config: Dict[str, Any], serializer: ResultSerializer):
+        self.config = config
+        self.serializer = serializer
+        self.recent_changes = config.get('dashboard_recent_changes', 20)
+        self.changes_per_company = config.get('dashboard_changes_per_company', 10)
+        self.file_name = config.get('dashboard_file', 'dashboard.html')
+        # Сколько компаний пересобрано при последней сборке
+        self.last_rebuilt = 0
+
+    def build(self, output_dir: str) -> Path:
+        """Сборка дашборда; возвращает путь к HTML"""
+
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        cache_file = output_path / f'.{self.file_name}.cache'
+
+        cache = self._load_cache(cache_file)
+        entries: Dict[str, Dict[str, Any]] = {}
+        self.last_rebuilt = 0
+
+        for slug, result_file, key in self._latest_results():
+            entry = cache.get(slug)
+            if entry is None or entry['key'] != key:
+                entry = self._build_entry(key, self.serializer.load(result_file))
+                self.last_rebuilt += 1
+            entries[slug] = entry
+
+        dashboard_file = output_path / self.file_name
+        write_atomic(dashboard_file, self._render(entries))
+
+        if self.last_rebuilt or entries.keys() != cache.keys():
+            payload = dumps_json({'version': CACHE_VERSION, 'entries': entries})
+            write_atomic(cache_file, payload.decode('utf-8'))
+
+        return dashboard_file
+
+    def _latest_results(self) -> Iterator[Tuple[str, Path, str]]:
+        """Последний файл результатов каждой компании и ключ его версии"""
+
+        root = self.serializer.root
+        if not root.exists():
+            return
+
+        for company_dir in os.scandir(root):
+            if not company_dir.is_dir():
+                continue
+            latest: Optional[os.DirEntry] = None
+            for entry in os.scandir(company_dir.path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    if latest is None or entry.name > latest.name:
+                        latest = entry
+            if latest is None:
+                continue
+            stat = latest.stat()
+            key = f'{latest.name}:{stat.st_size}:{stat.st_mtime_ns}'
+            yield company_dir.name, Path(latest.path), key
+
+    def _load_cache(self, cache_file: Path) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(cache_file, 'rb') as f:
+                cache = loads_json(f.read())
+        except (OSError, ValueError):
+            return {}
+        if cache.get('version') != CACHE_VERSION:
+            return {}
+        return cache.get('entries', {})
+
+    def _build_entry(self, key: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Метрики и готовые HTML-фрагменты одной компании"""
+
+        company = results.get('company', 'Unknown')
+        timestamp = results.get('timestamp')
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.strftime('%Y-%m-%d %H:%M')
+        timestamp = str(timestamp or '')
+
+        metrics = {
+            metric: (None if isinstance(value, float) and math.isnan(value) else value)
+            for metric, value in extract_metrics(results).items()
+        }
+
+        row = COMPARISON_ROW_TEMPLATE.substitute(
+            company=html.escape(company),
+            timestamp=timestamp,
+            **{metric: self._format_value(value) for metric, value in metrics.items()}
+        )
+
+        return {
+            'key': key,
+            'company': company,
+            'timestamp': timestamp,
+            'metrics': metrics,
+            'row': row,
+            'changes': self._format_changes(company, timestamp, results.get('changes') or {})
+        }
+
+    def _format_changes(self, company: str, timestamp: str, changes: Dict) -> str:
+        if not changes.get('changes'):
+            return ''
+
+        summary = changes.get('summary', {})
+        items = ''.join(
+            f'<li>{html.escape(ChangeDetector.describe(change))}</li>'
+            for change in changes['changes'][:self.changes_per_company]
+        )
+        return CHANGES_TEMPLATE.substitute(
+            company=html.escape(company),
+            timestamp=timestamp,
+            added=summary.get('added', 0),
+            removed=summary.get('removed', 0),
+            changed=summary.get('changed', 0),
+            items=items
+        )
+
+    def _render(self, entries: Dict[str, Dict[str, Any]]) -> str:
+        """Сборка страницы из кешированных фрагментов"""
+
+        ordered = sorted(entries.values(), key=lambda entry: entry['company'].lower())
+
+        ranked = sorted(
+            (entry for entry in ordered if entry['metrics'].get('quality_score') is not None),
+            key=lambda entry: (
+                -entry['metrics']['quality_score'], -(entry['metrics'].get('followers') or 0)
+            )
+        )
+        ranking_rows = ''.join(
+            RANKING_ROW_TEMPLATE.substitute(
+                position=position,
+                company=html.escape(entry['company']),
+                quality_score=self._format_value(entry['metrics']['quality_score']),
+                followers=self._format_value(entry['metrics'].get('followers'))
+            )
+            for position, entry in enumerate(ranked, 1)
+        )
+
+        recent = sorted(
+            (entry for entry in ordered if entry['changes']),
+            key=lambda entry: entry['timestamp'], reverse=True
+        )[:self.recent_changes]
+        changes_html = ''.join(entry['changes'] for entry in recent)
+
+        return DASHBOARD_TEMPLATE.substitute(
+            companies_count=len(entries),
+            generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            ranking_rows=ranking_rows or '<tr><td colspan="4">Нет оценок качества сайтов</td></tr>',
+            comparison_rows=''.join(entry['row'] for entry in ordered),
+            changes=changes_html or '<p>Изменений не обнаружено</p>'
+        )
+
+    def _format_value(self, value: Any) -> str:
+        if value is None:
+            return '—'
+        if isinstance(value, float):
+            return f'{value:.2f}' if not value.is_integer() else str(int(value))
+        return str(value)
@@ -1,107 +1,315 @@
 """Генератор отчетов по анализу конкурентов"""
 
 import asyncio
-import json
+import os
+import shutil
+import tempfile
 from datetime import datetime
 from pathlib import Path
+from string import Template
 from typing import Dict, Any
 
+from analyzers.change_detector import ChangeDetector
+from reports.charts import ChartRenderer, build_chart_specs
+from storage.serialization import dumps_json, report_json
 
-class ReportGenerator:
-    """Генерация отчетов в различных форматах"""
-    
-    def __init__(self, config: Dict[str, Any]):
-        self.config = config
-        self.format = config.get('format', 'html')
-        self.language = config.get('language', 'ru')
-    
-    async def generate_report(self, analysis_data: Dict[str, Any], output_dir: str):
-        """Генерация основного отчета"""
-        
-        # Создаем папку для отчетов
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        
-        # Генерируем отчеты в разных форматах
-        if self.format == 'html':
-            await self._generate_html_report(analysis_data, output_path)
-        
-        await self._generate_json_report(analysis_data, output_path)
-        await self._generate_summary(analysis_data, output_path)
-    
-    async def _generate_html_report(self, data: Dict, output_path: Path):
-        """Генерация HTML отчета"""
-        
-        company_name = data.get('company', 'Unknown')
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        html_content = f"""
+
+# Шаблоны компилируются один раз при импорте и переиспользуются для всех отчетов
+HTML_TEMPLATE = Template("""
 <!DOCTYPE html>
 <html lang="ru">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Анализ конкурента: {company_name}</title>
+    <title>Анализ конкурента: $company_name</title>
     <style>
-        body {{ font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }}
-        .header {{ background: #f4f4f4; padding: 20px; border-radius: 5px; }}
-        .section {{ margin: 30px 0; padding: 20px; border-left: 4px solid #007acc; }}
-        .metric {{ background: #f9f9f9; padding: 10px; margin: 10px 0; border-radius: 3px; }}
-        .recommendation {{ background: #e8f5e8; padding: 15px; margin: 10px 0; border-radius: 5px; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background-color: #f2f2f2; }}
+        body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
+        .header { background: #f4f4f4; padding: 20px; border-radius: 5px; }
+        .section { margin: 30px 0; padding: 20px; border-left: 4px solid #007acc; }
+        .metric { background: #f9f9f9; padding: 10px; margin: 10px 0; border-radius: 3px; }
+        .recommendation { background: #e8f5e8; padding: 15px; margin: 10px 0; border-radius: 5px; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background-color: #f2f2f2; }
+        .chart { display: inline-block; margin: 10px; }
+        .chart img { max-width: 100%; }
     </style>
 </head>
 <body>
     <div class="header">
-        <h1>🔍 Анализ конкурента: {company_name}</h1>
-        <p><strong>Дата анализа:</strong> {timestamp}</p>
+        <h1>🔍 Анализ конкурента: $company_name</h1>
+        <p><strong>Дата анализа:</strong> $timestamp</p>
     </div>
     
     <div class="section">
         <h2>📊 Основные метрики</h2>
-        {self._format_website_metrics(data.get('website_data', {}))}
-        {self._format_social_metrics(data.get('social_data', {}))}
+        $website_metrics
+        $social_metrics
+    </div>
+    
+    <div class="section">
+        <h2>⚙️ Технический анализ</h2>
+        $technical
+    </div>
+    
+    $charts
+    
+    <div class="section">
+        <h2>🔄 Изменения с прошлого анализа</h2>
+        $changes
     </div>
     
     <div class="section">
         <h2>🎯 Анализ контента</h2>
-        {self._format_content_analysis(data.get('content_analysis', {}))}
+        $content_analysis
     </div>
     
     <div class="section">
         <h2>🏪 Рыночный анализ</h2>
-        {self._format_market_analysis(data.get('market_analysis', {}))}
+        $market_analysis
     </div>
     
     <div class="section">
         <h2>💡 Рекомендации</h2>
-        {self._format_recommendations(data.get('market_analysis', {}).get('recommendations', []))}
+        $recommendations
     </div>
 </body>
 </html>
-        """
+        """)
+
+WEBSITE_METRICS_TEMPLATE = Template("""
+        <div class="metric">
+            <strong>Сайт:</strong> $url<br>
+            <strong>Заголовок:</strong> $title<br>
+            <strong>Описание:</strong> $description<br>
+            <strong>Продукты:</strong> $products_count найдено<br>
+            <strong>Технологии:</strong> $technologies
+        </div>
+        """)
+
+TECHNICAL_TEMPLATE = Template("""
+        <div class="metric">
+            <strong>HTTPS:</strong> $https_enabled<br>
+            <strong>Мобильная версия:</strong> $mobile_friendly<br>
+            <strong>sitemap.xml:</strong> $has_sitemap, <strong>robots.txt:</strong> $has_robots<br>
+            <strong>Время ответа сервера:</strong> $load_time (полное время запроса: $total_time)
+        </div>
+        <table>
+            <tr><th>Фаза запроса</th><th>Время, мс</th></tr>
+            $phases
+        </table>
+        """)
+
+# Фазы загрузки главной страницы в порядке выполнения
+TIMING_PHASES = [
+    ('queue', 'Ожидание в очереди'),
+    ('dns', 'DNS'),
+    ('connect', 'Соединение (TCP + TLS)'),
+    ('ttfb', 'Ожидание первого байта'),
+    ('download', 'Загрузка'),
+    ('total', 'Всего')
+]
+
+SOCIAL_METRICS_TEMPLATE = Template("""
+        <div class="metric">
+            <strong>Общее количество подписчиков:</strong> $total_followers<br>
+            <strong>Наиболее активная платформа:</strong> $most_active_platform<br>
+            <strong>Платформы:</strong> $platforms
+        </div>
+        """)
+
+CONTENT_ANALYSIS_TEMPLATE = Template("""
+        <div class="metric">
+            <strong>Ключевые темы:</strong> $topics<br>
+            <strong>Общая тональность:</strong> $sentiment<br>
+            <strong>Позиционирование:</strong> $value_proposition
+        </div>
+        """)
+
+MARKET_ANALYSIS_TEMPLATE = Template("""
+        <div class="metric">
+            <strong>Рыночная позиция:</strong> $market_share<br>
+            <strong>Сегмент:</strong> $market_segment<br>
+            <strong>Основные конкуренты:</strong>
+            <ul>$competitors</ul>
+        </div>
+        """)
+
+CHARTS_TEMPLATE = Template("""
+    <div class="section">
+        <h2>📈 Графики</h2>
+        $images
+    </div>""")
+
+CHANGES_TEMPLATE = Template("""
+        <div class="metric">
+            <strong>С $previous_timestamp:</strong>
+            добавлено $added, удалено $removed, изменено $changed
+            <ul>$items</ul>
+        </div>
+        """)
+
+SUMMARY_TEMPLATE = Template("""
+# Краткое резюме: $company_name
+
+## Ключевые находки:
+- Подписчиков в соцсетях: $total_followers
+- Продуктов на сайте: $products_count
+- Используемые технологии: $technologies_count
+
+## Главные рекомендации:
+""")
+
+CHANGES_SUMMARY_TEMPLATE = Template("""
+# Изменения: $company_name
+
+Предыдущий анализ: $previous_timestamp
+
+""")
+
+
+def write_atomic(path: Path, content: str):
+    """Запись через временный файл и rename: читатель не увидит недописанный отчет"""
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ReportGenerator:
+    """Генерация отчетов в различных форматах"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.format = config.get('format', 'html')
+        self.language = config.get('language', 'ru')
+        self.mode = config.get('mode', 'full')
+        self.chart_renderer = ChartRenderer(config) if config.get('include_charts', True) else None
+    
+    async def generate_report(self, analysis_data: Dict[str, Any], output_dir: str):
+        """Генерация основного отчета"""
+        
+        # Создаем папку для отчетов
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        
+        # В режиме changes сохраняем только журнал изменений
+        if self.mode == 'changes':
+            await self._generate_changes_report(analysis_data, output_path)
+            return
+        
+        # Отчеты в разных форматах готовятся и записываются параллельно
+        tasks = [
+            self._generate_json_report(analysis_data, output_path),
+            self._generate_summary(analysis_data, output_path)
+        ]
+        if self.format == 'html':
+            tasks.append(self._generate_html_report(analysis_data, output_path))
+        
+        await asyncio.gather(*tasks)
+    
+    async def _write_file(self, path: Path, content: str):
+        """Атомарная запись файла в потоке, не блокируя event loop"""
+        await asyncio.to_thread(write_atomic, path, content)
+    
+    async def _generate_html_report(self, data: Dict, output_path: Path):
+        """Генерация HTML отчета"""
+        
+        company_name = data.get('company', 'Unknown')
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        html_content = HTML_TEMPLATE.substitute(
+            company_name=company_name,
+            timestamp=timestamp,
+            charts=await self._render_charts(data, output_path),
+            website_metrics=self._format_website_metrics(data.get('website_data', {})),
+            social_metrics=self._format_social_metrics(data.get('social_data', {})),
+            technical=self._format_technical(data.get('website_data', {}).get('technical', {})),
+            changes=self._format_changes(data.get('changes', {})),
+            content_analysis=self._format_content_analysis(data.get('content_analysis', {})),
+            market_analysis=self._format_market_analysis(data.get('market_analysis', {})),
+            recommendations=self._format_recommendations(
+                data.get('market_analysis', {}).get('recommendations', [])
+            )
+        )
         
         # Сохраняем HTML файл
-        html_file = output_path / f"{company_name}_analysis.html"
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        await self._write_file(output_path / f"{company_name}_analysis.html", html_content)
+    
+    async def _render_charts(self, data: Dict, output_path: Path) -> str:
+        """Графики отчета: изображения берутся из кеша или рендерятся в пуле процессов"""
+        
+        if self.chart_renderer is None:
+            return ""
+        
+        specs = build_chart_specs(data)
+        if not specs:
+            return ""
+        
+        rendered = await self.chart_renderer.render(specs)
+        
+        # Копии изображений рядом с HTML, чтобы отчет открывался без кеша
+        charts_dir = output_path / 'charts'
+        company_name = data.get('company', 'Unknown')
+        targets = {name: charts_dir / f"{company_name}_{name}.png" for name in rendered}
+        
+        def copy_images():
+            charts_dir.mkdir(exist_ok=True)
+            for name, source in rendered.items():
+                shutil.copyfile(source, targets[name])
+        
+        await asyncio.to_thread(copy_images)
+        
+        images = "".join(
+            f'<div class="chart"><img src="charts/{target.name}" alt="{specs[name]["title"]}"></div>'
+            for name, target in targets.items()
+        )
+        return CHARTS_TEMPLATE.substitute(images=images)
     
     def _format_website_metrics(self, website_data: Dict) -> str:
         """Форматирование метрик сайта"""
         if not website_data:
             return "<p>Данные о сайте недоступны</p>"
         
-        return f"""
-        <div class="metric">
-            <strong>Сайт:</strong> {website_data.get('url', 'N/A')}<br>
-            <strong>Заголовок:</strong> {website_data.get('title', 'N/A')}<br>
-            <strong>Описание:</strong> {website_data.get('description', 'N/A')}<br>
-            <strong>Продукты:</strong> {len(website_data.get('products', []))} найдено<br>
-            <strong>Технологии:</strong> {', '.join(website_data.get('technologies', []))}
-        </div>
-        """
+        return WEBSITE_METRICS_TEMPLATE.substitute(
+            url=website_data.get('url', 'N/A'),
+            title=website_data.get('title', 'N/A'),
+            description=website_data.get('description', 'N/A'),
+            products_count=len(website_data.get('products', [])),
+            technologies=', '.join(website_data.get('technologies', []))
+        )
+    
+    def _format_technical(self, technical: Dict) -> str:
+        """Технические характеристики сайта и фазы загрузки главной страницы"""
+        if not technical:
+            return "<p>Технический анализ недоступен</p>"
+        
+        def seconds(value) -> str:
+            return f"{value:.2f} с" if isinstance(value, (int, float)) else 'N/A'
+        
+        timing = technical.get('timing') or {}
+        phases = "".join(
+            f"<tr><td>{label}</td><td>{timing[phase] * 1000:.0f}</td></tr>"
+            for phase, label in TIMING_PHASES if phase in timing
+        )
+        
+        return TECHNICAL_TEMPLATE.substitute(
+            https_enabled='да' if technical.get('https_enabled') else 'нет',
+            mobile_friendly='да' if technical.get('mobile_friendly') else 'нет',
+            has_sitemap='есть' if technical.get('has_sitemap') else 'нет',
+            has_robots='есть' if technical.get('has_robots') else 'нет',
+            load_time=seconds(technical.get('load_time')),
+            total_time=seconds(technical.get('total_time')),
+            phases=phases
+        )
     
     def _format_social_metrics(self, social_data: Dict) -> str:
         """Форматирование метрик соцсетей"""
@@ -109,13 +317,11 @@ class ReportGenerator:
             return "<p>Данные о социальных сетях недоступны</p>"
         
         summary = social_data.get('summary', {})
-        return f"""
-        <div class="metric">
-            <strong>Общее количество подписчиков:</strong> {summary.get('total_followers', 0)}<br>
-            <strong>Наиболее активная платформа:</strong> {summary.get('most_active_platform', 'N/A')}<br>
-            <strong>Платформы:</strong> {', '.join(social_data.get('platforms', {}).keys())}
-        </div>
-        """
+        return SOCIAL_METRICS_TEMPLATE.substitute(
+            total_followers=summary.get('total_followers', 0),
+            most_active_platform=summary.get('most_active_platform', 'N/A'),
+            platforms=', '.join(social_data.get('platforms', {}).keys())
+        )
     
     def _format_content_analysis(self, content_analysis: Dict) -> str:
         """Форматирование анализа контента"""
@@ -125,13 +331,11 @@ class ReportGenerator:
         topics = content_analysis.get('key_topics', [])
         sentiment = content_analysis.get('sentiment', {})
         
-        return f"""
-        <div class="metric">
-            <strong>Ключевые темы:</strong> {', '.join(topics[:5])}<br>
-            <strong>Общая тональность:</strong> {sentiment.get('overall_sentiment', 0):.2f}<br>
-            <strong>Позиционирование:</strong> {content_analysis.get('brand_positioning', {}).get('value_proposition', 'N/A')}
-        </div>
-        """
+        return CONTENT_ANALYSIS_TEMPLATE.substitute(
+            topics=', '.join(topics[:5]),
+            sentiment=f"{sentiment.get('overall_sentiment', 0):.2f}",
+            value_proposition=content_analysis.get('brand_positioning', {}).get('value_proposition', 'N/A')
+        )
     
     def _format_market_analysis(self, market_analysis: Dict) -> str:
         """Форматирование рыночного анализа"""
@@ -141,64 +345,92 @@ class ReportGenerator:
         position = market_analysis.get('market_position', {})
         competitors = market_analysis.get('competitors', [])
         
-        competitors_html = ""
-        for comp in competitors[:3]:
-            competitors_html += f"<li><strong>{comp.get('name')}:</strong> {comp.get('market_share')} - {comp.get('strengths')}</li>"
+        competitors_html = "".join(
+            f"<li><strong>{comp.get('name')}:</strong> {comp.get('market_share')} - {comp.get('strengths')}</li>"
+            for comp in competitors[:3]
+        )
         
-        return f"""
-        <div class="metric">
-            <strong>Рыночная позиция:</strong> {position.get('market_share', 'N/A')}<br>
-            <strong>Сегмент:</strong> {position.get('market_segment', 'N/A')}<br>
-            <strong>Основные конкуренты:</strong>
-            <ul>{competitors_html}</ul>
-        </div>
-        """
+        return MARKET_ANALYSIS_TEMPLATE.substitute(
+            market_share=position.get('market_share', 'N/A'),
+            market_segment=position.get('market_segment', 'N/A'),
+            competitors=competitors_html
+        )
+    
+    def _format_changes(self, changes: Dict) -> str:
+        """Форматирование журнала изменений"""
+        if not changes or changes.get('first_snapshot'):
+            return "<p>Первый анализ - сравнивать не с чем</p>"
+        
+        if not changes.get('changes'):
+            return "<p>Изменений не обнаружено</p>"
+        
+        summary = changes.get('summary', {})
+        items_html = "".join(
+            f"<li>{ChangeDetector.describe(change)}</li>" for change in changes['changes'][:50]
+        )
+        
+        return CHANGES_TEMPLATE.substitute(
+            previous_timestamp=changes.get('previous_timestamp', 'N/A'),
+            added=summary.get('added', 0),
+            removed=summary.get('removed', 0),
+            changed=summary.get('changed', 0),
+            items=items_html
+        )
     
     def _format_recommendations(self, recommendations: list) -> str:
         """Форматирование рекомендаций"""
         if not recommendations:
             return "<p>Рекомендации не сгенерированы</p>"
         
-        rec_html = ""
-        for i, rec in enumerate(recommendations, 1):
-            rec_html += f'<div class="recommendation">{i}. {rec}</div>'
-        
-        return rec_html
+        return "".join(
+            f'<div class="recommendation">{i}. {rec}</div>'
+            for i, rec in enumerate(recommendations, 1)
+        )
     
     async def _generate_json_report(self, data: Dict, output_path: Path):
         """Генерация JSON отчета для API интеграции"""
         
         json_file = output_path / f"{data.get('company', 'unknown')}_data.json"
         
-        # Добавляем метаинформацию
-        data['meta'] = {
-            'generated_at': datetime.now().isoformat(),
-            'version': '1.0',
-            'format': 'competitor_analysis'
-        }
-        
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+        # Отчет с метаинформацией строится из копии; сериализация уходит в поток
+        content = await asyncio.to_thread(report_json, data)
+        await self._write_file(json_file, content)
     
     async def _generate_summary(self, data: Dict, output_path: Path):
         """Генерация краткого резюме"""
         company_name = data.get('company', 'Unknown')
         
-        summary = f"""
-# Краткое резюме: {company_name}
-
-## Ключевые находки:
-- Подписчиков в соцсетях: {data.get('social_data', {}).get('summary', {}).get('total_followers', 0)}
-- Продуктов на сайте: {len(data.get('website_data', {}).get('products', []))}
-- Используемые технологии: {len(data.get('website_data', {}).get('technologies', []))}
-
-## Главные рекомендации:
-"""
+        summary = SUMMARY_TEMPLATE.substitute(
+            company_name=company_name,
+            total_followers=data.get('social_data', {}).get('summary', {}).get('total_followers', 0),
+            products_count=len(data.get('website_data', {}).get('products', [])),
+            technologies_count=len(data.get('website_data', {}).get('technologies', []))
+        )
         
         recommendations = data.get('market_analysis', {}).get('recommendations', [])
-        for i, rec in enumerate(recommendations[:3], 1):
-            summary += f"{i}. {rec}\n"
+        summary += "".join(f"{i}. {rec}\n" for i, rec in enumerate(recommendations[:3], 1))
+        
+        await self._write_file(output_path / f"{company_name}_summary.md", summary)
+    
+    async def _generate_changes_report(self, data: Dict, output_path: Path):
+        """Генерация отчета только об изменениях с прошлого анализа"""
+        company_name = data.get('company', 'Unknown')
+        changes = data.get('changes', {})
+        
+        summary = CHANGES_SUMMARY_TEMPLATE.substitute(
+            company_name=company_name,
+            previous_timestamp=changes.get('previous_timestamp') or 'нет'
+        )
+        
+        if changes.get('first_snapshot'):
+            summary += "Первый анализ - сравнивать не с чем\n"
+        elif not changes.get('changes'):
+            summary += "Изменений не обнаружено\n"
+        else:
+            summary += "".join(f"- {ChangeDetector.describe(change)}\n" for change in changes['changes'])
         
-        summary_file = output_path / f"{company_name}_summary.md"
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write(summary)
+        changes_json = dumps_json({'company': company_name, **changes}, pretty=True).decode('utf-8')
+        await asyncio.gather(
+            self._write_file(output_path / f"{company_name}_changes.md", summary),
+            self._write_file(output_path / f"{company_name}_changes.json", changes_json)
+        )
@@ -1,25 +1,112 @@
 """Улучшенный скрапер для анализа веб-сайтов конкурентов"""
 
+from __future__ import annotations
+
 import asyncio
-import aiohttp
-import requests
-from bs4 import BeautifulSoup
-from typing import Dict, List, Any, Optional
-from urllib.parse import urljoin, urlparse, quote
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urljoin, quote
 import re
 import time
 from datetime import datetime
 
+from scrapers.http_client import HttpClient, HttpResponse
+from scrapers.records import CTA, SocialLink, Form, Testimonial, PricingPlan
+from scrapers.site_quality import quality_score
+from scrapers.url_utils import SOCIAL_PLATFORM_NAMES, classify_link, host_category, parse_url
+from storage.page_store import PageStore
+from utils.lazy import lazy_import
+
+# Парсер загружается при разборе первой страницы
+bs4 = lazy_import('bs4')
+
+
+# Теги, текст которых не относится к содержимому страницы
+NON_CONTENT_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head', 'title'}
+
+# Мета-тег viewport - признак адаптивной верстки
+VIEWPORT_PATTERN = re.compile(r'<meta[^>]+name=["\']viewport["\']', re.IGNORECASE)
+
+# Типы дополнительных страниц: ключевые слова адреса и текста ссылки, ценность страницы
+PAGE_TYPES = {
+    'pricing': {
+        'paths': ('pricing', 'prices', 'price', 'plans', 'tariffs', 'tarify', 'ceny'),
+        'texts': ('pricing', 'prices', 'plans', 'тарифы', 'цены', 'стоимость'),
+        'value': 10
+    },
+    'about': {
+        'paths': ('about', 'about-us', 'company', 'team', 'o-nas', 'o-kompanii'),
+        'texts': ('about', 'company', 'team', 'о нас', 'о компании', 'команда'),
+        'value': 6
+    },
+    'customers': {
+        'paths': ('customers', 'clients', 'case-studies', 'cases', 'stories', 'testimonials'),
+        'texts': ('customers', 'clients', 'case studies', 'клиенты', 'кейсы', 'отзывы'),
+        'value': 5
+    },
+    'blog': {
+        'paths': ('blog', 'news', 'articles', 'insights', 'novosti', 'stati'),
+        'texts': ('blog', 'news', 'articles', 'блог', 'новости', 'статьи'),
+        'value': 4
+    }
+}
+
+# Страницы, которые нужно найти до остановки обхода
+DEFAULT_REQUIRED_PAGES = ('pricing', 'about', 'customers', 'blog')
+
+# Ссылки на файлы, а не на страницы
+SKIPPED_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.zip', '.xml', '.mp4')
+
+CURRENCY_SYMBOLS = ('$', '€', '£', '₽', '¥')
+
+# Блочные элементы, по которым текст страницы делится на блоки
+BLOCK_TAGS = {
+    'p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'section', 'article', 'header',
+    'footer', 'nav', 'aside', 'main', 'td', 'th', 'blockquote', 'figcaption', 'dt', 'dd',
+    'form', 'label', 'button', 'body'
+}
+
+
+def extract_text_blocks(soup: bs4.BeautifulSoup) -> List[str]:
+    """Разбиение видимого текста страницы на блоки по блочным элементам"""
+
+    blocks = {}
+
+    for string in soup.find_all(string=True):
+        if isinstance(string, (bs4.Comment, bs4.Doctype)):
+            continue
+        if string.parent is None or string.parent.name in NON_CONTENT_TAGS:
+            continue
+        text = string.strip()
+        if not text:
+            continue
+
+        container = next(
+            (parent for parent in string.parents if parent.name in BLOCK_TAGS),
+            string.parent
+        )
+        blocks.setdefault(id(container), []).append(text)
+
+    return [' '.join(parts) for parts in blocks.values()]
+
 
 class EnhancedWebsiteScraper:
     """Улучшенный скрапер для глубокого анализа сайтов"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], http: Optional[HttpClient] = None,
+                 page_store: Optional[PageStore] = None):
         self.config = config
-        self.delay = config.get('delay', 1)
         self.timeout = config.get('timeout', 30)
         self.user_agent = config.get('user_agent', 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
         self.max_pages = config.get('max_pages', 5)
+        self.required_pages = tuple(config.get('required_pages') or DEFAULT_REQUIRED_PAGES)
+        # Частота запросов к каждому хосту подбирается клиентом (см. HttpClient)
+        self.http = http or HttpClient(config)
+        # Ответы главных страниц для технического анализа (без повторной загрузки)
+        self._main_responses: Dict[str, HttpResponse] = {}
+        # Исходный HTML загруженных страниц для повторного разбора
+        self.page_store = page_store
+        # Ссылки главных страниц для выбора дополнительных страниц
+        self._link_candidates: Dict[str, Tuple[List[Tuple[str, str]], List[str]]] = {}
         
     async def scrape_company_site(self, company_name: str) -> Dict[str, Any]:
         """Комплексный анализ сайта компании"""
@@ -89,23 +176,21 @@ class EnhancedWebsiteScraper:
             # Используем DuckDuckGo Instant Answer API (бесплатно)
             search_url = f"https://api.duckduckgo.com/?q={quote(query)}&format=json&no_html=1&skip_disambig=1"
             
-            async with aiohttp.ClientSession() as session:
-                headers = {'User-Agent': self.user_agent}
+            headers = {'User-Agent': self.user_agent}
+            response = await self.http.get(search_url, headers=headers, timeout=10)
+            if response.status == 200:
+                data = response.json()
+                
+                # Проверяем результаты
+                if data.get('AbstractURL'):
+                    return data['AbstractURL']
                 
-                async with session.get(search_url, headers=headers, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Проверяем результаты
-                        if data.get('AbstractURL'):
-                            return data['AbstractURL']
-                        
-                        # Проверяем Related Topics
-                        for topic in data.get('RelatedTopics', []):
-                            if isinstance(topic, dict) and topic.get('FirstURL'):
-                                url = topic['FirstURL']
-                                if self._is_valid_company_url(url, query.split()[0]):
-                                    return url
+                # Проверяем Related Topics
+                for topic in data.get('RelatedTopics', []):
+                    if isinstance(topic, dict) and topic.get('FirstURL'):
+                        url = topic['FirstURL']
+                        if self._is_valid_company_url(url, query.split()[0]):
+                            return url
                                     
         except Exception as e:
             print(f"Ошибка поиска в DuckDuckGo: {e}")
@@ -115,28 +200,22 @@ class EnhancedWebsiteScraper:
     def _is_valid_company_url(self, url: str, company_name: str) -> bool:
         """Проверяем, что URL похож на официальный сайт компании"""
         
-        domain = urlparse(url).netloc.lower()
         company_clean = company_name.lower().replace(' ', '').replace('"', '')
         
         # Исключаем социальные сети и агрегаторы
-        excluded_domains = ['facebook.com', 'twitter.com', 'linkedin.com', 'instagram.com', 
-                          'youtube.com', 'wikipedia.org', 'crunchbase.com', 'glassdoor.com']
-        
-        for excluded in excluded_domains:
-            if excluded in domain:
-                return False
+        if host_category(url) is not None:
+            return False
         
         # Проверяем, содержит ли домен название компании
-        return company_clean in domain
+        return company_clean in parse_url(url).host
     
     async def _verify_website(self, url: str) -> bool:
         """Проверяем доступность сайта"""
         
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {'User-Agent': self.user_agent}
-                async with session.head(url, headers=headers, timeout=10) as response:
-                    return response.status in [200, 301, 302]
+            headers = {'User-Agent': self.user_agent}
+            response = await self.http.head(url, headers=headers, timeout=10)
+            return response.status in [200, 301, 302]
         except:
             return False
     
@@ -157,67 +236,85 @@ class EnhancedWebsiteScraper:
             'technologies': [],
             'forms': [],
             'images_count': 0,
-            'links_analysis': {}
+            'links_analysis': {},
+            'text_blocks': []
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {'User-Agent': self.user_agent}
+            headers = {'User-Agent': self.user_agent}
+            response = await self.http.get(url, headers=headers, timeout=self.timeout)
+            self._main_responses[url] = response
+            if response.status == 200:
+                await self._store_page(url, response, data)
+                html = response.text()
+                soup = bs4.BeautifulSoup(html, 'html.parser')
+                
+                # Базовая информация
+                data['title'] = soup.find('title').get_text().strip() if soup.find('title') else ''
+                
+                meta_desc = soup.find('meta', attrs={'name': 'description'})
+                data['description'] = meta_desc.get('content', '').strip() if meta_desc else ''
+                
+                # H1 заголовки
+                data['h1_tags'] = [h1.get_text().strip() for h1 in soup.find_all('h1')]
+                
+                # Навигационное меню
+                data['navigation_menu'] = self._extract_navigation(soup)
+                
+                # Call-to-action кнопки
+                data['call_to_actions'] = self._extract_cta_buttons(soup)
+                
+                # Контактная информация
+                data['contact_info'] = self._extract_contact_info(soup)
+                
+                # Value propositions
+                data['value_propositions'] = self._extract_value_props(soup)
+                
+                # Отзывы и testimonials
+                data['testimonials'] = self._extract_testimonials(soup)
+                
+                # Упоминания цен
+                data['pricing_mentioned'] = self._check_pricing_mentions(soup)
+                
+                # Технологии
+                data['technologies'] = self._detect_technologies(soup, html)
+                
+                # Формы
+                data['forms'] = self._extract_forms(soup)
+                
+                # Подсчет элементов
+                data['images_count'] = len(soup.find_all('img'))
+                
+                # Анализ ссылок и ссылки на соцсети за один проход
+                data['links_analysis'], data['social_links'], internal_links = self._analyze_links(
+                    soup, url
+                )
+                self._link_candidates[url] = (internal_links, data['navigation_menu'])
+                
+                # Блоки текста для очистки от шаблонных элементов
+                data['text_blocks'] = extract_text_blocks(soup)
                 
-                async with session.get(url, headers=headers, timeout=self.timeout) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Базовая информация
-                        data['title'] = soup.find('title').get_text().strip() if soup.find('title') else ''
-                        
-                        meta_desc = soup.find('meta', attrs={'name': 'description'})
-                        data['description'] = meta_desc.get('content', '').strip() if meta_desc else ''
-                        
-                        # H1 заголовки
-                        data['h1_tags'] = [h1.get_text().strip() for h1 in soup.find_all('h1')]
-                        
-                        # Навигационное меню
-                        data['navigation_menu'] = self._extract_navigation(soup)
-                        
-                        # Call-to-action кнопки
-                        data['call_to_actions'] = self._extract_cta_buttons(soup)
-                        
-                        # Социальные ссылки
-                        data['social_links'] = self._extract_social_links(soup)
-                        
-                        # Контактная информация
-                        data['contact_info'] = self._extract_contact_info(soup)
-                        
-                        # Value propositions
-                        data['value_propositions'] = self._extract_value_props(soup)
-                        
-                        # Отзывы и testimonials
-                        data['testimonials'] = self._extract_testimonials(soup)
-                        
-                        # Упоминания цен
-                        data['pricing_mentioned'] = self._check_pricing_mentions(soup)
-                        
-                        # Технологии
-                        data['technologies'] = self._detect_technologies(soup, html)
-                        
-                        # Формы
-                        data['forms'] = self._extract_forms(soup)
-                        
-                        # Подсчет элементов
-                        data['images_count'] = len(soup.find_all('img'))
-                        
-                        # Анализ ссылок
-                        data['links_analysis'] = self._analyze_links(soup, url)
-                        
         except Exception as e:
             data['error'] = str(e)
         
-        await asyncio.sleep(self.delay)  # Задержка между запросами
         return data
     
-    def _extract_navigation(self, soup: BeautifulSoup) -> List[str]:
+    async def _store_page(self, url: str, response: HttpResponse, page: Dict[str, Any]):
+        """Сохранение HTML страницы вне event loop (сжатие и запись в индекс)
+        
+        Время загрузки записывается в данные страницы: по нему повторный анализ находит
+        именно эту версию HTML. Ответы из архива уже были сохранены при записи.
+        """
+        if self.page_store is None or self.http.archive_mode == 'replay':
+            return
+        fetched_at = datetime.now()
+        await asyncio.to_thread(self.page_store.put, url, response.body, fetched_at)
+        page['fetched_at'] = fetched_at.isoformat()
+    
+    async def close(self):
+        await self.http.close()
+    
+    def _extract_navigation(self, soup: bs4.BeautifulSoup) -> List[str]:
         """Извлечение пунктов главного меню"""
         
         nav_items = []
@@ -233,9 +330,10 @@ class EnhancedWebsiteScraper:
                         nav_items.append(text)
                 break
         
-        return list(set(nav_items))[:10]  # Топ-10 уникальных пунктов
+        # Порядок пунктов сохраняется: позиция в меню учитывается при выборе страниц
+        return list(dict.fromkeys(nav_items))[:10]  # Топ-10 уникальных пунктов
     
-    def _extract_cta_buttons(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    def _extract_cta_buttons(self, soup: bs4.BeautifulSoup) -> List[CTA]:
         """Извлечение Call-to-Action кнопок"""
         
         cta_buttons = []
@@ -251,11 +349,7 @@ class EnhancedWebsiteScraper:
                 href = element.get('href', '')
                 
                 if text and len(text) < 100:
-                    cta_buttons.append({
-                        'text': text,
-                        'url': href,
-                        'type': self._categorize_cta(text, href)
-                    })
+                    cta_buttons.append(CTA(text, href, self._categorize_cta(text, href)))
         
         return cta_buttons[:10]
     
@@ -275,34 +369,7 @@ class EnhancedWebsiteScraper:
         else:
             return 'other'
     
-    def _extract_social_links(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        """Извлечение ссылок на социальные сети"""
-        
-        social_links = []
-        social_platforms = {
-            'twitter.com': 'Twitter',
-            'linkedin.com': 'LinkedIn', 
-            'facebook.com': 'Facebook',
-            'instagram.com': 'Instagram',
-            'youtube.com': 'YouTube',
-            'github.com': 'GitHub'
-        }
-        
-        links = soup.find_all('a', href=True)
-        for link in links:
-            href = link.get('href', '').lower()
-            
-            for platform_domain, platform_name in social_platforms.items():
-                if platform_domain in href:
-                    social_links.append({
-                        'platform': platform_name,
-                        'url': link.get('href')
-                    })
-                    break
-        
-        return social_links
-    
-    def _extract_contact_info(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _extract_contact_info(self, soup: bs4.BeautifulSoup) -> Dict[str, Any]:
         """Извлечение контактной информации"""
         
         contact = {
@@ -335,7 +402,7 @@ class EnhancedWebsiteScraper:
         
         return contact
     
-    def _extract_value_props(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_value_props(self, soup: bs4.BeautifulSoup) -> List[str]:
         """Извлечение ценностных предложений"""
         
         value_props = []
@@ -348,7 +415,7 @@ class EnhancedWebsiteScraper:
         
         return value_props[:5]
     
-    def _extract_testimonials(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    def _extract_testimonials(self, soup: bs4.BeautifulSoup) -> List[Testimonial]:
         """Извлечение отзывов клиентов"""
         
         testimonials = []
@@ -360,14 +427,13 @@ class EnhancedWebsiteScraper:
                 quote_text = element.get_text().strip()
                 
                 if quote_text and len(quote_text) > 20:
-                    testimonials.append({
-                        'text': quote_text[:200] + '...' if len(quote_text) > 200 else quote_text,
-                        'author': 'Unknown'
-                    })
+                    testimonials.append(Testimonial(
+                        quote_text[:200] + '...' if len(quote_text) > 200 else quote_text
+                    ))
         
         return testimonials[:3]
     
-    def _check_pricing_mentions(self, soup: BeautifulSoup) -> bool:
+    def _check_pricing_mentions(self, soup: bs4.BeautifulSoup) -> bool:
         """Проверяем упоминания цен на главной странице"""
         
         text_content = soup.get_text().lower()
@@ -375,7 +441,7 @@ class EnhancedWebsiteScraper:
         
         return any(keyword in text_content for keyword in pricing_keywords)
     
-    def _detect_technologies(self, soup: BeautifulSoup, html: str) -> List[str]:
+    def _detect_technologies(self, soup: bs4.BeautifulSoup, html: str) -> List[str]:
         """Определение используемых технологий"""
         
         technologies = []
@@ -402,54 +468,336 @@ class EnhancedWebsiteScraper:
         
         return list(set(technologies))
     
-    def _extract_forms(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    def _extract_forms(self, soup: bs4.BeautifulSoup) -> List[Form]:
         """Анализ форм на сайте"""
         
         forms = []
         form_elements = soup.find_all('form')
         
         for form in form_elements:
-            form_data = {
-                'fields_count': len(form.find_all(['input', 'select', 'textarea'])),
-                'has_email_field': bool(form.find('input', {'type': 'email'})),
-                'purpose': 'unknown'
-            }
+            form_data = Form(
+                fields_count=len(form.find_all(['input', 'select', 'textarea'])),
+                has_email_field=bool(form.find('input', {'type': 'email'}))
+            )
             
             # Определяем назначение формы
             form_text = form.get_text().lower()
             if 'newsletter' in form_text or 'subscribe' in form_text:
-                form_data['purpose'] = 'newsletter'
+                form_data.purpose = 'newsletter'
             elif 'contact' in form_text:
-                form_data['purpose'] = 'contact'
+                form_data.purpose = 'contact'
             elif 'login' in form_text or 'signin' in form_text:
-                form_data['purpose'] = 'login'
+                form_data.purpose = 'login'
             
             forms.append(form_data)
         
         return forms
     
-    def _analyze_links(self, soup: BeautifulSoup, base_url: str) -> Dict[str, int]:
-        """Анализ ссылок на странице"""
+    def _analyze_links(self, soup: bs4.BeautifulSoup, base_url: str
+                       ) -> Tuple[Dict[str, int], List[SocialLink], List[Tuple[str, str]]]:
+        """Анализ ссылок на странице, ссылки на соцсети и внутренние страницы (адрес, текст)"""
         
         all_links = soup.find_all('a', href=True)
-        base_domain = urlparse(base_url).netloc
+        base_domain = parse_url(base_url).domain
         
         internal_count = 0
         external_count = 0
+        social_links = []
+        internal_links = []
         
         for link in all_links:
             href = link.get('href')
-            if href.startswith('http'):
-                link_domain = urlparse(href).netloc
-                if link_domain == base_domain:
-                    internal_count += 1
-                else:
-                    external_count += 1
+            link_type, platform = classify_link(href, base_domain)
+            if link_type == 'external':
+                external_count += 1
+            elif link_type == 'social':
+                external_count += 1
+                social_links.append(SocialLink(SOCIAL_PLATFORM_NAMES[platform], href))
             else:
-                internal_count += 1  # Относительные ссылки считаем внутренними
+                # Относительные и служебные ссылки (mailto:, tel:) считаем внутренними
+                internal_count += 1
+                if link_type == 'internal':
+                    internal_links.append((urljoin(base_url, href), link.get_text().strip()))
         
-        return {
+        analysis = {
             'internal_links': internal_count,
             'external_links': external_count,
             'total_links': len(all_links)
         }
+        return analysis, social_links, internal_links
+    
+    async def _scrape_additional_pages(self, website_url: str) -> Dict[str, Any]:
+        """Дополнительные страницы (цены, о компании, клиенты, блог) в порядке ценности
+        
+        В каждом раунде параллельно загружается лучший кандидат для каждого еще не найденного
+        типа страницы, а если бюджета не хватает на все типы - самые ценные из кандидатов;
+        обход прекращается, как только найдены все типы из required_pages, либо исчерпан
+        бюджет max_pages (главная страница входит в бюджет). Загружаются только страницы,
+        ссылки на которые есть на главной
+        """
+        
+        links, navigation = self._link_candidates.pop(website_url, ([], []))
+        candidates = self._rank_candidates(website_url, links, navigation)
+        budget = max(self.max_pages - 1, 0)
+        pages: Dict[str, Any] = {}
+        missing = [page_type for page_type in self.required_pages if candidates.get(page_type)]
+        
+        while missing and budget > 0:
+            best = sorted(
+                missing, key=lambda page_type: candidates[page_type][0][1], reverse=True
+            )[:budget]
+            batch = [(page_type, candidates[page_type].pop(0)[0]) for page_type in best]
+            budget -= len(batch)
+            
+            results = await asyncio.gather(*[
+                self._scrape_page(url, page_type) for page_type, url in batch
+            ])
+            for (page_type, url), page in zip(batch, results):
+                if 'error' not in page:
+                    print(f"✅ Найдена страница {page_type}: {url}")
+                    pages[f'{page_type}_page'] = page
+            
+            missing = [
+                page_type for page_type in missing
+                if f'{page_type}_page' not in pages and candidates[page_type]
+            ]
+        
+        return pages
+    
+    def _rank_candidates(self, website_url: str, links: List[Tuple[str, str]],
+                         navigation: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """Кандидаты по типам страниц от самых ценных"""
+        
+        # Позиция пункта в главном меню: чем раньше, тем важнее раздел для компании
+        nav_rank = {text.lower(): position for position, text in enumerate(navigation)}
+        main = parse_url(website_url)
+        
+        best: Dict[str, Tuple[str, float]] = {}
+        for url, text in links:
+            url = url.split('#', 1)[0]
+            parsed = parse_url(url)
+            if (parsed.host, parsed.path.rstrip('/')) == (main.host, main.path.rstrip('/')):
+                continue
+            if parsed.path.lower().endswith(SKIPPED_EXTENSIONS):
+                continue
+            page_type, score = self._score_candidate(
+                parsed.path, text, nav_rank.get(text.lower()), len(navigation)
+            )
+            if page_type is not None and (url not in best or best[url][1] < score):
+                best[url] = (page_type, score)
+        
+        candidates: Dict[str, List[Tuple[str, float]]] = {page_type: [] for page_type in PAGE_TYPES}
+        for url, (page_type, score) in best.items():
+            candidates[page_type].append((url, score))
+        
+        for ranked in candidates.values():
+            ranked.sort(key=lambda item: item[1], reverse=True)
+        
+        return candidates
+    
+    def _score_candidate(self, path: str, text: str, nav_position: Optional[int],
+                         nav_size: int) -> Tuple[Optional[str], float]:
+        """Тип страницы и ценность ссылки по адресу, тексту ссылки и позиции в меню
+        
+        Совпадение сегмента адреса надежнее текста ссылки; ссылки из меню получают
+        бонус, убывающий к концу меню; глубоко вложенные страницы (статьи блога,
+        отдельные тарифы) ценятся меньше раздела
+        """
+        
+        segments = [segment for segment in path.lower().split('/') if segment]
+        text = text.lower()
+        
+        best_type, best_score = None, 0.0
+        for page_type, spec in PAGE_TYPES.items():
+            if any(segment in spec['paths'] for segment in segments):
+                match = 1.0
+            elif text and any(keyword in text for keyword in spec['texts']):
+                match = 0.7
+            else:
+                continue
+            score = spec['value'] * match
+            if score > best_score:
+                best_type, best_score = page_type, score
+        
+        if best_type is None:
+            return None, 0.0
+        
+        if nav_position is not None and nav_size:
+            best_score += 3.0 * (1 - nav_position / nav_size)
+        best_score -= 1.0 * max(len(segments) - 1, 0)
+        return best_type, best_score
+    
+    async def _scrape_page(self, url: str, page_type: str) -> Dict[str, Any]:
+        """Загрузка и разбор дополнительной страницы"""
+        
+        page = {'url': url}
+        try:
+            headers = {'User-Agent': self.user_agent}
+            response = await self.http.get(url, headers=headers, timeout=self.timeout)
+            if response.status != 200:
+                page['error'] = f'HTTP {response.status}'
+                return page
+            
+            await self._store_page(url, response, page)
+            soup = bs4.BeautifulSoup(response.text(), 'html.parser')
+            page['title'] = soup.find('title').get_text().strip() if soup.find('title') else ''
+            page.update(self._analyze_page(page_type, soup))
+            page['text_blocks'] = extract_text_blocks(soup)
+        except Exception as e:
+            page['error'] = str(e)
+        
+        return page
+    
+    def _analyze_page(self, page_type: str, soup: bs4.BeautifulSoup) -> Dict[str, Any]:
+        """Признаки, характерные для типа страницы"""
+        
+        text = soup.get_text(' ').lower()
+        
+        if page_type == 'pricing':
+            plans = self._extract_pricing_plans(soup)
+            return {
+                'plans': plans,
+                'plans_found': len(plans),
+                'free_tier': bool(re.search(r'\bfree\b|бесплатн', text)),
+                'currencies_found': [symbol for symbol in CURRENCY_SYMBOLS if symbol in text]
+            }
+        if page_type == 'about':
+            return {
+                'team_mentions': len(re.findall(r'\bteam\b|команд', text)),
+                'founder_mentioned': bool(re.search(r'founder|основател', text))
+            }
+        if page_type == 'customers':
+            return {
+                'testimonials': self._extract_testimonials(soup),
+                'case_studies': len(soup.select('article, .case, .case-study, .customer-story'))
+            }
+        if page_type == 'blog':
+            return {'posts_found': len(soup.find_all('article'))}
+        return {}
+    
+    def _extract_pricing_plans(self, soup: bs4.BeautifulSoup) -> List[PricingPlan]:
+        """Тарифные планы со страницы цен"""
+        
+        plans = []
+        for element in soup.select('.pricing-plan, .price-card, .plan, [data-plan], .pricing-card')[:10]:
+            name_el = element.find(['h2', 'h3', 'h4'])
+            price_el = element.select_one('.price, .cost, .amount')
+            if not price_el:
+                continue
+            plans.append(PricingPlan(
+                name_el.get_text().strip() if name_el else '',
+                price_el.get_text().strip(),
+                [item.get_text().strip() for item in element.find_all('li')[:5]]
+            ))
+        return plans
+    
+    async def _technical_analysis(self, url: str) -> Dict[str, Any]:
+        """Технические характеристики сайта и время загрузки главной страницы по фазам
+        
+        load_time - время, зависящее от сервера (ожидание первого байта и загрузка),
+        без DNS, установки соединения и ожидания в наших очередях; полное время
+        запроса - в total_time, все фазы - в timing
+        """
+        
+        tech_data = {
+            'https_enabled': url.startswith('https://'),
+            'mobile_friendly': False,
+            'has_sitemap': False,
+            'has_robots': False
+        }
+        
+        try:
+            response = self._main_responses.pop(url, None)
+            if response is None:
+                headers = {'User-Agent': self.user_agent}
+                response = await self.http.get(url, headers=headers, timeout=self.timeout)
+            
+            tech_data['final_url'] = response.url
+            tech_data['status_code'] = response.status
+            tech_data['https_enabled'] = parse_url(response.url).scheme == 'https'
+            tech_data['mobile_friendly'] = bool(VIEWPORT_PATTERN.search(response.text()))
+            tech_data['page_size'] = len(response.body)
+            tech_data['server'] = response.headers.get('Server', '')
+            tech_data['compression'] = response.headers.get('Content-Encoding', '')
+            
+            tech_data['load_time'] = round(response.timing.server, 3)
+            tech_data['total_time'] = round(response.timing.total, 3)
+            tech_data['timing'] = response.timing.to_dict()
+            
+            tech_data['has_sitemap'], tech_data['has_robots'] = await asyncio.gather(
+                self._check_url_exists(urljoin(response.url, '/sitemap.xml')),
+                self._check_url_exists(urljoin(response.url, '/robots.txt'))
+            )
+            
+        except Exception as e:
+            tech_data['error'] = str(e)
+        
+        return tech_data
+    
+    async def _check_url_exists(self, url: str) -> bool:
+        """Проверяем существование URL"""
+        
+        try:
+            headers = {'User-Agent': self.user_agent}
+            response = await self.http.head(url, headers=headers, timeout=5)
+            return response.status == 200
+        except:
+            return False
+    
+    def _generate_summary(self, main_page: Dict, additional_pages: Dict, technical: Dict) -> Dict[str, Any]:
+        """Генерируем краткое резюме анализа"""
+        
+        summary = {
+            'site_quality_score': 0,
+            'key_findings': [],
+            'strengths': [],
+            'weaknesses': [],
+            'recommendations': []
+        }
+        
+        # Оценка качества сайта (0-100)
+        summary['site_quality_score'] = quality_score(main_page, additional_pages, technical)
+        
+        # Ключевые находки
+        if main_page.get('call_to_actions'):
+            summary['key_findings'].append(f"Найдено {len(main_page['call_to_actions'])} призывов к действию")
+        
+        if main_page.get('technologies'):
+            summary['key_findings'].append(f"Используемые технологии: {', '.join(main_page['technologies'][:3])}")
+        
+        if additional_pages.get('pricing_page'):
+            pricing = additional_pages['pricing_page']
+            if pricing.get('plans_found', 0) > 0:
+                summary['key_findings'].append(f"Найдено {pricing['plans_found']} тарифных планов")
+        
+        # Сильные стороны
+        if technical.get('https_enabled'):
+            summary['strengths'].append("HTTPS включен")
+        
+        if technical.get('mobile_friendly'):
+            summary['strengths'].append("Адаптивная версия для мобильных")
+        
+        if main_page.get('social_links'):
+            summary['strengths'].append(f"Присутствие в {len(main_page['social_links'])} социальных сетях")
+        
+        # Слабые места
+        if not main_page.get('description'):
+            summary['weaknesses'].append("Отсутствует meta description")
+        
+        if not technical.get('has_sitemap'):
+            summary['weaknesses'].append("Нет sitemap.xml")
+        
+        if technical.get('load_time', 0) > 5:
+            summary['weaknesses'].append("Медленная загрузка страницы")
+        
+        # Рекомендации
+        if not main_page.get('description'):
+            summary['recommendations'].append("Добавить meta description для улучшения SEO")
+        
+        if len(main_page.get('call_to_actions', [])) < 2:
+            summary['recommendations'].append("Увеличить количество призывов к действию")
+        
+        if not additional_pages.get('blog_page'):
+            summary['recommendations'].append("Создать блог для контент-маркетинга")
+        
+        return summary
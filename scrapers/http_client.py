@@ -0,0 +1,467 @@
+"""HTTP-клиент скраперов с адаптивным ограничением параллельности по хостам
+
+Вместо фиксированной задержки каждый хост получает собственный лимит одновременных
+запросов, который подбирается по принципу AIMD: после каждого успешного ответа лимит
+растет на 1/limit (примерно +1 за "окно" запросов), а при 429/503, таймауте или резком
+росте задержки уменьшается вдвое. Заголовок Retry-After приостанавливает запросы к хосту
+на указанное время.
+
+Для каждого запроса хуки aiohttp TraceConfig фиксируют фазы (ожидание, DNS, соединение,
+время до первого байта, загрузка), чтобы отделять время ответа сервера от задержек
+на нашей стороне.
+
+В режиме record все полученные ответы сохраняются в HttpArchive, в режиме replay
+запросы обслуживаются только из архива, без обращения к сети.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Mapping, Optional
+
+from scrapers.url_utils import parse_url
+from storage.http_archive import HttpArchive, request_key
+from utils.lazy import lazy_import
+
+aiohttp = lazy_import('aiohttp')
+multidict = lazy_import('multidict')
+
+
+# Ответы, которыми сервер просит снизить нагрузку
+THROTTLE_STATUSES = frozenset({429, 503})
+
+ARCHIVE_MODES = ('record', 'replay')
+
+
+class HttpError(Exception):
+    """Ответ с кодом ошибки"""
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status}: {url}")
+        self.status = status
+        self.url = url
+
+
+class ArchiveMissError(LookupError):
+    """В режиме replay запрошен ответ, которого нет в архиве"""
+
+
+@dataclass(slots=True)
+class RequestTiming:
+    """Фазы запроса в секундах
+
+    connect включает TLS-рукопожатие: aiohttp не выделяет его отдельным событием.
+    ttfb и redirects учитывают все переходы по редиректам.
+    """
+
+    queue: float = 0.0  # Ожидание места в лимите хоста и свободного соединения в пуле
+    dns: float = 0.0
+    connect: float = 0.0
+    ttfb: float = 0.0  # От отправки заголовков запроса до заголовков ответа
+    download: float = 0.0
+    total: float = 0.0
+    redirects: int = 0
+
+    @property
+    def server(self) -> float:
+        """Время, зависящее от сервера: ожидание ответа и загрузка тела"""
+        return self.ttfb + self.download
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'queue': round(self.queue, 4),
+            'dns': round(self.dns, 4),
+            'connect': round(self.connect, 4),
+            'ttfb': round(self.ttfb, 4),
+            'download': round(self.download, 4),
+            'server': round(self.server, 4),
+            'total': round(self.total, 4),
+            'redirects': self.redirects
+        }
+
+
+async def _on_request_start(session, context, params):
+    context.sent = time.monotonic()
+
+
+async def _on_connection_queued_start(session, context, params):
+    context.queued = time.monotonic()
+
+
+async def _on_connection_queued_end(session, context, params):
+    context.trace_request_ctx.queue += time.monotonic() - context.queued
+
+
+async def _on_connection_create_start(session, context, params):
+    context.connecting = time.monotonic()
+    context.resolving = 0.0
+
+
+async def _on_dns_resolvehost_start(session, context, params):
+    context.resolved = time.monotonic()
+
+
+async def _on_dns_resolvehost_end(session, context, params):
+    elapsed = time.monotonic() - context.resolved
+    context.trace_request_ctx.dns += elapsed
+    context.resolving += elapsed
+
+
+async def _on_connection_create_end(session, context, params):
+    # DNS разрешается внутри создания соединения и учитывается отдельно
+    elapsed = time.monotonic() - context.connecting - getattr(context, 'resolving', 0.0)
+    context.trace_request_ctx.connect += max(elapsed, 0.0)
+
+
+async def _on_request_headers_sent(session, context, params):
+    context.sent = time.monotonic()
+
+
+async def _on_request_redirect(session, context, params):
+    context.trace_request_ctx.ttfb += time.monotonic() - context.sent
+    context.trace_request_ctx.redirects += 1
+
+
+async def _on_request_end(session, context, params):
+    context.trace_request_ctx.ttfb += time.monotonic() - context.sent
+
+
+def timing_trace_config() -> aiohttp.TraceConfig:
+    """Хуки, заполняющие RequestTiming из trace_request_ctx запроса"""
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_connection_queued_start.append(_on_connection_queued_start)
+    trace.on_connection_queued_end.append(_on_connection_queued_end)
+    trace.on_connection_create_start.append(_on_connection_create_start)
+    trace.on_dns_resolvehost_start.append(_on_dns_resolvehost_start)
+    trace.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+    trace.on_connection_create_end.append(_on_connection_create_end)
+    trace.on_request_headers_sent.append(_on_request_headers_sent)
+    trace.on_request_redirect.append(_on_request_redirect)
+    trace.on_request_end.append(_on_request_end)
+    return trace
+
+
+@dataclass(slots=True)
+class HttpResponse:
+    """Прочитанный ответ сервера (соединение к этому моменту уже освобождено)"""
+
+    status: int
+    url: str
+    headers: Mapping[str, str] = field(default_factory=dict)
+    body: bytes = b''
+    charset: Optional[str] = None
+    timing: RequestTiming = field(default_factory=RequestTiming)
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.charset or 'utf-8', errors='replace')
+        except LookupError:
+            # Неизвестная кодировка в Content-Type
+            return self.body.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HttpError(self.status, self.url)
+
+
+class HostLimiter:
+    """Лимит одновременных запросов к одному хосту (AIMD)"""
+
+    def __init__(self, initial: float = 2, minimum: float = 1, maximum: float = 8,
+                 increase: float = 1.0, decrease: float = 0.5,
+                 latency_tolerance: float = 3.0, slow_latency: float = 1.0):
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.slow_latency = slow_latency
+
+        self.in_flight = 0
+        # Запросы не отправляются до этого момента (Retry-After)
+        self.blocked_until = 0.0
+        # Типичная задержка хоста: быстро опускается к минимуму, медленно растет
+        self.baseline: Optional[float] = None
+        self.last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        """Условие ожидания в текущем event loop
+
+        asyncio.Condition привязан к циклу, в котором его начали ждать, а клиент может
+        переживать несколько asyncio.run; запросы прошлого цикла к этому моменту завершены.
+        """
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._condition
+
+    async def acquire(self):
+        condition = self.condition
+        async with condition:
+            while True:
+                wait = self.blocked_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(condition.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await condition.wait()
+
+    async def release(self, started: float, latency: Optional[float] = None,
+                      status: Optional[int] = None, retry_after: Optional[float] = None,
+                      failed: bool = False):
+        """Освобождение места и корректировка лимита по результату запроса
+
+        failed - таймаут или ошибка соединения; без latency и status лимит не меняется
+        """
+
+        condition = self.condition
+        async with condition:
+            self.in_flight -= 1
+            self._adjust(started, latency, status, retry_after, failed)
+            condition.notify_all()
+
+    def _adjust(self, started: float, latency: Optional[float], status: Optional[int],
+                retry_after: Optional[float], failed: bool):
+        now = time.monotonic()
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+        if failed or status in THROTTLE_STATUSES or self._is_slow(latency):
+            # Ответы на запросы, отправленные до прошлого снижения, лимит повторно не режут
+            if started >= self.last_decrease:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self.last_decrease = now
+            return
+
+        if status is None or latency is None:
+            return
+
+        self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+        if status < 500:
+            if self.baseline is None:
+                self.baseline = latency
+            else:
+                self.baseline = min(latency, 0.9 * self.baseline + 0.1 * latency)
+
+    def _is_slow(self, latency: Optional[float]) -> bool:
+        return (
+            latency is not None
+            and self.baseline is not None
+            and latency > self.slow_latency
+            and latency > self.baseline * self.latency_tolerance
+        )
+
+
+class HttpClient:
+    """Общая сессия aiohttp для скраперов с лимитами по хостам и повтором 429/503"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.timeout = config.get('timeout', 30)
+        self.user_agent = config.get('user_agent')
+        self.max_retries = config.get('max_retries', 2)
+        self.max_retry_after = config.get('max_retry_after', 60)
+        self.limiter_settings = {
+            'initial': config.get('initial_per_host', 2),
+            'minimum': config.get('min_per_host', 1),
+            'maximum': config.get('max_per_host', 8),
+            'latency_tolerance': config.get('latency_tolerance', 3.0),
+            'slow_latency': config.get('slow_latency', 1.0)
+        }
+        self.limiters: Dict[str, HostLimiter] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.archive_mode = config.get('archive_mode') or None
+        if self.archive_mode not in (None, *ARCHIVE_MODES):
+            raise ValueError(f"Неизвестный режим архива: {self.archive_mode}")
+        self.archive = HttpArchive(config) if self.archive_mode else None
+
+    def limiter(self, url: str) -> HostLimiter:
+        host = parse_url(url).host
+        limiter = self.limiters.get(host)
+        if limiter is None:
+            limiter = self.limiters[host] = HostLimiter(**self.limiter_settings)
+        return limiter
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> HttpResponse:
+        kwargs.setdefault('allow_redirects', False)
+        return await self.request('HEAD', url, **kwargs)
+
+    async def request(self, method: str, url: str, params: Dict[str, Any] = None,
+                      headers: Dict[str, str] = None, timeout: float = None,
+                      allow_redirects: bool = True) -> HttpResponse:
+        """Запрос с ожиданием места в лимите хоста
+
+        На 429/503 и таймаут запрос повторяется до max_retries раз; последний ответ
+        429/503 возвращается вызывающему коду как есть.
+        """
+
+        if self.archive_mode == 'replay':
+            return self._replay(request_key(method, url, params))
+
+        response = await self._request(method, url, params, headers, timeout, allow_redirects)
+        if self.archive_mode == 'record':
+            # Сжатие и запись в архив не должны задерживать остальные запросы
+            await asyncio.to_thread(self._record, request_key(method, url, params), response)
+        return response
+
+    async def _request(self, method: str, url: str, params: Optional[Dict[str, Any]],
+                       headers: Optional[Dict[str, str]], timeout: Optional[float],
+                       allow_redirects: bool) -> HttpResponse:
+        limiter = self.limiter(url)
+        for attempt in range(self.max_retries + 1):
+            queued = time.monotonic()
+            await limiter.acquire()
+            started = time.monotonic()
+            timing = RequestTiming(queue=started - queued)
+            response = None
+            retry_after = None
+            try:
+                response = await self._send(
+                    method, url, params, headers, timeout, allow_redirects, timing
+                )
+                retry_after = self._retry_after(response.headers)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                await limiter.release(started, failed=True)
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            except BaseException:
+                await limiter.release(started)
+                raise
+
+            timing.total = time.monotonic() - queued
+            # Лимит подстраивается под время сервера, а не под очереди на нашей стороне
+            await limiter.release(started, timing.server, response.status, retry_after)
+
+            if response.status not in THROTTLE_STATUSES or attempt == self.max_retries:
+                return response
+            if retry_after is None:
+                # С Retry-After ожиданием управляет лимитер хоста
+                await asyncio.sleep(self._backoff(attempt))
+
+        return response
+
+    async def _send(self, method: str, url: str, params: Optional[Dict[str, Any]],
+                    headers: Optional[Dict[str, str]], timeout: Optional[float],
+                    allow_redirects: bool, timing: RequestTiming) -> HttpResponse:
+        session = await self._get_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        async with session.request(
+            method, url, params=params, headers=headers, timeout=client_timeout,
+            allow_redirects=allow_redirects, trace_request_ctx=timing
+        ) as response:
+            headers_at = time.monotonic()
+            body = await response.read()
+            timing.download = time.monotonic() - headers_at
+            return HttpResponse(
+                status=response.status,
+                url=str(response.url),
+                headers=response.headers,
+                body=body,
+                charset=response.charset,
+                timing=timing
+            )
+
+    def _record(self, key: str, response: HttpResponse):
+        self.archive.put(key, {
+            'status': response.status,
+            'url': response.url,
+            'headers': list(response.headers.items()),
+            'charset': response.charset,
+            'timing': response.timing.to_dict()
+        }, response.body)
+
+    def _replay(self, key: str) -> HttpResponse:
+        record = self.archive.get(key)
+        if record is None:
+            raise ArchiveMissError(f"Нет в архиве: {key}")
+
+        metadata, body = record
+        timing = {
+            name: value for name, value in metadata.get('timing', {}).items() if name != 'server'
+        }
+        return HttpResponse(
+            status=metadata['status'],
+            url=metadata['url'],
+            headers=multidict.CIMultiDictProxy(multidict.CIMultiDict(metadata['headers'])),
+            body=body,
+            charset=metadata.get('charset'),
+            timing=RequestTiming(**timing)
+        )
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Сессия текущего event loop: сессия прошлого asyncio.run в новом цикле не работает"""
+
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._session_loop is not loop:
+            # Соединения завершенного цикла только сбрасываются, без ожидания закрытия
+            await self._session.close()
+            self._session = None
+        if self._session is None or self._session.closed:
+            headers = {'User-Agent': self.user_agent} if self.user_agent else None
+            self._session = aiohttp.ClientSession(
+                headers=headers, trace_configs=[timing_trace_config()]
+            )
+            self._session_loop = loop
+        return self._session
+
+    def _retry_after(self, headers: Mapping[str, str]) -> Optional[float]:
+        """Пауза из Retry-After: число секунд или HTTP-дата"""
+
+        value = headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                moment = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            seconds = (moment - datetime.now(timezone.utc)).total_seconds()
+        return min(max(seconds, 0.0), self.max_retry_after) or None
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.max_retry_after, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.archive is not None:
+            self.archive.close()
@@ -0,0 +1,147 @@
+"""Компактные записи для сущностей, извлекаемых со страниц
+
+Слотовые dataclass вместо словарей: без __dict__ на каждый объект и без повторяющихся
+ключей. Записи поддерживают чтение как словарь (get, [], in, keys), поэтому код анализа
+и отчетов работает с ними без изменений; в словари они переводятся на границе
+сериализации (to_dict / to_plain).
+"""
+
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Any, ClassVar, Tuple, Type, TypeVar
+
+
+RecordType = TypeVar('RecordType', bound='Record')
+
+
+class Record:
+    """Доступ к полям записи в стиле словаря и конвертация в словарь и обратно"""
+
+    __slots__ = ()
+
+    # Поля-категории с небольшим набором значений: строки интернируются
+    _interned: ClassVar[Tuple[str, ...]] = ()
+    _field_names: ClassVar[Tuple[str, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_names = ()
+
+    def __post_init__(self):
+        for name in self._interned:
+            value = getattr(self, name)
+            if isinstance(value, str):
+                object.__setattr__(self, name, sys.intern(value))
+
+    @classmethod
+    def names(cls) -> Tuple[str, ...]:
+        if not cls._field_names:
+            cls._field_names = tuple(item.name for item in fields(cls))
+        return cls._field_names
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.names()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.names():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.names()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.names():
+            return default
+        return getattr(self, key)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(name, getattr(self, name)) for name in self.names()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.names()}
+
+    @classmethod
+    def from_dict(cls: Type[RecordType], data: Dict[str, Any]) -> RecordType:
+        """Запись из словаря; неизвестные ключи отбрасываются"""
+        return cls(**{name: data[name] for name in cls.names() if name in data})
+
+
+@dataclass(slots=True)
+class CTA(Record):
+    """Призыв к действию на странице"""
+
+    text: str
+    url: str = ''
+    type: str = 'other'
+
+    _interned: ClassVar[Tuple[str, ...]] = ('type',)
+
+
+@dataclass(slots=True)
+class SocialLink(Record):
+    """Ссылка на профиль компании в соцсети"""
+
+    platform: str
+    url: str
+
+    _interned: ClassVar[Tuple[str, ...]] = ('platform',)
+
+
+@dataclass(slots=True)
+class Form(Record):
+    """Форма на странице"""
+
+    fields_count: int = 0
+    has_email_field: bool = False
+    purpose: str = 'unknown'
+
+    _interned: ClassVar[Tuple[str, ...]] = ('purpose',)
+
+
+@dataclass(slots=True)
+class Testimonial(Record):
+    """Отзыв клиента"""
+
+    text: str
+    author: str = 'Unknown'
+
+    _interned: ClassVar[Tuple[str, ...]] = ('author',)
+
+
+@dataclass(slots=True)
+class Product(Record):
+    """Продукт или услуга компании"""
+
+    name: str
+    description: str = ''
+    price: str = ''
+
+
+@dataclass(slots=True)
+class PricingPlan(Record):
+    """Тарифный план"""
+
+    name: str
+    price: str = ''
+    features: List[str] = field(default_factory=list)
+
+
+def to_plain(value: Any) -> Any:
+    """Рекурсивная замена записей словарями (для сравнения и сериализации)"""
+
+    if isinstance(value, Record):
+        return {name: to_plain(item) for name, item in value.items()}
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def plain_default(value: Any) -> Any:
+    """default для json.dump: записи как словари, остальное строкой"""
+
+    if isinstance(value, Record):
+        return value.to_dict()
+    return str(value)
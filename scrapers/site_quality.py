@@ -0,0 +1,40 @@
+"""Критерии оценки качества сайта: общие для site_quality_score и графика в отчете"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# (критерий, баллы, проверка по главной странице, техническому анализу и доп. страницам)
+QUALITY_CRITERIA: List[Tuple[str, int, Callable[[Dict, Dict, Dict], bool]]] = [
+    ('Title', 10, lambda main_page, technical, pages: bool(main_page.get('title'))),
+    ('Meta description', 10, lambda main_page, technical, pages: bool(main_page.get('description'))),
+    ('H1', 10, lambda main_page, technical, pages: bool(main_page.get('h1_tags'))),
+    ('CTA', 15, lambda main_page, technical, pages: bool(main_page.get('call_to_actions'))),
+    ('Соцсети', 5, lambda main_page, technical, pages: bool(main_page.get('social_links'))),
+    ('HTTPS', 10, lambda main_page, technical, pages: bool(technical.get('https_enabled'))),
+    ('Мобильная версия', 15, lambda main_page, technical, pages: bool(technical.get('mobile_friendly'))),
+    # load_time - только время ответа сервера (см. EnhancedWebsiteScraper._technical_analysis)
+    ('Загрузка < 3 с', 15, lambda main_page, technical, pages: technical.get('load_time', 10) < 3),
+    ('Страница цен', 10, lambda main_page, technical, pages: bool(pages.get('pricing_page')))
+]
+
+
+def quality_breakdown(main_page: Dict, additional_pages: Dict, technical: Dict) -> List[Dict[str, Any]]:
+    """Баллы по критериям оценки качества сайта"""
+
+    main_page = main_page or {}
+    additional_pages = additional_pages or {}
+    technical = technical or {}
+    return [
+        {
+            'criterion': criterion,
+            'score': points if check(main_page, technical, additional_pages) else 0,
+            'max': points
+        }
+        for criterion, points, check in QUALITY_CRITERIA
+    ]
+
+
+def quality_score(main_page: Dict, additional_pages: Dict, technical: Dict) -> int:
+    """Оценка качества сайта 0-100"""
+    breakdown = quality_breakdown(main_page, additional_pages, technical)
+    return min(sum(item['score'] for item in breakdown), 100)
@@ -0,0 +1,122 @@
+"""Определение аккаунтов компании в соцсетях по ссылкам с ее сайта"""
+
+import re
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import parse_qs
+
+from scrapers.url_utils import SOCIAL_DOMAINS, parse_url
+from storage.database import connect
+
+
+# Служебные пути, которые не являются аккаунтами
+RESERVED_PATHS = {
+    'twitter': {'intent', 'share', 'home', 'hashtag', 'i', 'search', 'login', 'signup'},
+    'facebook': {'sharer', 'sharer.php', 'share.php', 'dialog', 'plugins', 'login', 'pages', 'groups'},
+    'instagram': {'p', 'explore', 'accounts', 'reel', 'stories'},
+    'github': {'orgs', 'sponsors', 'features', 'about', 'login'},
+    'youtube': {'watch', 'embed', 'results', 'playlist'}
+}
+
+HANDLE_PATTERN = re.compile(r'^[\w.\-]+$', re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS social_handles (
+    company TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    handle TEXT NOT NULL,
+    source_url TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (company, platform)
+);
+"""
+
+
+def parse_social_url(url: str) -> Optional[Tuple[str, str]]:
+    """Платформа и канонический handle из ссылки на профиль (None - не профиль)"""
+
+    parsed = parse_url(url if '//' in url else f'https://{url}')
+
+    platform = SOCIAL_DOMAINS.get(parsed.domain)
+    if platform is None:
+        return None
+
+    parts = [part for part in parsed.path.split('/') if part]
+
+    if platform == 'facebook' and parts[:1] == ['profile.php']:
+        profile_id = parse_qs(parsed.query).get('id', [''])[0]
+        return (platform, profile_id) if profile_id else None
+
+    if not parts or parts[0].lower() in RESERVED_PATHS.get(platform, set()):
+        return None
+
+    if platform == 'linkedin':
+        # linkedin.com/company/<slug> - страница организации
+        if len(parts) < 2 or parts[0] not in ('company', 'school', 'showcase'):
+            return None
+        handle = parts[1]
+    elif platform == 'youtube':
+        if parts[0].startswith('@'):
+            handle = parts[0]
+        elif parts[0] in ('channel', 'c', 'user') and len(parts) > 1:
+            handle = parts[1]
+        else:
+            return None
+    else:
+        handle = parts[0].lstrip('@')
+
+    handle = handle.strip()
+    if not handle or not HANDLE_PATTERN.match(handle.lstrip('@')):
+        return None
+
+    # Регистр имен аккаунтов на этих платформах не важен
+    if platform in ('twitter', 'instagram', 'github'):
+        handle = handle.lower()
+
+    return platform, handle
+
+
+class SocialHandleResolver:
+    """Канонические аккаунты компании в соцсетях с кешем в базе"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.connection = connect(config)
+        self.connection.executescript(SCHEMA)
+
+    def resolve(self, company: str, social_links: List[Dict[str, str]]) -> Dict[str, str]:
+        """Аккаунты по платформам: найденные на сайте дополняют сохраненные ранее"""
+
+        found: Dict[str, Tuple[str, str]] = {}
+        for link in social_links or []:
+            parsed = parse_social_url(link.get('url', ''))
+            # Первая ссылка на платформу обычно в шапке или футере сайта
+            if parsed and parsed[0] not in found:
+                found[parsed[0]] = (parsed[1], link.get('url', ''))
+
+        if found:
+            updated_at = datetime.now().isoformat()
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT INTO social_handles (company, platform, handle, source_url, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?) ON CONFLICT (company, platform) DO UPDATE SET '
+                    'handle = excluded.handle, source_url = excluded.source_url, '
+                    'updated_at = excluded.updated_at',
+                    [
+                        (company, platform, handle, source_url, updated_at)
+                        for platform, (handle, source_url) in found.items()
+                    ]
+                )
+
+        return self.cached(company)
+
+    def cached(self, company: str) -> Dict[str, str]:
+        """Сохраненные аккаунты компании"""
+
+        rows = self.connection.execute(
+            'SELECT platform, handle FROM social_handles WHERE company = ?', (company,)
+        ).fetchall()
+        return {row['platform']: row['handle'] for row in rows}
+
+    def close(self):
+        self.connection.close()
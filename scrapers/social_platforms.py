@@ -0,0 +1,382 @@
+"""Адаптеры социальных платформ с постраничной выдачей постов"""
+
+from __future__ import annotations
+
+import random
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, AsyncIterator, Optional, Tuple
+
+from scrapers.http_client import HttpClient
+
+
+class PlatformAdapter(ABC):
+    """Базовый адаптер: профиль компании и посты страницами через курсор"""
+
+    name = ''
+    source = 'api'
+    # Имя аккаунта из ссылки на сайте подходит для запросов к API платформы
+    website_handles = True
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.page_size = config.get('page_size', 20)
+        self.timeout = config.get('timeout', 30)
+        # Аккаунты компаний, найденные по ссылкам с их сайтов
+        self.handles: Dict[str, str] = {}
+
+    @abstractmethod
+    async def fetch_profile(self, client: HttpClient, company_name: str) -> Dict[str, Any]:
+        """Данные профиля: подписчики, количество постов и т.п."""
+
+    @abstractmethod
+    async def fetch_page(self, client: HttpClient, company_name: str,
+                         cursor: Optional[str], limit: int,
+                         since_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Одна страница постов и курсор следующей (None - постов больше нет)
+
+        since_id передается платформам, умеющим отдавать только посты новее заданного
+        """
+
+    async def iter_posts(self, client: HttpClient, company_name: str, limit: int,
+                         since: Optional[Dict[str, str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Посты от новых к старым; останавливается ровно на limit
+
+        since - курсор последнего сохраненного поста ({'since_id', 'last_date'}):
+        выдача прекращается на первом уже известном посте
+        """
+
+        since_id = (since or {}).get('since_id')
+        last_date = (since or {}).get('last_date')
+        remaining = limit
+        cursor = None
+
+        while remaining > 0:
+            # Не запрашиваем больше постов, чем осталось до лимита
+            posts, cursor = await self.fetch_page(
+                client, company_name, cursor, min(self.page_size, remaining), since_id
+            )
+            for post in posts[:remaining]:
+                if since_id is not None and str(post['id']) == since_id:
+                    return
+                if last_date and post.get('date') and post['date'] <= last_date:
+                    return
+                yield post
+            remaining -= min(len(posts), remaining)
+
+            if cursor is None or not posts:
+                break
+
+    def set_handle(self, company_name: str, handle: str):
+        """Известный аккаунт компании: поиск по названию не нужен"""
+        self.handles[company_name] = handle
+
+    def _handle(self, company_name: str) -> str:
+        """Имя аккаунта: найденное на сайте, из конфигурации или угаданное по названию"""
+        return (
+            self.handles.get(company_name)
+            or self.config.get('handle')
+            or company_name.lower().replace(' ', '')
+        )
+
+    async def _get_json(self, client: HttpClient, url: str,
+                        params: Dict[str, Any] = None, headers: Dict[str, str] = None) -> Dict[str, Any]:
+        response = await client.get(url, params=params, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+class TwitterAdapter(PlatformAdapter):
+    """Twitter (X) API v2"""
+
+    name = 'twitter'
+    api_url = 'https://api.twitter.com/2'
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.page_size = max(5, min(self.page_size, 100))
+        self.headers = {'Authorization': f"Bearer {config.get('bearer_token', '')}"}
+        self._user_ids: Dict[str, str] = {}
+
+    async def fetch_profile(self, client: HttpClient, company_name: str) -> Dict[str, Any]:
+        data = await self._get_json(
+            client, f"{self.api_url}/users/by/username/{self._handle(company_name)}",
+            params={'user.fields': 'public_metrics'}, headers=self.headers
+        )
+        user = data.get('data', {})
+        self._user_ids[company_name] = user.get('id', '')
+        metrics = user.get('public_metrics', {})
+        return {
+            'handle': user.get('username', ''),
+            'followers': metrics.get('followers_count', 0),
+            'posts_count': metrics.get('tweet_count', 0)
+        }
+
+    async def fetch_page(self, client, company_name, cursor, limit, since_id=None):
+        user_id = self._user_ids.get(company_name)
+        if not user_id:
+            await self.fetch_profile(client, company_name)
+            user_id = self._user_ids.get(company_name)
+
+        params = {
+            # API принимает от 5 до 100 постов на страницу
+            'max_results': max(5, min(limit, 100)),
+            'tweet.fields': 'created_at,public_metrics'
+        }
+        if cursor:
+            params['pagination_token'] = cursor
+        if since_id:
+            params['since_id'] = since_id
+
+        data = await self._get_json(
+            client, f"{self.api_url}/users/{user_id}/tweets", params=params, headers=self.headers
+        )
+        posts = [
+            {
+                'id': tweet['id'],
+                'text': tweet.get('text', ''),
+                'likes': tweet.get('public_metrics', {}).get('like_count', 0),
+                'comments': tweet.get('public_metrics', {}).get('reply_count', 0),
+                'shares': tweet.get('public_metrics', {}).get('retweet_count', 0),
+                'date': tweet.get('created_at', '')
+            }
+            for tweet in data.get('data', [])
+        ]
+        return posts[:limit], data.get('meta', {}).get('next_token')
+
+
+class FacebookAdapter(PlatformAdapter):
+    """Facebook Graph API: страница компании"""
+
+    name = 'facebook'
+    api_url = 'https://graph.facebook.com/v18.0'
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.access_token = config.get('access_token', '')
+
+    async def fetch_profile(self, client, company_name):
+        data = await self._get_json(
+            client, f"{self.api_url}/{self._handle(company_name)}",
+            params={'fields': 'username,followers_count,fan_count', 'access_token': self.access_token}
+        )
+        return {
+            'handle': data.get('username', ''),
+            'followers': data.get('followers_count', data.get('fan_count', 0))
+        }
+
+    async def fetch_page(self, client, company_name, cursor, limit, since_id=None):
+        params = {
+            'fields': 'id,message,created_time,shares,reactions.summary(true),comments.summary(true)',
+            'limit': limit,
+            'access_token': self.access_token
+        }
+        if cursor:
+            params['after'] = cursor
+
+        data = await self._get_json(
+            client, f"{self.api_url}/{self._handle(company_name)}/posts", params=params
+        )
+        posts = [
+            {
+                'id': post['id'],
+                'text': post.get('message', ''),
+                'likes': post.get('reactions', {}).get('summary', {}).get('total_count', 0),
+                'comments': post.get('comments', {}).get('summary', {}).get('total_count', 0),
+                'shares': post.get('shares', {}).get('count', 0),
+                'date': post.get('created_time', '')
+            }
+            for post in data.get('data', [])
+        ]
+        paging = data.get('paging', {})
+        next_cursor = paging.get('cursors', {}).get('after') if paging.get('next') else None
+        return posts, next_cursor
+
+
+class InstagramAdapter(PlatformAdapter):
+    """Instagram Graph API: бизнес-аккаунт компании (handle - id аккаунта)"""
+
+    name = 'instagram'
+    api_url = 'https://graph.facebook.com/v18.0'
+    # Graph API адресует аккаунт по числовому id; по имени из ссылки на сайте профиль
+    # и посты чужого аккаунта не запрашиваются, поэтому id берется из конфигурации
+    website_handles = False
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.access_token = config.get('access_token', '')
+
+    async def fetch_profile(self, client, company_name):
+        data = await self._get_json(
+            client, f"{self.api_url}/{self._handle(company_name)}",
+            params={'fields': 'username,followers_count,media_count', 'access_token': self.access_token}
+        )
+        return {
+            'handle': data.get('username', ''),
+            'followers': data.get('followers_count', 0),
+            'posts_count': data.get('media_count', 0)
+        }
+
+    async def fetch_page(self, client, company_name, cursor, limit, since_id=None):
+        params = {
+            'fields': 'id,caption,like_count,comments_count,timestamp',
+            'limit': limit,
+            'access_token': self.access_token
+        }
+        if cursor:
+            params['after'] = cursor
+
+        data = await self._get_json(
+            client, f"{self.api_url}/{self._handle(company_name)}/media", params=params
+        )
+        posts = [
+            {
+                'id': media['id'],
+                'text': media.get('caption', ''),
+                'likes': media.get('like_count', 0),
+                'comments': media.get('comments_count', 0),
+                'shares': 0,
+                'date': media.get('timestamp', '')
+            }
+            for media in data.get('data', [])
+        ]
+        paging = data.get('paging', {})
+        next_cursor = paging.get('cursors', {}).get('after') if paging.get('next') else None
+        return posts, next_cursor
+
+
+class LinkedInAdapter(PlatformAdapter):
+    """LinkedIn Marketing API: страница организации
+
+    handle - числовой id организации или ее vanity-имя из адреса страницы
+    (linkedin.com/company/<имя>); имя один раз переводится в id поиском организации
+    """
+
+    name = 'linkedin'
+    api_url = 'https://api.linkedin.com/rest'
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.headers = {
+            'Authorization': f"Bearer {config.get('access_token', '')}",
+            'LinkedIn-Version': config.get('api_version', '202401'),
+            'X-Restli-Protocol-Version': '2.0.0'
+        }
+        self._organization_ids: Dict[str, str] = {}
+
+    async def _organization(self, client: HttpClient, company_name: str) -> str:
+        """URN организации компании"""
+
+        handle = self._handle(company_name)
+        if not handle.isdigit() and handle not in self._organization_ids:
+            data = await self._get_json(
+                client, f"{self.api_url}/organizations",
+                params={'q': 'vanityName', 'vanityName': handle}, headers=self.headers
+            )
+            elements = data.get('elements', [])
+            if not elements:
+                raise ValueError(f"Организация LinkedIn не найдена: {handle}")
+            self._organization_ids[handle] = str(elements[0]['id'])
+        return f"urn:li:organization:{self._organization_ids.get(handle, handle)}"
+
+    async def fetch_profile(self, client, company_name):
+        organization = await self._organization(client, company_name)
+        data = await self._get_json(
+            client, f"{self.api_url}/networkSizes/{organization}",
+            params={'edgeType': 'COMPANY_FOLLOWED_BY_MEMBER'}, headers=self.headers
+        )
+        return {
+            'handle': self._handle(company_name),
+            'followers': data.get('firstDegreeSize', 0)
+        }
+
+    async def fetch_page(self, client, company_name, cursor, limit, since_id=None):
+        start = int(cursor or 0)
+        data = await self._get_json(
+            client, f"{self.api_url}/posts",
+            params={
+                'author': await self._organization(client, company_name),
+                'q': 'author',
+                'count': limit,
+                'start': start
+            },
+            headers=self.headers
+        )
+        posts = [
+            {
+                'id': post['id'],
+                'text': post.get('commentary', ''),
+                'likes': 0,
+                'comments': 0,
+                'shares': 0,
+                'date': datetime.fromtimestamp(post.get('publishedAt', 0) / 1000).isoformat()
+            }
+            for post in data.get('elements', [])
+        ]
+        total = data.get('paging', {}).get('total', 0)
+        next_start = start + len(posts)
+        return posts, str(next_start) if posts and next_start < total else None
+
+
+class MockPlatformAdapter(PlatformAdapter):
+    """Локальный адаптер с детерминированными данными для тестов и демонстрации"""
+
+    source = 'mock'
+
+    def __init__(self, config: Dict[str, Any], name: str = 'mock'):
+        super().__init__(config)
+        self.name = name
+        self.total_posts = config.get('mock_posts', 89)
+        self.requests_made = 0
+
+    def _random(self, company_name: str, key: str = '') -> random.Random:
+        """Генератор, зависящий только от платформы, компании и ключа (поста)"""
+        return random.Random(zlib.crc32(f"{self.name}:{company_name}:{key}".encode('utf-8')))
+
+    async def fetch_profile(self, client, company_name):
+        rng = self._random(company_name)
+        return {
+            'handle': self._handle(company_name),
+            'followers': rng.randint(500, 5000),
+            'posts_count': self.total_posts
+        }
+
+    async def fetch_page(self, client, company_name, cursor, limit, since_id=None):
+        self.requests_made += 1
+        offset = int(cursor or 0)
+        now = datetime.now().replace(microsecond=0)
+
+        posts = []
+        for index in range(offset, min(offset + limit, self.total_posts)):
+            # Свой генератор у каждого поста: значения не повторяются от страницы к странице
+            # и не зависят от размера страниц
+            rng = self._random(company_name, str(index))
+            posts.append({
+                'id': f"{self.name}-{index}",
+                'text': f'Новости от {company_name} #{self.total_posts - index}',
+                'likes': rng.randint(0, 200),
+                'comments': rng.randint(0, 30),
+                'shares': rng.randint(0, 20),
+                'date': (now - timedelta(days=index)).isoformat()
+            })
+
+        next_offset = offset + len(posts)
+        return posts, str(next_offset) if next_offset < self.total_posts else None
+
+
+PLATFORM_ADAPTERS = {
+    'twitter': (TwitterAdapter, 'bearer_token'),
+    'facebook': (FacebookAdapter, 'access_token'),
+    'instagram': (InstagramAdapter, 'access_token'),
+    'linkedin': (LinkedInAdapter, 'access_token')
+}
+
+
+def create_adapter(platform: str, config: Dict[str, Any]) -> PlatformAdapter:
+    """Адаптер платформы; без ключей API используется локальный мок"""
+
+    adapter_class, credential = PLATFORM_ADAPTERS.get(platform, (None, None))
+    if adapter_class is None or not config.get(credential):
+        return MockPlatformAdapter(config, name=platform)
+    return adapter_class(config)
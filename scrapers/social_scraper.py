@@ -1,21 +1,54 @@
 """Скрапер для анализа социальных сетей конкурентов"""
 
+from __future__ import annotations
+
 import asyncio
-from typing import Dict, List, Any
-from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from scrapers.http_client import HttpClient
+from scrapers.social_platforms import PlatformAdapter, create_adapter
+from storage.social_history import SocialHistoryStore
 
 
 class SocialScraper:
     """Скрапер для сбора данных с социальных сетей"""
-    
-    def __init__(self, config: Dict[str, Any]):
+
+    def __init__(self, config: Dict[str, Any], history: Optional[SocialHistoryStore] = None,
+                 http: Optional[HttpClient] = None):
         self.config = config
+        # Запросы к API платформ ограничиваются по хостам (см. HttpClient)
+        self.http = http or HttpClient(config)
+        # История постов: при наличии собираются только посты новее сохраненного курсора
+        self.history = history
         self.platforms = config.get('platforms', ['twitter', 'linkedin'])
         self.max_posts = config.get('max_posts', 50)
-    
-    async def scrape_social_profiles(self, company_name: str) -> Dict[str, Any]:
-        """Сбор данных со всех социальных платформ"""
+        self.adapters = {
+            platform: create_adapter(platform, self._adapter_config(platform))
+            for platform in self.platforms
+        }
+
+    def _adapter_config(self, platform: str) -> Dict[str, Any]:
+        """Общие настройки соцсетей плюс секция конкретной платформы"""
+        return {
+            'page_size': self.config.get('page_size', 20),
+            'timeout': self.config.get('timeout', 30),
+            **(self.config.get(platform) or {})
+        }
+
+    async def scrape_social_profiles(self, company_name: str,
+                                     handles: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Сбор данных со всех социальных платформ
+        
+        handles - аккаунты компании по платформам (см. SocialHandleResolver)
+        """
         
+        handles = handles or {}
+        seeded = set()
+        for platform, adapter in self.adapters.items():
+            if handles.get(platform) and adapter.website_handles:
+                adapter.set_handle(company_name, handles[platform])
+                seeded.add(platform)
+
         social_data = {
             'company': company_name,
             'platforms': {},
@@ -25,30 +58,73 @@ class SocialScraper:
                 'most_active_platform': ''
             }
         }
-        
-        # Мок-данные для демонстрации
-        if 'twitter' in self.platforms:
-            social_data['platforms']['twitter'] = {
-                'followers': 1250,
-                'posts_count': 89,
-                'recent_posts': [
-                    {
-                        'text': f'Новости от {company_name}!',
-                        'likes': 45,
-                        'date': datetime.now().isoformat()
-                    }
-                ]
-            }
-        
-        if 'linkedin' in self.platforms:
-            social_data['platforms']['linkedin'] = {
-                'followers': 2340,
-                'employees': 150,
-                'industry': 'Technology'
-            }
-        
+
+        # Все платформы опрашиваются параллельно
+        results = await asyncio.gather(*[
+            self._scrape_platform(self.http, adapter, company_name)
+            for adapter in self.adapters.values()
+        ], return_exceptions=True)
+
+        for platform, result in zip(self.adapters, results):
+            if isinstance(result, Exception):
+                social_data['platforms'][platform] = {'error': str(result)}
+            else:
+                result['handle_source'] = 'website' if platform in seeded else 'guess'
+                social_data['platforms'][platform] = result
+
         # Подсчет общей статистики
-        for platform_data in social_data['platforms'].values():
+        most_active_posts = 0
+        for platform, platform_data in social_data['platforms'].items():
             social_data['summary']['total_followers'] += platform_data.get('followers', 0)
-        
+            posts = len(platform_data.get('recent_posts', []))
+            social_data['summary']['total_posts'] += posts
+            if posts > most_active_posts:
+                most_active_posts = posts
+                social_data['summary']['most_active_platform'] = platform
+
         return social_data
+
+    async def close(self):
+        await self.http.close()
+
+    async def _scrape_platform(self, client: HttpClient, adapter: PlatformAdapter,
+                               company_name: str) -> Dict[str, Any]:
+        """Профиль и последние посты одной платформы (не больше max_posts)"""
+
+        profile = await adapter.fetch_profile(client, company_name)
+
+        if self.history is None:
+            recent_posts: List[Dict[str, Any]] = [
+                post async for post in adapter.iter_posts(client, company_name, self.max_posts)
+            ]
+            return {
+                **profile,
+                'recent_posts': recent_posts,
+                'source': adapter.source
+            }
+
+        # Обращения к SQLite-истории выполняются вне event loop
+        since = await asyncio.to_thread(self.history.cursor, company_name, adapter.name)
+        new_posts = [
+            post async for post in adapter.iter_posts(client, company_name, self.max_posts, since)
+        ]
+        history = await asyncio.to_thread(
+            self._update_history, company_name, adapter.name, new_posts, profile.get('followers', 0)
+        )
+
+        return {
+            **profile,
+            **history,
+            'source': adapter.source
+        }
+
+    def _update_history(self, company_name: str, platform: str, new_posts: List[Dict[str, Any]],
+                        followers: int) -> Dict[str, Any]:
+        """Сохранение новых постов и статистика по всей истории (в рабочем потоке)"""
+
+        added = self.history.add_posts(company_name, platform, new_posts)
+        return {
+            'recent_posts': self.history.recent_posts(company_name, platform, self.max_posts),
+            'new_posts': added,
+            **self.history.statistics(company_name, platform, followers)
+        }
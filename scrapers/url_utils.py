@@ -0,0 +1,139 @@
+"""Разбор и классификация ссылок с кешированием
+
+Хосты сводятся к регистрируемому домену (example.co.uk, а не www.shop.example.co.uk),
+после чего категория определяется одним обращением к словарю вместо перебора подстрок.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# Публичные суффиксы из двух частей, под которыми регистрируются домены
+MULTI_PART_SUFFIXES = frozenset({
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'me.uk',
+    'com.au', 'net.au', 'org.au',
+    'co.nz', 'co.jp', 'ne.jp', 'co.kr', 'co.in', 'co.za', 'co.il',
+    'com.br', 'com.cn', 'com.tr', 'com.mx', 'com.ar', 'com.sg', 'com.hk', 'com.tw', 'com.ua',
+    'msk.ru', 'spb.ru', 'com.ru'
+})
+
+# Регистрируемый домен -> ключ платформы (совпадает с названиями платформ в конфигурации social)
+SOCIAL_DOMAINS = {
+    'twitter.com': 'twitter',
+    'x.com': 'twitter',
+    'linkedin.com': 'linkedin',
+    'facebook.com': 'facebook',
+    'fb.com': 'facebook',
+    'instagram.com': 'instagram',
+    'youtube.com': 'youtube',
+    'youtu.be': 'youtube',
+    'github.com': 'github'
+}
+
+# Названия платформ для отчетов
+SOCIAL_PLATFORM_NAMES = {
+    'twitter': 'Twitter',
+    'linkedin': 'LinkedIn',
+    'facebook': 'Facebook',
+    'instagram': 'Instagram',
+    'youtube': 'YouTube',
+    'github': 'GitHub'
+}
+
+# Агрегаторы и справочники, которые не могут быть официальным сайтом компании
+AGGREGATOR_DOMAINS = frozenset({
+    'wikipedia.org', 'crunchbase.com', 'glassdoor.com', 'bloomberg.com', 'zoominfo.com'
+})
+
+HOST_CATEGORIES = {
+    **{domain: 'social' for domain in SOCIAL_DOMAINS},
+    **{domain: 'aggregator' for domain in AGGREGATOR_DOMAINS}
+}
+
+
+class ParsedURL(NamedTuple):
+    """Разобранная ссылка; host без www, порта и учетных данных"""
+
+    scheme: str
+    host: str
+    domain: str
+    path: str
+    query: str
+
+    @property
+    def is_absolute(self) -> bool:
+        return bool(self.host)
+
+
+@lru_cache(maxsize=65536)
+def parse_url(url: str) -> ParsedURL:
+    """Разбор ссылки (результат кешируется: одни и те же ссылки повторяются на страницах)"""
+
+    url = (url or '').strip()
+    if url.startswith('//'):
+        url = 'https:' + url
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return ParsedURL('', '', '', '', '')
+
+    host = normalize_host(parts.netloc)
+    return ParsedURL(parts.scheme.lower(), host, registered_domain(host), parts.path, parts.query)
+
+
+@lru_cache(maxsize=16384)
+def normalize_host(netloc: str) -> str:
+    """Хост в нижнем регистре без учетных данных, порта, точки в конце и www."""
+
+    host = netloc.rpartition('@')[2].lower()
+    if host.startswith('['):
+        # IPv6-адрес
+        return host.partition(']')[0] + ']'
+    host = host.partition(':')[0].rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+@lru_cache(maxsize=16384)
+def registered_domain(host: str) -> str:
+    """Регистрируемый домен: последние две метки или три для суффиксов вида co.uk"""
+
+    labels = host.split('.')
+    if len(labels) <= 2 or host.startswith('['):
+        return host
+    if '.'.join(labels[-2:]) in MULTI_PART_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def host_category(url: str) -> Optional[str]:
+    """Категория хоста ссылки: social, aggregator или None"""
+    return HOST_CATEGORIES.get(parse_url(url).domain)
+
+
+def social_platform(url: str) -> Optional[str]:
+    """Ключ соцсети для ссылки на нее, иначе None"""
+    return SOCIAL_DOMAINS.get(parse_url(url).domain)
+
+
+def classify_link(href: str, base_domain: str) -> Tuple[str, Optional[str]]:
+    """Тип ссылки относительно сайта: ('internal' | 'external' | 'social' | 'other', платформа)
+
+    base_domain - регистрируемый домен сайта; поддомены сайта считаются внутренними
+    """
+
+    parsed = parse_url(href)
+    if not parsed.host:
+        if parsed.scheme in ('', 'http', 'https'):
+            return 'internal', None
+        # mailto:, tel:, javascript:
+        return 'other', None
+
+    platform = SOCIAL_DOMAINS.get(parsed.domain)
+    if platform is not None:
+        return 'social', platform
+    if parsed.domain == base_domain:
+        return 'internal', None
+    return 'external', None
@@ -1,7 +1,6 @@
 """Скрапер для анализа веб-сайтов конкурентов"""
 
 import asyncio
-import aiohttp
 from bs4 import BeautifulSoup
 from typing import Dict, List, Any, Optional
 from selenium import webdriver
@@ -9,13 +8,16 @@ from selenium.webdriver.chrome.options import Options
 from urllib.parse import urljoin, urlparse
 import re
 
+from scrapers.http_client import HttpClient
+from scrapers.records import Product, PricingPlan
+
 
 class WebsiteScraper:
     """Скрапер для сбора данных с веб-сайтов"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], http: Optional[HttpClient] = None):
         self.config = config
-        self.session = None
+        self.http = http or HttpClient(config)
         self.driver = None
     
     async def scrape_company_site(self, company_name: str) -> Dict[str, Any]:
@@ -58,41 +60,38 @@ class WebsiteScraper:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {'User-Agent': self.config.get('user_agent', 'Mozilla/5.0')}
-                timeout = aiohttp.ClientTimeout(total=self.config.get('timeout', 30))
+            headers = {'User-Agent': self.config.get('user_agent', 'Mozilla/5.0')}
+            response = await self.http.get(url, headers=headers, timeout=self.config.get('timeout', 30))
+            if response.status == 200:
+                html = response.text()
+                soup = BeautifulSoup(html, 'html.parser')
+                
+                # Извлечение базовой информации
+                data['title'] = soup.find('title').get_text() if soup.find('title') else ''
+                
+                meta_desc = soup.find('meta', attrs={'name': 'description'})
+                data['description'] = meta_desc.get('content', '') if meta_desc else ''
+                
+                # Извлечение ключевых слов
+                meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
+                if meta_keywords:
+                    data['keywords'] = [kw.strip() for kw in meta_keywords.get('content', '').split(',')]
+                
+                # Анализ контента
+                data['content_sections'] = self._extract_content_sections(soup)
+                
+                # Поиск информации о продуктах
+                data['products'] = self._extract_products(soup)
+                
+                # Поиск ценовой информации
+                data['pricing'] = self._extract_pricing(soup)
+                
+                # Контактная информация
+                data['contact_info'] = self._extract_contact_info(soup)
+                
+                # Анализ используемых технологий
+                data['technologies'] = self._detect_technologies(soup, html)
                 
-                async with session.get(url, headers=headers, timeout=timeout) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Извлечение базовой информации
-                        data['title'] = soup.find('title').get_text() if soup.find('title') else ''
-                        
-                        meta_desc = soup.find('meta', attrs={'name': 'description'})
-                        data['description'] = meta_desc.get('content', '') if meta_desc else ''
-                        
-                        # Извлечение ключевых слов
-                        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-                        if meta_keywords:
-                            data['keywords'] = [kw.strip() for kw in meta_keywords.get('content', '').split(',')]
-                        
-                        # Анализ контента
-                        data['content_sections'] = self._extract_content_sections(soup)
-                        
-                        # Поиск информации о продуктах
-                        data['products'] = self._extract_products(soup)
-                        
-                        # Поиск ценовой информации
-                        data['pricing'] = self._extract_pricing(soup)
-                        
-                        # Контактная информация
-                        data['contact_info'] = self._extract_contact_info(soup)
-                        
-                        # Анализ используемых технологий
-                        data['technologies'] = self._detect_technologies(soup, html)
-                        
         except Exception as e:
             data['error'] = str(e)
         
@@ -119,7 +118,7 @@ class WebsiteScraper:
         
         return sections[:10]  # Ограничиваем количество секций
     
-    def _extract_products(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    def _extract_products(self, soup: BeautifulSoup) -> List[Product]:
         """Извлечение информации о продуктах"""
         products = []
         
@@ -132,33 +131,29 @@ class WebsiteScraper:
         for selector in product_selectors:
             elements = soup.select(selector)
             for el in elements[:5]:  # Ограничиваем количество
-                product = {
-                    'name': '',
-                    'description': '',
-                    'price': ''
-                }
+                product = Product('')
                 
                 # Попытка извлечь название
                 name_el = el.find(['h1', 'h2', 'h3', 'h4', '.name', '.title'])
                 if name_el:
-                    product['name'] = name_el.get_text().strip()
+                    product.name = name_el.get_text().strip()
                 
                 # Попытка извлечь описание
                 desc_el = el.find(['p', '.description', '.desc'])
                 if desc_el:
-                    product['description'] = desc_el.get_text().strip()[:200]
+                    product.description = desc_el.get_text().strip()[:200]
                 
                 # Попытка извлечь цену
                 price_el = el.find(['.price', '.cost', '[data-price]'])
                 if price_el:
-                    product['price'] = price_el.get_text().strip()
+                    product.price = price_el.get_text().strip()
                 
-                if product['name']:  # Добавляем только если есть название
+                if product.name:  # Добавляем только если есть название
                     products.append(product)
         
         return products
     
-    def _extract_pricing(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    def _extract_pricing(self, soup: BeautifulSoup) -> List[PricingPlan]:
         """Извлечение ценовой информации"""
         pricing = []
         
@@ -171,27 +166,23 @@ class WebsiteScraper:
         for selector in price_selectors:
             elements = soup.select(selector)
             for el in elements[:5]:
-                plan = {
-                    'name': '',
-                    'price': '',
-                    'features': []
-                }
+                plan = PricingPlan('')
                 
                 # Название плана
                 name_el = el.find(['h1', 'h2', 'h3', 'h4', '.plan-name'])
                 if name_el:
-                    plan['name'] = name_el.get_text().strip()
+                    plan.name = name_el.get_text().strip()
                 
                 # Цена
                 price_el = el.find(['.price', '.cost', '.amount'])
                 if price_el:
-                    plan['price'] = price_el.get_text().strip()
+                    plan.price = price_el.get_text().strip()
                 
                 # Функции
                 feature_els = el.find_all(['li', '.feature'])
-                plan['features'] = [f.get_text().strip() for f in feature_els[:5]]
+                plan.features = [f.get_text().strip() for f in feature_els[:5]]
                 
-                if plan['price']:  # Добавляем только если есть цена
+                if plan.price:  # Добавляем только если есть цена
                     pricing.append(plan)
         
         return pricing
@@ -254,7 +245,6 @@ class WebsiteScraper:
     
     async def close(self):
         """Закрытие ресурсов"""
-        if self.session:
-            await self.session.close()
+        await self.http.close()
         if self.driver:
             self.driver.quit()
\ No newline at end of file
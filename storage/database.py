@@ -0,0 +1,28 @@
+"""Подключение к SQLite базе из секции database конфигурации"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Any
+
+
+def connect(config: Dict[str, Any], check_same_thread: bool = True) -> sqlite3.Connection:
+    """Открытие базы с WAL-журналом для параллельного чтения во время записи
+
+    check_same_thread=False - соединение используется из нескольких потоков; доступ
+    к нему сериализует владелец (блокировкой)
+    """
+
+    db_type = config.get('type', 'sqlite')
+    if db_type != 'sqlite':
+        raise ValueError(f"Неподдерживаемый тип базы данных: {db_type}")
+
+    db_path = config.get('path', 'data/competitors.db')
+    if db_path != ':memory:':
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+    connection = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+    connection.row_factory = sqlite3.Row
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute('PRAGMA foreign_keys=ON')
+    return connection
@@ -0,0 +1,127 @@
+"""Архив HTTP-ответов для записи и воспроизведения запусков без сети
+
+Формат близок к WARC: ответы дописываются в responses.warc.gz отдельными gzip-членами
+(каждая запись распаковывается независимо по смещению), индекс responses.cdx - строки
+JSON {ключ запроса, смещение, длина}; при открытии он загружается в словарь.
+Запись: строка JSON с метаданными ответа, перевод строки, тело ответа.
+"""
+
+import gzip
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+ARCHIVE_FILE = 'responses.warc.gz'
+INDEX_FILE = 'responses.cdx'
+
+
+def request_key(method: str, url: str, params: Dict[str, Any] = None) -> str:
+    """Ключ запроса: метод и адрес с отсортированными параметрами, без фрагмента
+
+    Заголовки запроса в ключ не входят (в них токены API)
+    """
+
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(name), str(value)) for name, value in params.items())
+    url = urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', urlencode(sorted(query)), ''
+    ))
+    return f"{method.upper()} {url}"
+
+
+class HttpArchive:
+    """Сжатый архив ответов с индексом ключ запроса -> (смещение, длина)"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.root = Path(config.get('archive_dir', 'data/http_archive'))
+        self.archive_path = self.root / ARCHIVE_FILE
+        self.index_path = self.root / INDEX_FILE
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self._reader: Optional[int] = None
+        self._writer = None
+        self._index_writer = None
+        # put вызывается из потоков (asyncio.to_thread), записи не должны перемежаться
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Недописанная строка после аварийного завершения
+                    continue
+                # Повторная запись того же запроса заменяет прежнюю
+                self.index[entry['key']] = (entry['offset'], entry['length'])
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """Метаданные и тело ответа на запрос или None"""
+
+        location = self.index.get(key)
+        if location is None:
+            return None
+        if self._reader is None:
+            self._reader = os.open(self.archive_path, os.O_RDONLY)
+        offset, length = location
+        payload = gzip.decompress(os.pread(self._reader, length, offset))
+        header, _, body = payload.partition(b'\n')
+        return json.loads(header), body
+
+    def put(self, key: str, metadata: Dict[str, Any], body: bytes):
+        """Дописывание ответа в архив и в индекс"""
+
+        header = json.dumps({'key': key, **metadata}, ensure_ascii=False).encode('utf-8')
+        record = gzip.compress(header + b'\n' + body, mtime=0)
+
+        with self._lock:
+            if self._writer is None:
+                self._open_writers()
+            offset = self._writer.tell()
+            self._writer.write(record)
+            self._writer.flush()
+            # Индекс пишется после данных: при сбое запись просто не попадет в индекс
+            self._index_writer.write(
+                json.dumps({'key': key, 'offset': offset, 'length': len(record)}, ensure_ascii=False)
+                + '\n'
+            )
+            self._index_writer.flush()
+            self.index[key] = (offset, len(record))
+
+    def _open_writers(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._writer = open(self.archive_path, 'ab')
+        # Недописанная последняя строка индекса не должна склеиться с новой записью
+        terminated = True
+        if self.index_path.exists() and self.index_path.stat().st_size:
+            with open(self.index_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                terminated = f.read(1) == b'\n'
+        self._index_writer = open(self.index_path, 'a', encoding='utf-8')
+        if not terminated:
+            self._index_writer.write('\n')
+
+    def close(self):
+        if self._reader is not None:
+            os.close(self._reader)
+            self._reader = None
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._index_writer.close()
+                self._writer = self._index_writer = None
@@ -0,0 +1,271 @@
+"""Хранилище временных рядов метрик компаний с инкрементальным расчетом трендов"""
+
+import math
+import re
+import sqlite3
+from datetime import date, datetime
+from typing import Dict, List, Any, Optional, Union
+
+from analyzers.market_frame import extract_metrics
+from storage.database import connect
+
+
+# Окна скользящих средних, которые пересчитываются при каждой вставке
+MOVING_AVERAGE_WINDOWS = (7, 30)
+
+# Число с точкой или запятой перед группами ровно из трех цифр (и дробной частью после
+# другого знака) либо число с необязательной дробной частью
+PRICE_PATTERN = re.compile(
+    r"\d{1,3}(?P<sep>[.,])\d{3}(?!\d)(?:(?P=sep)\d{3}(?!\d))*(?:(?!(?P=sep))[.,]\d+)?"
+    r"|\d+(?:[.,]\d+)?"
+)
+# Пробелы (в т.ч. неразрывный и узкий) перед группой из трех цифр - всегда разряды: 1 990 ₽
+SPACE_SEPARATOR = re.compile(r"(?<=\d)[\s\u00a0\u2009\u202f](?=\d{3}(?!\d))")
+# Запись цены с десятичной запятой: валюта после числа в евро (1.299 €) или рубли
+DECIMAL_COMMA_PRICE = re.compile(r"\d\s*€|₽|руб", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric_points (
+    company TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    date TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    value REAL NOT NULL,
+    delta REAL,
+    growth_rate REAL,
+    cumsum REAL NOT NULL,
+    ma_7 REAL,
+    ma_30 REAL,
+    PRIMARY KEY (company, metric, date)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_metric_points_seq ON metric_points (company, metric, seq);
+CREATE INDEX IF NOT EXISTS idx_metric_points_date_company ON metric_points (date, company);
+"""
+
+
+def parse_price(text: Any) -> Optional[float]:
+    """Первое число в строке цены без разделителей разрядов (десятичная точка или запятая)
+
+    Точка или запятая перед тремя цифрами отделяет разряды, если она повторяется или в числе
+    есть другой знак (1,000,000, 1.299,00 €). Одиночная трактуется по записи цены: запятая -
+    разряды, точка - дробная часть ($1,299, $9.999), в ценах с десятичной запятой наоборот.
+    """
+
+    text = SPACE_SEPARATOR.sub('', str(text or ''))
+    match = PRICE_PATTERN.search(text)
+    if match is None:
+        return None
+
+    number, separator = match.group(), match.group('sep')
+    if separator is not None:
+        grouped = number.count(separator) > 1 or ('.' in number and ',' in number)
+        if not grouped:
+            grouped = (separator == ',') != bool(DECIMAL_COMMA_PRICE.search(text))
+        if grouped:
+            number = number.replace(separator, '')
+    return float(number.replace(',', '.'))
+
+
+def extract_time_series_metrics(collected_data: Dict) -> Dict[str, float]:
+    """Числовые метрики компании для временного ряда"""
+
+    metrics = {
+        metric: value for metric, value in extract_metrics(collected_data).items()
+        if value is not None and not (isinstance(value, float) and math.isnan(value))
+    }
+
+    website_data = collected_data.get('website_data', {}) or {}
+    social_data = collected_data.get('social_data', {}) or {}
+    additional_pages = website_data.get('additional_pages', {}) or {}
+
+    for platform, platform_data in social_data.get('platforms', {}).items():
+        if 'followers' in platform_data:
+            metrics[f'followers.{platform}'] = platform_data['followers']
+
+    if 'main_page' in website_data:
+        metrics['pages_count'] = 1 + len(additional_pages)
+
+    plans = list(website_data.get('pricing', []))
+    plans.extend((additional_pages.get('pricing_page') or {}).get('plans', []))
+    prices = []
+    for plan in plans:
+        price = parse_price(plan.get('price'))
+        if price is not None:
+            prices.append(price)
+    if prices:
+        metrics['price_min'] = min(prices)
+        metrics['price_max'] = max(prices)
+
+    return metrics
+
+
+class MetricsStore:
+    """Append-only временные ряды метрик в SQLite (одна точка на компанию, метрику и день)"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.connection = connect(config)
+        self.connection.executescript(SCHEMA)
+
+    def record(self, company: str, collected_data: Dict,
+               on_date: Union[date, datetime, str] = None) -> Dict[str, Dict[str, Any]]:
+        """Запись метрик компании из результатов анализа"""
+
+        on_date = on_date or collected_data.get('timestamp') or datetime.now()
+        metrics = extract_time_series_metrics(collected_data)
+
+        with self.connection:
+            return {
+                metric: self._insert(company, metric, float(value), on_date)
+                for metric, value in metrics.items()
+            }
+
+    def add_point(self, company: str, metric: str, value: float,
+                  on_date: Union[date, datetime, str]) -> Dict[str, Any]:
+        """Добавление одной точки ряда"""
+
+        with self.connection:
+            return self._insert(company, metric, float(value), on_date)
+
+    def _insert(self, company: str, metric: str, value: float,
+                on_date: Union[date, datetime, str]) -> Dict[str, Any]:
+        """Вставка точки с расчетом производных по предыдущей точке и накопленной сумме"""
+
+        day = self._to_day(on_date)
+        last = self.connection.execute(
+            'SELECT date, seq FROM metric_points WHERE company = ? AND metric = ? '
+            'ORDER BY seq DESC LIMIT 1',
+            (company, metric)
+        ).fetchone()
+
+        if last is not None and day < last['date']:
+            raise ValueError(
+                f"Ряд {company}/{metric} дополняется только новыми датами: {day} < {last['date']}"
+            )
+
+        # Повторный снимок за тот же день заменяет последнюю точку
+        if last is not None and day == last['date']:
+            self.connection.execute(
+                'DELETE FROM metric_points WHERE company = ? AND metric = ? AND seq = ?',
+                (company, metric, last['seq'])
+            )
+            seq = last['seq']
+        else:
+            seq = last['seq'] + 1 if last is not None else 1
+
+        previous = self._point(company, metric, seq - 1)
+        cumsum = value + (previous['cumsum'] if previous else 0.0)
+
+        delta = value - previous['value'] if previous else None
+        growth_rate = None
+        if previous and previous['value']:
+            growth_rate = delta / abs(previous['value'])
+
+        averages = {}
+        for window in MOVING_AVERAGE_WINDOWS:
+            base = self._point(company, metric, seq - window)
+            size = min(window, seq)
+            averages[window] = (cumsum - (base['cumsum'] if base else 0.0)) / size
+
+        point = {
+            'company': company,
+            'metric': metric,
+            'date': day,
+            'seq': seq,
+            'value': value,
+            'delta': delta,
+            'growth_rate': growth_rate,
+            'cumsum': cumsum,
+            'ma_7': averages[7],
+            'ma_30': averages[30]
+        }
+        self.connection.execute(
+            'INSERT INTO metric_points (company, metric, date, seq, value, delta, growth_rate, '
+            'cumsum, ma_7, ma_30) VALUES (:company, :metric, :date, :seq, :value, :delta, '
+            ':growth_rate, :cumsum, :ma_7, :ma_30)',
+            point
+        )
+        return point
+
+    def _point(self, company: str, metric: str, seq: int) -> Optional[sqlite3.Row]:
+        if seq < 1:
+            return None
+        return self.connection.execute(
+            'SELECT value, cumsum FROM metric_points WHERE company = ? AND metric = ? AND seq = ?',
+            (company, metric, seq)
+        ).fetchone()
+
+    def latest(self, company: str) -> Dict[str, Dict[str, Any]]:
+        """Последние значения и тренды всех метрик компании"""
+
+        rows = self.connection.execute(
+            'SELECT p.* FROM metric_points p '
+            'JOIN (SELECT metric, MAX(seq) AS seq FROM metric_points WHERE company = ? '
+            'GROUP BY metric) last ON p.metric = last.metric AND p.seq = last.seq '
+            'WHERE p.company = ?',
+            (company, company)
+        ).fetchall()
+        return {row['metric']: self._row_to_dict(row) for row in rows}
+
+    def trend(self, company: str, metric: str, start: Union[date, str] = None,
+              end: Union[date, str] = None) -> List[Dict[str, Any]]:
+        """Точки ряда за период с рассчитанными дельтами и средними"""
+
+        query = 'SELECT * FROM metric_points WHERE company = ? AND metric = ?'
+        params: List[Any] = [company, metric]
+        if start:
+            query += ' AND date >= ?'
+            params.append(self._to_day(start))
+        if end:
+            query += ' AND date <= ?'
+            params.append(self._to_day(end))
+        query += ' ORDER BY seq'
+
+        return [self._row_to_dict(row) for row in self.connection.execute(query, params)]
+
+    def moving_average(self, company: str, metric: str, window: int) -> Optional[float]:
+        """Скользящее среднее по произвольному окну через накопленные суммы (две точки ряда)"""
+
+        last = self.connection.execute(
+            'SELECT seq, cumsum FROM metric_points WHERE company = ? AND metric = ? '
+            'ORDER BY seq DESC LIMIT 1',
+            (company, metric)
+        ).fetchone()
+        if last is None:
+            return None
+
+        base = self._point(company, metric, last['seq'] - window)
+        size = min(window, last['seq'])
+        return (last['cumsum'] - (base['cumsum'] if base else 0.0)) / size
+
+    def growth(self, company: str, metric: str, start: Union[date, str],
+               end: Union[date, str] = None) -> Optional[float]:
+        """Относительный рост метрики за период"""
+
+        query = 'SELECT value FROM metric_points WHERE company = ? AND metric = ? AND date >= ?'
+        params: List[Any] = [company, metric, self._to_day(start)]
+        if end:
+            query += ' AND date <= ?'
+            params.append(self._to_day(end))
+
+        first = self.connection.execute(query + ' ORDER BY seq ASC LIMIT 1', params).fetchone()
+        last = self.connection.execute(query + ' ORDER BY seq DESC LIMIT 1', params).fetchone()
+
+        if first is None or not first['value']:
+            return None
+        return (last['value'] - first['value']) / abs(first['value'])
+
+    def close(self):
+        self.connection.close()
+
+    def _row_to_dict(self, row) -> Dict[str, Any]:
+        point = dict(row)
+        point.pop('cumsum', None)
+        return point
+
+    def _to_day(self, value: Union[date, datetime, str]) -> str:
+        if isinstance(value, datetime):
+            return value.date().isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        return str(value)[:10]
@@ -0,0 +1,260 @@
+"""Хранилище исходного HTML страниц в сегментных файлах с индексом смещений
+
+Страницы дописываются в сегменты pages-NNNNNN.seg (новый сегмент - по достижении
+page_segment_mb), каждая запись сжата отдельно. Индекс (url, время загрузки) ->
+(сегмент, смещение, длина) хранится рядом в SQLite. Читатели отображают сегменты
+в память (mmap) и получают запись срезом без чтения сегмента целиком.
+
+Формат записи: заголовок RECORD_HEADER, адрес страницы в UTF-8, сжатое тело.
+Адрес и время загрузки в заголовке позволяют восстановить индекс сканированием сегментов.
+
+Запись выполняется из рабочих потоков (asyncio.to_thread), поэтому индекс и отображения
+сегментов защищены блокировкой.
+"""
+
+import mmap
+import struct
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, NamedTuple, Optional, Tuple
+
+from storage.database import connect
+from utils.lazy import lazy_import
+
+zstandard = lazy_import('zstandard')
+
+
+RECORD_MAGIC = b'PGR1'
+# magic, кодек, длина адреса, длина сжатого тела, длина исходного тела, время (unix)
+RECORD_HEADER = struct.Struct('<4sBxHIId')
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+SEGMENT_PATTERN = 'pages-{:06d}.seg'
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    raw_length INTEGER NOT NULL,
+    codec INTEGER NOT NULL,
+    PRIMARY KEY (url, fetched_at)
+) WITHOUT ROWID;
+"""
+
+
+class PageRef(NamedTuple):
+    """Положение сжатого тела страницы в сегменте"""
+
+    segment: int
+    offset: int
+    length: int
+    raw_length: int
+    codec: int
+
+
+class PageStore:
+    """Append-only хранилище страниц: запись в активный сегмент, чтение через mmap"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.root = Path(config.get('pages_dir', 'data/pages'))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = int(config.get('page_segment_mb', 256)) * 1024 * 1024
+        self.level = config.get('page_compression_level', 3)
+        self.codec = CODEC_ZSTD if zstandard else CODEC_ZLIB
+
+        self.index = connect({'path': str(self.root / 'index.sqlite')}, check_same_thread=False)
+        self.index.executescript(INDEX_SCHEMA)
+        self._lock = threading.RLock()
+
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._writer = None
+        self._segment = self._last_segment()
+        self._compressor = None
+        self._decompressor = None
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.root / SEGMENT_PATTERN.format(segment)
+
+    def _last_segment(self) -> int:
+        numbers = [
+            int(path.stem.split('-')[1]) for path in self.root.glob('pages-*.seg')
+        ]
+        return max(numbers, default=1)
+
+    def put(self, url: str, body: bytes, fetched_at: datetime = None) -> PageRef:
+        """Сохранение тела страницы; повтор того же url и времени заменяет запись в индексе"""
+
+        fetched_at = fetched_at or datetime.now()
+        url_bytes = url.encode('utf-8')
+
+        with self._lock:
+            payload = self._compress(body)
+            header = RECORD_HEADER.pack(
+                RECORD_MAGIC, self.codec, len(url_bytes), len(payload), len(body),
+                fetched_at.timestamp()
+            )
+
+            writer = self._get_writer(len(header) + len(url_bytes) + len(payload))
+            start = writer.tell()
+            writer.write(header)
+            writer.write(url_bytes)
+            writer.write(payload)
+            writer.flush()
+
+            ref = PageRef(
+                self._segment, start + len(header) + len(url_bytes), len(payload), len(body),
+                self.codec
+            )
+            # Индекс обновляется после записи данных: читатель не увидит недописанную запись
+            with self.index:
+                self.index.execute(
+                    'INSERT OR REPLACE INTO pages (url, fetched_at, segment, offset, length, '
+                    'raw_length, codec) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (url, fetched_at.isoformat(), *ref)
+                )
+        return ref
+
+    def locate(self, url: str, at: datetime = None) -> Optional[PageRef]:
+        """Последняя версия страницы, загруженная не позже at (без at - самая свежая)"""
+
+        query = 'SELECT segment, offset, length, raw_length, codec FROM pages WHERE url = ?'
+        params: List[Any] = [url]
+        if at is not None:
+            query += ' AND fetched_at <= ?'
+            params.append(at.isoformat())
+        with self._lock:
+            row = self.index.execute(
+                query + ' ORDER BY fetched_at DESC LIMIT 1', params
+            ).fetchone()
+        return PageRef(*row) if row else None
+
+    def view(self, ref: PageRef) -> memoryview:
+        """Сжатое тело записи - срез отображенного сегмента без копирования"""
+
+        segment_map = self._map(ref.segment, ref.offset + ref.length)
+        return memoryview(segment_map)[ref.offset:ref.offset + ref.length]
+
+    def read(self, ref: PageRef) -> bytes:
+        """Распакованное тело записи"""
+
+        payload = self.view(ref)
+        try:
+            if ref.codec == CODEC_ZSTD:
+                if self._decompressor is None:
+                    self._decompressor = zstandard.ZstdDecompressor()
+                return self._decompressor.decompress(payload, max_output_size=ref.raw_length)
+            return zlib.decompress(payload)
+        finally:
+            payload.release()
+
+    def get(self, url: str, at: datetime = None) -> Optional[bytes]:
+        """HTML страницы на момент at (без at - последняя версия)"""
+
+        ref = self.locate(url, at)
+        return self.read(ref) if ref is not None else None
+
+    def versions(self, url: str) -> List[datetime]:
+        """Время всех сохраненных версий страницы"""
+
+        with self._lock:
+            rows = self.index.execute(
+                'SELECT fetched_at FROM pages WHERE url = ? ORDER BY fetched_at', (url,)
+            ).fetchall()
+        return [datetime.fromisoformat(row['fetched_at']) for row in rows]
+
+    def scan(self, segment: int) -> Iterator[Tuple[str, datetime, PageRef]]:
+        """Все записи сегмента по порядку (для восстановления индекса)"""
+
+        path = self._segment_path(segment)
+        size = path.stat().st_size if path.exists() else 0
+        if not size:
+            return
+        segment_map = self._map(segment, size)
+        offset = 0
+        while offset + RECORD_HEADER.size <= size:
+            magic, codec, url_length, length, raw_length, timestamp = RECORD_HEADER.unpack_from(
+                segment_map, offset
+            )
+            if magic != RECORD_MAGIC:
+                raise ValueError(f"Поврежденная запись в {path.name} по смещению {offset}")
+            url_start = offset + RECORD_HEADER.size
+            url = bytes(segment_map[url_start:url_start + url_length]).decode('utf-8')
+            payload_start = url_start + url_length
+            if payload_start + length > size:
+                # Недописанная последняя запись
+                break
+            ref = PageRef(segment, payload_start, length, raw_length, codec)
+            yield url, datetime.fromtimestamp(timestamp), ref
+            offset = payload_start + length
+
+    def rebuild_index(self) -> int:
+        """Перестроение индекса по содержимому сегментов"""
+
+        count = 0
+        with self._lock, self.index:
+            self.index.execute('DELETE FROM pages')
+            for segment in range(1, self._last_segment() + 1):
+                for url, fetched_at, ref in self.scan(segment):
+                    self.index.execute(
+                        'INSERT OR REPLACE INTO pages (url, fetched_at, segment, offset, length, '
+                        'raw_length, codec) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (url, fetched_at.isoformat(), *ref)
+                    )
+                    count += 1
+        return count
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.codec == CODEC_ZSTD:
+            if self._compressor is None:
+                self._compressor = zstandard.ZstdCompressor(level=self.level)
+            return self._compressor.compress(body)
+        return zlib.compress(body, min(self.level, 9))
+
+    def _get_writer(self, record_size: int):
+        """Файл активного сегмента; при переполнении начинается следующий"""
+
+        if self._writer is None:
+            self._writer = open(self._segment_path(self._segment), 'ab')
+        if self._writer.tell() and self._writer.tell() + record_size > self.segment_bytes:
+            self._writer.close()
+            self._segment += 1
+            self._writer = open(self._segment_path(self._segment), 'ab')
+        return self._writer
+
+    def _map(self, segment: int, required: int) -> mmap.mmap:
+        """Отображение сегмента; активный сегмент переотображается, когда запись за его концом"""
+
+        with self._lock:
+            segment_map = self._maps.get(segment)
+            if segment_map is None or len(segment_map) < required:
+                if segment_map is not None:
+                    self._close_map(segment_map)
+                with open(self._segment_path(segment), 'rb') as f:
+                    segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = segment_map
+            return segment_map
+
+    def _close_map(self, segment_map: mmap.mmap):
+        try:
+            segment_map.close()
+        except BufferError:
+            # На отображение еще есть ссылки (view): закроется сборщиком мусора
+            pass
+
+    def close(self):
+        with self._lock:
+            for segment_map in self._maps.values():
+                self._close_map(segment_map)
+            self._maps.clear()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self.index.close()
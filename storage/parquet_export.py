@@ -0,0 +1,265 @@
+"""Экспорт результатов запусков в партиционированный Parquet-датасет для аналитики
+
+Каждая таблица лежит в <parquet_dir>/<таблица>/date=YYYY-MM-DD/<run_id>.parquet
+и читается, например, через pyarrow.dataset.dataset(path, partitioning='hive').
+"""
+
+import math
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from analyzers.market_frame import extract_metrics
+from storage.metrics_store import parse_price
+from storage.serialization import ResultSerializer
+from storage.snapshots import company_slug
+from utils.lazy import lazy_import, module_available
+
+pa = lazy_import('pyarrow')
+
+
+def _schemas() -> Dict[str, 'pa.Schema']:
+    """Типизированные схемы таблиц (общие колонки run_id, company, run_timestamp)"""
+
+    base = [
+        ('run_id', pa.string()),
+        ('company', pa.string()),
+        ('run_timestamp', pa.timestamp('us'))
+    ]
+    return {
+        'companies': pa.schema(base + [
+            ('url', pa.string()),
+            ('quality_score', pa.float64()),
+            ('followers', pa.int64()),
+            ('cta_count', pa.int32()),
+            ('technology_count', pa.int32()),
+            ('pricing_plans', pa.int32()),
+            ('products_count', pa.int32()),
+            ('load_time', pa.float64()),
+            ('sentiment', pa.float64()),
+            ('changes_count', pa.int32())
+        ]),
+        'pages': pa.schema(base + [
+            ('page_type', pa.string()),
+            ('url', pa.string()),
+            ('title', pa.string()),
+            ('text_length', pa.int64()),
+            ('duplicate_of', pa.string()),
+            ('error', pa.string())
+        ]),
+        'ctas': pa.schema(base + [
+            ('text', pa.string()),
+            ('url', pa.string()),
+            ('type', pa.string())
+        ]),
+        'technologies': pa.schema(base + [
+            ('technology', pa.string())
+        ]),
+        'social_metrics': pa.schema(base + [
+            ('platform', pa.string()),
+            ('handle', pa.string()),
+            ('source', pa.string()),
+            ('followers', pa.int64()),
+            ('posts_count', pa.int64()),
+            ('history_posts', pa.int64()),
+            ('avg_interactions', pa.float64()),
+            ('engagement_rate', pa.float64()),
+            ('posts_per_week', pa.float64())
+        ]),
+        'pricing_plans': pa.schema(base + [
+            ('name', pa.string()),
+            ('price', pa.string()),
+            ('price_value', pa.float64()),
+            ('page_type', pa.string())
+        ])
+    }
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _integer(value: Any) -> Optional[int]:
+    value = _number(value)
+    return None if value is None else int(value)
+
+
+def flatten_results(results: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Строки всех таблиц по одному результату CompetitorAgent"""
+
+    company = results.get('company', 'Unknown')
+    timestamp = results.get('timestamp') or datetime.now()
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    base = {
+        'run_id': f"{company_slug(company)}-{timestamp.strftime('%Y%m%dT%H%M%S')}",
+        'company': company,
+        'run_timestamp': timestamp
+    }
+
+    website_data = results.get('website_data') or {}
+    social_data = results.get('social_data') or {}
+    main_page = website_data.get('main_page') or {}
+    additional_pages = website_data.get('additional_pages') or {}
+    metrics = extract_metrics(results)
+
+    tables: Dict[str, List[Dict[str, Any]]] = {
+        'companies': [{
+            **base,
+            'url': website_data.get('url'),
+            'quality_score': _number(metrics['quality_score']),
+            'followers': _integer(metrics['followers']),
+            'cta_count': _integer(metrics['cta_count']),
+            'technology_count': _integer(metrics['technology_count']),
+            'pricing_plans': _integer(metrics['pricing_plans']),
+            'products_count': _integer(metrics['products_count']),
+            'load_time': _number(metrics['load_time']),
+            'sentiment': _number(
+                (results.get('content_analysis') or {}).get('sentiment', {}).get('overall_sentiment')
+            ),
+            'changes_count': len((results.get('changes') or {}).get('changes', []))
+        }],
+        'pages': [],
+        'ctas': [],
+        'technologies': [],
+        'social_metrics': [],
+        'pricing_plans': []
+    }
+
+    pages = [('main', main_page)] if main_page else []
+    pages.extend(
+        (page_type, page) for page_type, page in additional_pages.items() if isinstance(page, dict)
+    )
+    for page_type, page in pages:
+        text = page.get('clean_text') or ' '.join(page.get('text_blocks', []))
+        tables['pages'].append({
+            **base,
+            'page_type': page_type,
+            'url': page.get('url') or (website_data.get('url') if page_type == 'main' else None),
+            'title': page.get('title'),
+            'text_length': len(text),
+            'duplicate_of': page.get('duplicate_of'),
+            'error': page.get('error')
+        })
+
+    for cta in main_page.get('call_to_actions', []):
+        tables['ctas'].append({
+            **base,
+            'text': cta.get('text'),
+            'url': cta.get('url'),
+            'type': cta.get('type')
+        })
+
+    technologies = main_page.get('technologies') or website_data.get('technologies', [])
+    tables['technologies'] = [{**base, 'technology': str(tech)} for tech in technologies]
+
+    for platform, platform_data in (social_data.get('platforms') or {}).items():
+        if 'error' in platform_data:
+            continue
+        tables['social_metrics'].append({
+            **base,
+            'platform': platform,
+            'handle': platform_data.get('handle'),
+            'source': platform_data.get('source'),
+            'followers': _integer(platform_data.get('followers')),
+            'posts_count': _integer(platform_data.get('posts_count')),
+            'history_posts': _integer(platform_data.get('history_posts')),
+            'avg_interactions': _number(platform_data.get('avg_interactions')),
+            'engagement_rate': _number(platform_data.get('engagement_rate')),
+            'posts_per_week': _number(platform_data.get('posts_per_week'))
+        })
+
+    plans = [('website', plan) for plan in website_data.get('pricing', [])]
+    for page_type, page in pages:
+        plans.extend((page_type, plan) for plan in page.get('plans', []))
+    for page_type, plan in plans:
+        # Словари из сохраненных результатов или записи PricingPlan
+        is_mapping = hasattr(plan, 'get')
+        price = str(plan.get('price') or '') if is_mapping else ''
+        tables['pricing_plans'].append({
+            **base,
+            'name': plan.get('name') if is_mapping else str(plan),
+            'price': price,
+            'price_value': parse_price(price),
+            'page_type': page_type
+        })
+
+    return tables
+
+
+class ParquetExporter:
+    """Дозапись плоских таблиц запусков в Parquet-датасет, партиционированный по дате"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.root = Path(config.get('parquet_dir', 'data/parquet'))
+        self.compression = config.get('parquet_compression', 'zstd')
+        # Без pyarrow экспорт пропускается
+        self.enabled = config.get('parquet', True) and module_available('pyarrow')
+        self._schemas: Dict[str, 'pa.Schema'] = {}
+
+    def export(self, results: Dict[str, Any]) -> Dict[str, Path]:
+        """Запись таблиц одного запуска; повторный экспорт того же запуска перезаписывает файлы"""
+
+        if not self.enabled:
+            return {}
+
+        import pyarrow.parquet as pq
+
+        if not self._schemas:
+            self._schemas = _schemas()
+
+        tables = flatten_results(results)
+        run = tables['companies'][0]
+        partition = f"date={run['run_timestamp'].date().isoformat()}"
+
+        written = {}
+        for name, rows in tables.items():
+            partition_dir = self.root / name / partition
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            table_file = partition_dir / f"{run['run_id']}.parquet"
+
+            table = pa.Table.from_pylist(rows, schema=self._schemas[name])
+            # Файлы с точкой в начале имени не попадают в чтение датасета
+            tmp_file = partition_dir / f'.{table_file.name}.tmp'
+            pq.write_table(table, tmp_file, compression=self.compression)
+            os.replace(tmp_file, table_file)
+            written[name] = table_file
+
+        return written
+
+    def export_stored(self, serializer: ResultSerializer) -> int:
+        """Дозапись всех сохраненных запусков, которых еще нет в датасете"""
+
+        if not self.enabled or not serializer.root.exists():
+            return 0
+
+        exported = {path.stem for path in self.root.glob('companies/date=*/*.parquet')}
+        count = 0
+        for company_dir in sorted(serializer.root.iterdir()):
+            if not company_dir.is_dir():
+                continue
+            for result_file in sorted(company_dir.iterdir()):
+                if result_file.name.endswith('.tmp'):
+                    continue
+                run_id = f"{company_dir.name}-{result_file.name.split('.')[0]}"
+                if run_id in exported:
+                    continue
+                self.export(serializer.load(result_file))
+                count += 1
+        return count
+
+    def read_table(self, name: str, columns: List[str] = None, filter_expression=None) -> 'pa.Table':
+        """Чтение таблицы датасета с отбором колонок и партиций"""
+
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(self.root / name, format='parquet', partitioning='hive')
+        return dataset.to_table(columns=columns, filter=filter_expression)
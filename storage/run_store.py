@@ -0,0 +1,220 @@
+"""Хранилище запусков анализа в SQLite: страницы, извлеченные признаки и метрики"""
+
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse
+
+from storage.database import connect
+from storage.metrics_store import extract_time_series_metrics
+from storage.parquet_export import flatten_results
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    company TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    url TEXT,
+    domain TEXT,
+    quality_score REAL,
+    followers INTEGER,
+    sentiment REAL,
+    changes_count INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_company_timestamp ON runs (company, timestamp);
+CREATE TABLE IF NOT EXISTS pages (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    company TEXT NOT NULL,
+    domain TEXT,
+    url TEXT,
+    page_type TEXT NOT NULL,
+    title TEXT,
+    text_length INTEGER,
+    duplicate_of TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pages_domain_url ON pages (domain, url);
+CREATE INDEX IF NOT EXISTS idx_pages_run ON pages (run_id);
+CREATE TABLE IF NOT EXISTS features (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    company TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT,
+    value TEXT,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_features_company_kind ON features (company, kind);
+CREATE INDEX IF NOT EXISTS idx_features_run ON features (run_id);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    company TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_run_metrics_company_metric ON run_metrics (company, metric, timestamp);
+"""
+
+
+def url_domain(url: Optional[str]) -> Optional[str]:
+    """Домен ссылки без www"""
+
+    if not url:
+        return None
+    netloc = urlparse(url if '//' in url else f'https://{url}').netloc.lower().split(':')[0]
+    return netloc[4:] if netloc.startswith('www.') else netloc or None
+
+
+class RunStore:
+    """История запусков: одна транзакция с пакетной вставкой на компанию"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.connection = connect(config)
+        self.connection.executescript(SCHEMA)
+
+    def save_run(self, results: Dict[str, Any]) -> str:
+        """Сохранение результатов запуска; повторное сохранение заменяет запуск целиком"""
+
+        tables = flatten_results(results)
+        run = tables['companies'][0]
+        run_id = run['run_id']
+        timestamp = run['run_timestamp'].isoformat()
+        domain = url_domain(run['url'])
+
+        pages = [
+            (
+                run_id, run['company'], url_domain(page['url']) or domain, page['url'],
+                page['page_type'], page['title'], page['text_length'],
+                page['duplicate_of'], page['error']
+            )
+            for page in tables['pages']
+        ]
+
+        features = [
+            (run_id, run['company'], 'cta', cta['type'], cta['text'], cta['url'])
+            for cta in tables['ctas']
+        ]
+        features.extend(
+            (run_id, run['company'], 'technology', tech['technology'], None, None)
+            for tech in tables['technologies']
+        )
+        features.extend(
+            (run_id, run['company'], 'pricing_plan', plan['name'], plan['price'], plan['page_type'])
+            for plan in tables['pricing_plans']
+        )
+        main_page = (results.get('website_data') or {}).get('main_page') or {}
+        features.extend(
+            (run_id, run['company'], 'social_link', link.get('platform'), None, link.get('url'))
+            for link in main_page.get('social_links', [])
+        )
+
+        metrics = [
+            (run_id, run['company'], timestamp, metric, float(value))
+            for metric, value in extract_time_series_metrics(results).items()
+        ]
+
+        with self.connection:
+            # Каскадно удаляет страницы, признаки и метрики прежней версии запуска
+            self.connection.execute('DELETE FROM runs WHERE run_id = ?', (run_id,))
+            self.connection.execute(
+                'INSERT INTO runs (run_id, company, timestamp, url, domain, quality_score, '
+                'followers, sentiment, changes_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    run_id, run['company'], timestamp, run['url'], domain, run['quality_score'],
+                    run['followers'], run['sentiment'], run['changes_count']
+                )
+            )
+            self.connection.executemany(
+                'INSERT INTO pages (run_id, company, domain, url, page_type, title, text_length, '
+                'duplicate_of, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                pages
+            )
+            self.connection.executemany(
+                'INSERT INTO features (run_id, company, kind, name, value, url) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                features
+            )
+            self.connection.executemany(
+                'INSERT INTO run_metrics (run_id, company, timestamp, metric, value) '
+                'VALUES (?, ?, ?, ?, ?)',
+                metrics
+            )
+
+        return run_id
+
+    def runs(self, company: str, since: datetime = None, limit: int = None) -> List[Dict[str, Any]]:
+        """Запуски компании от новых к старым"""
+
+        query = 'SELECT * FROM runs WHERE company = ?'
+        params: List[Any] = [company]
+        if since:
+            query += ' AND timestamp >= ?'
+            params.append(since.isoformat())
+        query += ' ORDER BY timestamp DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    def latest_run(self, company: str) -> Optional[Dict[str, Any]]:
+        """Последний запуск компании со страницами и признаками"""
+
+        runs = self.runs(company, limit=1)
+        if not runs:
+            return None
+
+        run = runs[0]
+        run['pages'] = [
+            dict(row) for row in self.connection.execute(
+                'SELECT * FROM pages WHERE run_id = ?', (run['run_id'],)
+            )
+        ]
+        run['features'] = [
+            dict(row) for row in self.connection.execute(
+                'SELECT kind, name, value, url FROM features WHERE run_id = ?', (run['run_id'],)
+            )
+        ]
+        return run
+
+    def page_history(self, url: str) -> List[Dict[str, Any]]:
+        """Все сохраненные версии страницы по ее адресу"""
+
+        rows = self.connection.execute(
+            'SELECT p.*, r.timestamp FROM pages p JOIN runs r ON r.run_id = p.run_id '
+            'WHERE p.domain = ? AND p.url = ? ORDER BY r.timestamp',
+            (url_domain(url), url)
+        )
+        return [dict(row) for row in rows]
+
+    def domain_pages(self, domain: str) -> List[Dict[str, Any]]:
+        """Страницы домена из всех запусков"""
+
+        rows = self.connection.execute(
+            'SELECT * FROM pages WHERE domain = ? ORDER BY url', (url_domain(domain),)
+        )
+        return [dict(row) for row in rows]
+
+    def features(self, company: str, kind: str, run_id: str = None) -> List[Dict[str, Any]]:
+        """Признаки одного вида (cta, technology, pricing_plan, social_link)"""
+
+        query = 'SELECT * FROM features WHERE company = ? AND kind = ?'
+        params: List[Any] = [company, kind]
+        if run_id:
+            query += ' AND run_id = ?'
+            params.append(run_id)
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    def metric_history(self, company: str, metric: str) -> List[Dict[str, Any]]:
+        """Значения метрики по всем запускам компании"""
+
+        rows = self.connection.execute(
+            'SELECT run_id, timestamp, value FROM run_metrics '
+            'WHERE company = ? AND metric = ? ORDER BY timestamp',
+            (company, metric)
+        )
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,263 @@
+"""Компактная сериализация результатов анализа с версионированной схемой
+
+Хранение - msgpack (при наличии zstandard со сжатием zstd), отчеты - JSON через orjson.
+Без optional-зависимостей используется стандартный json.
+"""
+
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from scrapers.records import Record
+from storage.snapshots import company_slug
+from utils.lazy import lazy_import
+
+# C-расширения загружаются при первой сериализации; без них - стандартный json
+orjson = lazy_import('orjson')
+msgpack = lazy_import('msgpack')
+zstandard = lazy_import('zstandard')
+
+
+SCHEMA_NAME = 'competitor_analysis'
+SCHEMA_VERSION = 1
+
+# Поля с датой, которые восстанавливаются в datetime после чтения JSON
+DATETIME_FIELDS = ('timestamp', 'generated_at')
+
+# Тип расширения msgpack для datetime/date (ISO-строка, наивные даты сохраняются как есть)
+DATETIME_EXT = 1
+DATE_EXT = 2
+
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def _plain(value: Any) -> Any:
+    """Приведение нестандартных значений к сериализуемым типам"""
+
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, Path):
+        return str(value)
+    if hasattr(value, 'tolist'):
+        # numpy-скаляры и массивы
+        return value.tolist()
+    return str(value)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return _plain(value)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return msgpack.ExtType(DATETIME_EXT, value.isoformat().encode('utf-8'))
+    if isinstance(value, date):
+        return msgpack.ExtType(DATE_EXT, value.isoformat().encode('utf-8'))
+    return _plain(value)
+
+
+def _msgpack_ext_hook(code: int, payload: bytes) -> Any:
+    if code == DATETIME_EXT:
+        return datetime.fromisoformat(payload.decode('utf-8'))
+    if code == DATE_EXT:
+        return date.fromisoformat(payload.decode('utf-8'))
+    return msgpack.ExtType(code, payload)
+
+
+def dumps_json(obj: Any, pretty: bool = False) -> bytes:
+    """JSON в UTF-8: orjson, если установлен, иначе стандартный json"""
+
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_json_default, option=option)
+
+    if pretty:
+        text = json.dumps(obj, ensure_ascii=False, indent=2, default=_json_default)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+    return text.encode('utf-8')
+
+
+def loads_json(payload: bytes) -> Any:
+    if orjson:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def report_json(results: Dict[str, Any]) -> str:
+    """Читаемый JSON-отчет: данные запуска плюс метаинформация, исходный словарь не меняется"""
+
+    report = {
+        **results,
+        'meta': {
+            'generated_at': datetime.now(),
+            'version': f'{SCHEMA_VERSION}.0',
+            'format': SCHEMA_NAME
+        }
+    }
+    return dumps_json(report, pretty=True).decode('utf-8')
+
+
+class ResultSerializer:
+    """Запись и чтение результатов запусков в компактном формате
+
+    Файл содержит конверт {'schema', 'version', 'generated_at', 'data'}; при чтении
+    записи старых версий приводятся к текущей схеме.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.root = Path(config.get('results_dir', 'data/results'))
+
+        self.format = config.get('format', 'msgpack')
+        if self.format == 'msgpack' and not msgpack:
+            self.format = 'json'
+
+        self.compression = config.get('compression', 'zstd')
+        if self.compression == 'zstd' and not zstandard:
+            self.compression = None
+        self.level = config.get('compression_level', 3)
+
+    @property
+    def extension(self) -> str:
+        extension = '.msgpack' if self.format == 'msgpack' else '.json'
+        return extension + ('.zst' if self.compression == 'zstd' else '')
+
+    def envelope(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'schema': SCHEMA_NAME,
+            'version': SCHEMA_VERSION,
+            'generated_at': datetime.now(),
+            'data': results
+        }
+
+    def dumps(self, results: Dict[str, Any]) -> bytes:
+        """Сериализация результатов запуска"""
+
+        record = self.envelope(results)
+        if self.format == 'msgpack':
+            payload = msgpack.packb(record, default=_msgpack_default, use_bin_type=True)
+        else:
+            payload = dumps_json(record)
+
+        if self.compression == 'zstd':
+            payload = zstandard.ZstdCompressor(level=self.level).compress(payload)
+        return payload
+
+    def loads(self, payload: bytes) -> Dict[str, Any]:
+        """Конверт с данными запуска; формат и сжатие определяются по содержимому"""
+
+        if payload[:4] == ZSTD_MAGIC:
+            if not zstandard:
+                raise ValueError("Для чтения сжатых результатов нужен пакет zstandard")
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+
+        if payload.lstrip()[:1] == b'{':
+            record = loads_json(payload)
+            self._restore_datetimes(record)
+            self._restore_datetimes(record.get('data'))
+        else:
+            if not msgpack:
+                raise ValueError("Для чтения результатов в формате msgpack нужен пакет msgpack")
+            record = msgpack.unpackb(
+                payload, raw=False, ext_hook=_msgpack_ext_hook, strict_map_key=False
+            )
+
+        return self._upgrade(record)
+
+    def save(self, company_name: str, results: Dict[str, Any]) -> Path:
+        """Атомарная запись результатов в results_dir/<компания>/<время><расширение>"""
+
+        company_dir = self.root / company_slug(company_name)
+        company_dir.mkdir(parents=True, exist_ok=True)
+
+        timestamp = results.get('timestamp') or datetime.now()
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        result_file = company_dir / f"{timestamp.strftime('%Y%m%dT%H%M%S')}{self.extension}"
+
+        fd, tmp_path = tempfile.mkstemp(dir=company_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.dumps(results))
+            os.replace(tmp_path, result_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return result_file
+
+    def load(self, result_file: Path) -> Dict[str, Any]:
+        """Данные запуска из файла"""
+
+        with open(result_file, 'rb') as f:
+            return self.loads(f.read())['data']
+
+    def latest(self, company_name: str) -> Optional[Dict[str, Any]]:
+        """Результаты последнего запуска компании"""
+
+        company_dir = self.root / company_slug(company_name)
+        if not company_dir.exists():
+            return None
+        files = sorted(
+            path for path in company_dir.iterdir()
+            if path.is_file() and not path.name.endswith('.tmp')
+        )
+        return self.load(files[-1]) if files else None
+
+    def companies(self) -> List[str]:
+        """Папки компаний, для которых есть сохраненные запуски"""
+
+        if not self.root.exists():
+            return []
+        return sorted(
+            entry.name for entry in os.scandir(self.root)
+            if entry.is_dir() and any(
+                not name.endswith('.tmp') for name in os.listdir(entry.path)
+            )
+        )
+
+    def _upgrade(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Приведение записи к текущей версии схемы"""
+
+        if record.get('schema') != SCHEMA_NAME:
+            # JSON-отчет версии 1.0: данные запуска с полем meta
+            if isinstance(record.get('meta'), dict):
+                data = dict(record)
+                meta = data.pop('meta')
+                self._restore_datetimes(meta)
+                record = {
+                    'schema': SCHEMA_NAME,
+                    'version': SCHEMA_VERSION,
+                    'generated_at': meta.get('generated_at'),
+                    'data': data
+                }
+            else:
+                raise ValueError(f"Неизвестный формат результатов: {record.get('schema')!r}")
+
+        if record['version'] > SCHEMA_VERSION:
+            raise ValueError(
+                f"Версия схемы {record['version']} новее поддерживаемой {SCHEMA_VERSION}"
+            )
+        return record
+
+    def _restore_datetimes(self, record: Optional[Dict[str, Any]]):
+        if not isinstance(record, dict):
+            return
+        for field in DATETIME_FIELDS:
+            if isinstance(record.get(field), str):
+                try:
+                    record[field] = datetime.fromisoformat(record[field])
+                except ValueError:
+                    pass
@@ -0,0 +1,78 @@
+"""Хранилище снимков собранных данных по компаниям между запусками"""
+
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from scrapers.records import plain_default
+
+
+def company_slug(company_name: str) -> str:
+    """Безопасное имя папки для компании"""
+    return re.sub(r'[^\w\-]+', '_', company_name.strip()).strip('_') or 'unknown'
+
+
+class SnapshotStore:
+    """Снимки website_data / social_data в виде файлов data/snapshots/<компания>/<время>.json"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.root = Path(config.get('snapshots_dir', 'data/snapshots'))
+        self.keep = config.get('keep_snapshots', 30)
+
+    def save(self, company_name: str, snapshot: Dict[str, Any]) -> Path:
+        """Сохранение нового снимка компании"""
+
+        company_dir = self.root / company_slug(company_name)
+        company_dir.mkdir(parents=True, exist_ok=True)
+
+        timestamp = snapshot.get('timestamp') or datetime.now()
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        snapshot_file = company_dir / f"{timestamp.strftime('%Y%m%dT%H%M%S')}.json"
+
+        tmp_file = snapshot_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, default=plain_default)
+        tmp_file.replace(snapshot_file)
+
+        self._prune(company_dir)
+        return snapshot_file
+
+    def history(self, company_name: str) -> List[Path]:
+        """Файлы снимков компании от старых к новым"""
+
+        company_dir = self.root / company_slug(company_name)
+        if not company_dir.exists():
+            return []
+        return sorted(company_dir.glob('*.json'))
+
+    def latest(self, company_name: str) -> Optional[Dict[str, Any]]:
+        """Последний сохраненный снимок компании"""
+
+        history = self.history(company_name)
+        return self.load(history[-1]) if history else None
+
+    def load(self, snapshot_file: Path) -> Dict[str, Any]:
+        """Загрузка снимка из файла"""
+
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def companies(self) -> List[str]:
+        """Компании, для которых есть снимки"""
+
+        if not self.root.exists():
+            return []
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def _prune(self, company_dir: Path):
+        """Удаление старых снимков сверх лимита"""
+
+        if not self.keep:
+            return
+        snapshots = sorted(company_dir.glob('*.json'))
+        for old_file in snapshots[:-self.keep]:
+            old_file.unlink()
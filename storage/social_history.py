@@ -0,0 +1,145 @@
+"""История постов в соцсетях с курсорами для инкрементального сбора"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from storage.database import connect
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS social_posts (
+    company TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    text TEXT,
+    likes INTEGER DEFAULT 0,
+    comments INTEGER DEFAULT 0,
+    shares INTEGER DEFAULT 0,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (company, platform, post_id)
+);
+CREATE INDEX IF NOT EXISTS idx_social_posts_date ON social_posts (company, platform, date);
+CREATE TABLE IF NOT EXISTS social_cursors (
+    company TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    since_id TEXT,
+    last_date TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (company, platform)
+);
+"""
+
+
+class SocialHistoryStore:
+    """Накопленные посты компаний и high-water-mark курсоры по платформам
+
+    Методы вызываются из рабочих потоков (SocialScraper - через asyncio.to_thread):
+    соединение общее, обращения к нему сериализует блокировка
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.connection = connect(config, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    def cursor(self, company: str, platform: str) -> Optional[Dict[str, str]]:
+        """Последний сохраненный пост платформы: {'since_id', 'last_date'}"""
+
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT since_id, last_date FROM social_cursors WHERE company = ? AND platform = ?',
+                (company, platform)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def add_posts(self, company: str, platform: str, posts: List[Dict[str, Any]]) -> int:
+        """Сохранение новых постов с дедупликацией по id; возвращает число добавленных"""
+
+        if not posts:
+            return 0
+
+        fetched_at = datetime.now().isoformat()
+        rows = [
+            (
+                company, platform, str(post['id']), post.get('date', ''), post.get('text', ''),
+                post.get('likes', 0), post.get('comments', 0), post.get('shares', 0), fetched_at
+            )
+            for post in posts
+        ]
+
+        with self._lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO social_posts (company, platform, post_id, date, text, '
+                'likes, comments, shares, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            added = self.connection.total_changes - before
+
+            # Курсор сдвигается на самый свежий пост из истории
+            newest = self.connection.execute(
+                'SELECT post_id, date FROM social_posts WHERE company = ? AND platform = ? '
+                'ORDER BY date DESC LIMIT 1',
+                (company, platform)
+            ).fetchone()
+            self.connection.execute(
+                'INSERT INTO social_cursors (company, platform, since_id, last_date, updated_at) '
+                'VALUES (?, ?, ?, ?, ?) ON CONFLICT (company, platform) DO UPDATE SET '
+                'since_id = excluded.since_id, last_date = excluded.last_date, '
+                'updated_at = excluded.updated_at',
+                (company, platform, newest['post_id'], newest['date'], fetched_at)
+            )
+
+        return added
+
+    def recent_posts(self, company: str, platform: str, limit: int) -> List[Dict[str, Any]]:
+        """Последние посты из накопленной истории"""
+
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT post_id AS id, text, likes, comments, shares, date FROM social_posts '
+                'WHERE company = ? AND platform = ? ORDER BY date DESC LIMIT ?',
+                (company, platform, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def statistics(self, company: str, platform: str, followers: int = 0) -> Dict[str, Any]:
+        """Вовлеченность и частота публикаций по всей истории без повторной загрузки"""
+
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT COUNT(*) AS posts, AVG(likes + comments + shares) AS interactions, '
+                'MIN(date) AS first_date, MAX(date) AS last_date '
+                'FROM social_posts WHERE company = ? AND platform = ?',
+                (company, platform)
+            ).fetchone()
+
+        stats = {
+            'history_posts': row['posts'],
+            'avg_interactions': round(row['interactions'] or 0.0, 2),
+            'engagement_rate': 0.0,
+            'posts_per_week': 0.0
+        }
+        if followers and row['interactions']:
+            stats['engagement_rate'] = round(row['interactions'] / followers * 100, 3)
+
+        if row['posts'] > 1:
+            days = self._days_between(row['first_date'], row['last_date'])
+            stats['posts_per_week'] = round(row['posts'] / max(days, 1) * 7, 2)
+
+        return stats
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def _days_between(self, first: str, last: str) -> float:
+        try:
+            start = datetime.fromisoformat(first.replace('Z', '+00:00'))
+            end = datetime.fromisoformat(last.replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            return 0.0
+        return (end - start).total_seconds() / 86400
@@ -0,0 +1,31 @@
+"""Общие настройки тестов: корень проекта в sys.path для импорта пакетов"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from config.settings import get_default_config  # noqa: E402
+
+
+@pytest.fixture
+def agent_config(tmp_path):
+    """Конфигурация агента, все данные которого лежат во временной папке"""
+
+    config = get_default_config()
+    data = tmp_path / 'data'
+    config['scraping']['archive_dir'] = str(data / 'http_archive')
+    config['analysis']['similarity_index_path'] = str(data / 'similarity_index.pkl')
+    config['reports']['charts_cache_dir'] = str(data / 'charts')
+    config['reports']['include_charts'] = False
+    config['history']['snapshots_dir'] = str(data / 'snapshots')
+    config['history']['pages_dir'] = str(data / 'pages')
+    config['results']['results_dir'] = str(data / 'results')
+    config['export']['parquet_dir'] = str(data / 'parquet')
+    config['database']['path'] = str(data / 'competitors.db')
+    return config
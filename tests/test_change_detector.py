@@ -0,0 +1,97 @@
+"""Журнал изменений: сопоставление сущностей по ключам и сжатые снимки"""
+
+from analyzers.change_detector import ChangeDetector, StructuralDiff, compact
+from scrapers.records import CTA, PricingPlan
+from storage.snapshots import SnapshotStore
+
+
+def snapshot(plans: list, text: str = 'Платформа для команд продаж') -> dict:
+    return {
+        'timestamp': '2026-01-01T00:00:00',
+        'website_data': {
+            'main_page': {
+                'title': 'Acme',
+                'call_to_actions': [CTA('Попробовать', '/trial')],
+                'clean_text': text
+            },
+            'pricing': plans
+        },
+        'social_data': {'platforms': {'twitter': {'followers': 100}}}
+    }
+
+
+def test_entities_matched_by_key_not_position():
+    previous = compact(snapshot([PricingPlan('Start', '$10'), PricingPlan('Team', '$30')]))
+    current = snapshot([PricingPlan('Business', '$90'), PricingPlan('Start', '$12')])
+
+    result = ChangeDetector({}).detect(previous, current)
+    changes = {(change['op'], change['path']): change for change in result['changes']}
+
+    assert set(changes) == {
+        ('changed', 'website_data.pricing[Start].price'),
+        ('removed', 'website_data.pricing[Team]'),
+        ('added', 'website_data.pricing[Business]')
+    }
+    assert result['summary'] == {'added': 1, 'removed': 1, 'changed': 1}
+    assert changes[('changed', 'website_data.pricing[Start].price')]['old'] == '$10'
+    assert changes[('added', 'website_data.pricing[Business]')]['new'] == {
+        'name': 'Business', 'price': '$90', 'features': []
+    }
+
+
+def test_equal_subtrees_skipped_by_hash():
+    calls = []
+
+    class CountingDiff(StructuralDiff):
+        def _diff(self, old, new, path, *args):
+            calls.append(path)
+            return super()._diff(old, new, path, *args)
+
+    old = {'a': {'b': [{'name': 'x', 'value': 1}] * 3}, 'c': {'d': 1}}
+    new = {'a': {'b': [{'name': 'x', 'value': 1}] * 3}, 'c': {'d': 2}}
+    changes = CountingDiff().diff(old, new)
+
+    assert changes == [{'op': 'changed', 'path': 'c.d', 'old': 1, 'new': 2}]
+    # Совпадающее поддерево 'a' сравнивается только по хешу, без обхода 'a.b'
+    assert calls == ['', 'a', 'c', 'c.d']
+    # Порядок элементов списка на хеш не влияет
+    assert CountingDiff().diff({'l': [1, 2]}, {'l': [2, 1]}) == []
+
+
+def test_first_snapshot_has_no_changes():
+    result = ChangeDetector({}).detect(None, snapshot([]))
+
+    assert result['first_snapshot'] is True
+    assert result['changes'] == []
+
+
+def test_describe_uses_entity_labels():
+    assert ChangeDetector.describe({
+        'op': 'changed', 'path': 'website_data.pricing[Start].price', 'entity': 'цена',
+        'old': '$10', 'new': '$12'
+    }) == 'Изменен(а) цена: $10 → $12'
+    assert ChangeDetector.describe({
+        'op': 'added', 'path': 'website_data.pricing[Business]', 'entity': 'тарифный план',
+        'new': {'name': 'Business', 'price': '$90'}
+    }) == 'Добавлен(а) тарифный план: Business'
+    assert ChangeDetector.describe({
+        'op': 'removed', 'path': 'website_data.slogan', 'old': 'x' * 100
+    }) == 'Удален(а) website_data.slogan: ' + 'x' * 79 + '…'
+
+
+def test_snapshot_keeps_text_hash_only(tmp_path):
+    store = SnapshotStore({'snapshots_dir': str(tmp_path)})
+    store.save('Acme', compact(snapshot([PricingPlan('Start', '$10')])))
+    saved = store.latest('Acme')
+
+    main_page = saved['website_data']['main_page']
+    assert 'clean_text' not in main_page and main_page['text_hash']
+    assert main_page['call_to_actions'] == [{'text': 'Попробовать', 'url': '/trial', 'type': 'other'}]
+
+    detector = ChangeDetector({})
+    # Снимок с полным текстом сравнивается с новым по хешу
+    assert detector.detect(snapshot([PricingPlan('Start', '$10')]), saved)['changes'] == []
+    changes = detector.detect(saved, snapshot([PricingPlan('Start', '$10')], 'Новый текст'))['changes']
+    assert [(change['op'], change['path'], change['entity']) for change in changes] == [
+        ('changed', 'website_data.main_page.text_hash', 'текст страницы')
+    ]
@@ -0,0 +1,208 @@
+"""Конвейер агента на подготовленных данных вместо скрапинга"""
+
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from agents.competitor_agent import CompetitorAgent
+from analyzers.market_frame import MarketFrame
+
+
+FOOTER = '© 2026. Все права защищены. Политика конфиденциальности'
+
+SITES = {
+    'Acme': 'Облачная платформа аналитики продаж для розничных сетей',
+    'Beta': 'Облачная платформа логистики и доставки для маркетплейсов',
+    'Gamma': 'Облачная платформа бухгалтерии и отчетности для малого бизнеса'
+}
+
+
+NEWS = (
+    'Отраслевые новости недели: рынок облачных сервисов вырос на двенадцать процентов, '
+    'крупные игроки объявили о новых дата-центрах в регионах и снижении цен на хранение'
+)
+
+
+def website_data(company: str, followers_text: str = '', shared_news: bool = False) -> dict:
+    data = {
+        'url': f'https://{company.lower()}.example/',
+        'company': company,
+        'main_page': {
+            'title': company,
+            'call_to_actions': [],
+            'technologies': [],
+            'social_links': [],
+            'text_blocks': [SITES[company], FOOTER]
+        },
+        'additional_pages': {
+            'about_page': {
+                'url': f'https://{company.lower()}.example/about',
+                'title': 'О компании',
+                'text_blocks': [f'{company}: {SITES[company].lower()}. Команда из 50 человек', FOOTER]
+            }
+        },
+        'technical': {'load_time': 0.5},
+        'summary': {'site_quality_score': 70}
+    }
+    if shared_news:
+        # Одна и та же новостная страница на сайтах всех компаний
+        data['additional_pages']['news_page'] = {
+            'url': f'https://{company.lower()}.example/news',
+            'title': 'Новости',
+            'text_blocks': [NEWS]
+        }
+    return data
+
+
+def social_data(followers: int) -> dict:
+    return {'platforms': {}, 'summary': {'total_followers': followers}}
+
+
+def build_agent(config: dict, shared_news: bool = False) -> CompetitorAgent:
+    agent = CompetitorAgent(config)
+    followers = {'Acme': 1000, 'Beta': 5000, 'Gamma': 20000}
+
+    async def scrape_company_site(company_name):
+        data = website_data(company_name, shared_news=shared_news)
+        pages = [(data['url'], data['main_page'])]
+        pages.extend((page['url'], page) for page in data['additional_pages'].values())
+        for url, page in pages:
+            # Как EnhancedWebsiteScraper._store_page: исходный HTML и время загрузки
+            html = ''.join(f'<p>{block}</p>' for block in page['text_blocks'])
+            fetched_at = datetime.now()
+            agent.page_store.put(url, html.encode('utf-8'), fetched_at)
+            page['fetched_at'] = fetched_at.isoformat()
+        return data
+
+    async def scrape_social_profiles(company_name, handles=None):
+        return social_data(followers[company_name])
+
+    agent.website_scraper.scrape_company_site = scrape_company_site
+    agent.social_scraper.scrape_social_profiles = scrape_social_profiles
+    return agent
+
+
+@pytest.fixture
+def agent(agent_config):
+    agent = build_agent(agent_config)
+    yield agent
+    asyncio.run(agent.close())
+
+
+def test_batch_keywords_use_corpus_idf(agent, tmp_path):
+    results = asyncio.run(agent.analyze_competitors(list(SITES), str(tmp_path / 'reports')))
+
+    scores = results['Acme']['content_analysis']['keyword_scores']
+    # "платформа" есть у всех компаний - по корпусу она весит меньше отличительных слов
+    assert scores['аналитики'] > scores['платформа']
+    assert results['Beta']['content_analysis']['keyword_scores']['логистики'] > (
+        results['Beta']['content_analysis']['keyword_scores']['платформа']
+    )
+    assert results['Acme']['content_analysis']['content_budget']['boilerplate_blocks'] == 1
+
+
+def test_reanalyze_uses_corpus_pass(agent, tmp_path):
+    asyncio.run(agent.analyze_competitors(list(SITES), str(tmp_path / 'reports')))
+
+    results = asyncio.run(agent.reanalyze([], str(tmp_path / 'reports'), workers=2))
+
+    assert set(results) == set(SITES)
+    scores = results['Gamma']['content_analysis']['keyword_scores']
+    assert scores['бухгалтерии'] > scores['платформа']
+
+
+def test_reanalyze_restores_text_from_stored_pages(agent, tmp_path):
+    first = asyncio.run(agent.analyze_competitors(list(SITES), str(tmp_path / 'reports')))
+
+    results = asyncio.run(agent.reanalyze([], str(tmp_path / 'reports'), workers=2))
+
+    for company in SITES:
+        budget = results[company]['content_analysis']['content_budget']
+        assert budget['pages'] == 2
+        assert budget['boilerplate_blocks'] == 1
+        assert budget == first[company]['content_analysis']['content_budget']
+        assert 'text_blocks' not in results[company]['website_data']['main_page']
+
+
+def test_reanalyze_keeps_budget_without_stored_pages(agent, agent_config, tmp_path):
+    first = asyncio.run(agent.analyze_competitors(list(SITES), str(tmp_path / 'reports')))
+    agent.page_store.close()
+    for path in Path(agent_config['history']['pages_dir']).iterdir():
+        path.unlink()
+
+    results = asyncio.run(agent.reanalyze([], str(tmp_path / 'reports'), workers=1))
+
+    budget = results['Acme']['content_analysis']['content_budget']
+    assert budget == first['Acme']['content_analysis']['content_budget']
+    assert budget['pages'] == 2
+
+
+def test_similarity_index_saved_once_per_run(agent, tmp_path, monkeypatch):
+    saves = []
+    save = agent.similarity_index.save
+    monkeypatch.setattr(agent.similarity_index, 'save', lambda: saves.append(save()))
+
+    asyncio.run(agent.analyze_competitors(list(SITES), str(tmp_path / 'reports')))
+    assert len(saves) == 1
+    assert not agent.similarity_index.changed
+
+    asyncio.run(agent.close())
+    assert len(saves) == 1
+
+
+def test_single_company_compared_with_stored_market(agent, agent_config, tmp_path):
+    asyncio.run(agent.analyze_competitors(list(SITES), str(tmp_path / 'reports')))
+
+    # Новый процесс: рыночная таблица пуста до загрузки сохраненных результатов
+    fresh = build_agent(agent_config)
+    try:
+        results = asyncio.run(fresh.analyze_competitor('Acme', str(tmp_path / 'reports')))
+    finally:
+        asyncio.run(fresh.close())
+
+    comparison = results['market_analysis']['market_comparison']
+    assert comparison['market_size'] == len(SITES)
+    # Подписчики Acme меньше, чем у Beta и Gamma
+    assert comparison['metrics']['followers']['rank'] == 3
+
+
+def test_market_computed_once_per_batch(agent, tmp_path, monkeypatch):
+    calls = []
+    compute_swot = MarketFrame._compute_swot
+    monkeypatch.setattr(
+        MarketFrame, '_compute_swot', lambda frame: calls.append(1) or compute_swot(frame)
+    )
+
+    results = asyncio.run(agent.analyze_competitors(list(SITES), str(tmp_path / 'reports')))
+
+    assert len(calls) == 1
+    assert all(
+        results[company]['market_analysis']['market_comparison']['market_size'] == len(SITES)
+        for company in SITES
+    )
+
+
+def test_reanalyze_keeps_duplicate_marks_of_stored_run(agent_config, tmp_path):
+    agent = build_agent(agent_config, shared_news=True)
+    try:
+        first = asyncio.run(agent.analyze_competitors(list(SITES), str(tmp_path / 'reports')))
+        # Пометки не должны зависеть от индекса и от того, какой процесс пула взял компанию
+        Path(agent_config['analysis']['similarity_index_path']).unlink()
+        results = asyncio.run(agent.reanalyze([], str(tmp_path / 'reports'), workers=3))
+    finally:
+        asyncio.run(agent.close())
+
+    def marks(runs):
+        return {
+            company: runs[company]['website_data']['additional_pages']['news_page'].get('duplicate_of')
+            for company in SITES
+        }
+
+    assert marks(first) == {'Acme': None, 'Beta': 'Acme:news_page', 'Gamma': 'Acme:news_page'}
+    assert marks(results) == marks(first)
+    for company in SITES:
+        assert results[company]['content_analysis']['content_budget'] == (
+            first[company]['content_analysis']['content_budget']
+        )
@@ -0,0 +1,78 @@
+"""Подготовка текста и передача чанков в ИИ-анализ"""
+
+import asyncio
+from types import SimpleNamespace
+
+from analyzers.content_analyzer import ContentAnalyzer
+from analyzers.text_preprocessor import TextPreprocessor
+
+
+FOOTER = '© 2026 Acme. Все права защищены. Политика конфиденциальности'
+
+
+def _website():
+    return {
+        'main_page': {
+            'title': 'Acme',
+            'text_blocks': ['Acme - платформа аналитики для розничных сетей', FOOTER]
+        },
+        'additional_pages': {
+            'pricing_page': {
+                'title': 'Тарифы',
+                'text_blocks': ['Тариф Pro стоит 1 990 ₽ в месяц', FOOTER]
+            }
+        }
+    }
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, **request):
+        self.requests.append(request)
+        text = request['messages'][-1]['content']
+        return SimpleNamespace(choices=[SimpleNamespace(
+            message=SimpleNamespace(content=f'Сводка: {len(text)} символов')
+        )])
+
+
+def test_prepare_strips_boilerplate_in_place():
+    website = _website()
+    prepared = TextPreprocessor({'chunk_tokens': 2000}).prepare(website, 'Acme')
+
+    assert prepared['stats']['pages'] == 2
+    assert prepared['stats']['boilerplate_blocks'] == 1
+    assert all(FOOTER not in chunk['text'] for chunk in prepared['chunks'])
+    # Сырые блоки заменены очищенным текстом
+    assert 'text_blocks' not in website['main_page']
+    assert website['additional_pages']['pricing_page']['clean_text'] == 'Тариф Pro стоит 1 990 ₽ в месяц'
+
+
+def test_chunks_are_sent_to_llm():
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    analyzer = ContentAnalyzer({'openai_model': 'test-model', 'max_tokens': 300}, client=client)
+
+    website = _website()
+    prepared = TextPreprocessor({'chunk_tokens': 12}).prepare(website, 'Acme')
+    analysis = asyncio.run(analyzer.analyze(website, {}, prepared_content=prepared))
+
+    assert len(completions.requests) == len(prepared['chunks']) > 1
+    sent = [request['messages'][-1]['content'] for request in completions.requests]
+    assert sent == [chunk['text'] for chunk in prepared['chunks']]
+    assert all(request['model'] == 'test-model' for request in completions.requests)
+    assert [insight['pages'] for insight in analysis['ai_insights']] == [
+        chunk['pages'] for chunk in prepared['chunks']
+    ]
+    assert analysis['ai_insights'][0]['summary'].startswith('Сводка')
+    assert analysis['content_budget'] == prepared['stats']
+
+
+def test_no_llm_call_without_key():
+    website = _website()
+    prepared = TextPreprocessor({}).prepare(website, 'Acme')
+    analysis = asyncio.run(ContentAnalyzer({}).analyze(website, {}, prepared_content=prepared))
+
+    assert 'ai_insights' not in analysis
+    assert analysis['content_budget']['chunks'] == 1
@@ -0,0 +1,147 @@
+"""Запись HTTP-ответов в архив и воспроизведение без сети"""
+
+import asyncio
+import threading
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from scrapers.http_client import ArchiveMissError, HttpClient
+from storage.http_archive import HttpArchive, request_key
+
+
+PAGE = 'Тарифы: от 1 990 руб.'
+
+
+async def _page(request):
+    return web.Response(
+        body=PAGE.encode('cp1251'),
+        headers={'Content-Type': 'text/html; charset=windows-1251', 'X-Served-By': 'origin'}
+    )
+
+
+async def _redirect(request):
+    raise web.HTTPFound('/page')
+
+
+async def _record(archive_dir, url_path: str):
+    app = web.Application()
+    app.router.add_get('/page', _page)
+    app.router.add_get('/old', _redirect)
+    server = TestServer(app)
+    await server.start_server()
+    client = HttpClient({'archive_mode': 'record', 'archive_dir': str(archive_dir)})
+    try:
+        url = str(server.make_url(url_path))
+        return url, await client.get(url, params={'b': 2, 'a': 1})
+    finally:
+        await client.close()
+        await server.close()
+
+
+async def _replay(archive_dir, url: str, params=None):
+    client = HttpClient({'archive_mode': 'replay', 'archive_dir': str(archive_dir)})
+    try:
+        return await client.get(url, params=params)
+    finally:
+        await client.close()
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    url, recorded = asyncio.run(_record(tmp_path, '/old'))
+    # Сервер остановлен: ответ может прийти только из архива
+    replayed = asyncio.run(_replay(tmp_path, url, {'a': 1, 'b': 2}))
+
+    assert replayed.status == recorded.status == 200
+    assert replayed.url == recorded.url
+    # Адрес после редиректа, ключ - исходный запрос
+    assert replayed.url.endswith('/page')
+    assert replayed.body == recorded.body
+    assert replayed.charset == recorded.charset == 'windows-1251'
+    assert replayed.text() == PAGE
+    assert replayed.headers['X-Served-By'] == 'origin'
+    assert replayed.headers['content-type'] == 'text/html; charset=windows-1251'
+
+    expected = recorded.timing.to_dict()
+    actual = replayed.timing.to_dict()
+    assert actual['redirects'] == expected['redirects'] == 1
+    for phase in ('queue', 'dns', 'connect', 'ttfb', 'download', 'total', 'server'):
+        assert actual[phase] == pytest.approx(expected[phase], abs=1e-3)
+
+
+def test_replay_miss_raises(tmp_path):
+    url, _ = asyncio.run(_record(tmp_path, '/page'))
+
+    with pytest.raises(ArchiveMissError):
+        asyncio.run(_replay(tmp_path, url + '/missing'))
+    with pytest.raises(LookupError):
+        asyncio.run(_replay(tmp_path, url, {'a': 1}))
+
+
+def test_concurrent_responses_recorded_off_event_loop(tmp_path):
+    threads = []
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/page', _page)
+        server = TestServer(app)
+        await server.start_server()
+        client = HttpClient({'archive_mode': 'record', 'archive_dir': str(tmp_path)})
+        put = client.archive.put
+
+        def tracked(*args):
+            threads.append(threading.current_thread())
+            return put(*args)
+
+        client.archive.put = tracked
+        try:
+            url = str(server.make_url('/page'))
+            await asyncio.gather(*(client.get(url, params={'n': n}) for n in range(20)))
+            return url
+        finally:
+            await client.close()
+            await server.close()
+
+    url = asyncio.run(scenario())
+
+    assert len(threads) == 20 and threading.main_thread() not in threads
+    archive = HttpArchive({'archive_dir': str(tmp_path)})
+    assert len(archive) == 20
+    for n in range(20):
+        assert archive.get(request_key('GET', url, {'n': n}))[1] == PAGE.encode('cp1251')
+    archive.close()
+
+
+def test_request_key_is_canonical():
+    assert request_key('get', 'HTTPS://Example.com?b=2&a=1#top') == (
+        'GET https://example.com/?a=1&b=2'
+    )
+    assert request_key('GET', 'https://example.com/p?b=2', {'a': 1}) == (
+        request_key('GET', 'https://example.com/p?a=1&b=2')
+    )
+
+
+def test_truncated_index_line_is_skipped_and_not_merged(tmp_path):
+    archive = HttpArchive({'archive_dir': str(tmp_path)})
+    archive.put('GET https://a.example/', {'status': 200}, b'first')
+    archive.put('GET https://b.example/', {'status': 200}, b'second')
+    archive.close()
+
+    # Аварийное завершение посреди записи строки индекса
+    index_path = tmp_path / 'responses.cdx'
+    content = index_path.read_bytes()
+    index_path.write_bytes(content[:-10])
+
+    archive = HttpArchive({'archive_dir': str(tmp_path)})
+    assert len(archive) == 1
+    assert archive.get('GET https://a.example/') == ({'key': 'GET https://a.example/', 'status': 200}, b'first')
+    assert archive.get('GET https://b.example/') is None
+
+    archive.put('GET https://c.example/', {'status': 404}, b'third')
+    archive.close()
+
+    reopened = HttpArchive({'archive_dir': str(tmp_path)})
+    assert set(reopened.index) == {'GET https://a.example/', 'GET https://c.example/'}
+    assert reopened.get('GET https://c.example/')[1] == b'third'
+    reopened.close()
@@ -0,0 +1,37 @@
+"""HTTP-клиент: повторное использование между запусками asyncio.run"""
+
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from scrapers.http_client import HttpClient
+
+
+async def _page(request):
+    await asyncio.sleep(0.01)
+    return web.Response(text='ok')
+
+
+def test_client_reused_across_event_loops():
+    # Лимит в один запрос: конкурентные запросы ждут условия лимитера хоста
+    client = HttpClient({'initial_per_host': 1, 'max_per_host': 1})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/page', _page)
+        server = TestServer(app, port=0)
+        await server.start_server()
+        try:
+            url = str(server.make_url('/page'))
+            responses = await asyncio.gather(*(client.get(url) for _ in range(3)))
+            return [response.status for response in responses]
+        finally:
+            await server.close()
+
+    async def close():
+        await client.close()
+
+    assert asyncio.run(run()) == [200, 200, 200]
+    assert asyncio.run(run()) == [200, 200, 200]
+    asyncio.run(close())
@@ -0,0 +1,71 @@
+"""Разбор цен тарифов и метрики временных рядов"""
+
+import pytest
+
+from storage.metrics_store import MetricsStore, extract_time_series_metrics, parse_price
+
+
+@pytest.mark.parametrize('text, expected', [
+    # USD: запятая - разделитель разрядов, точка - десятичная
+    ('$1,299/mo', 1299.0),
+    ('$1,299.99', 1299.99),
+    ('$1,000,000', 1000000.0),
+    ('$49', 49.0),
+    # Одиночная точка перед тремя цифрами - дробная часть
+    ('$9.999', 9.999),
+    ('$0.125/request', 0.125),
+    ('€12.50', 12.5),
+    # RUB: разряды через пробел, неразрывный или узкий пробел
+    ('1 990 ₽', 1990.0),
+    ('1\u00a0990 ₽', 1990.0),
+    ('12\u202f345 руб.', 12345.0),
+    ('4\u2009900 ₽', 4900.0),
+    ('от 2 500 руб.', 2500.0),
+    ('10 000,50 ₽', 10000.5),
+    # EUR: точка - разделитель разрядов, запятая - десятичная
+    ('1.299,00 €', 1299.0),
+    ('1.299 €', 1299.0),
+    ('1.234.567 €', 1234567.0),
+    ('1.990 ₽', 1990.0),
+    ('9,99 €', 9.99),
+    ('29 €/Monat', 29.0),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('text', ['Free', 'Бесплатно', '', None])
+def test_parse_price_without_number(text):
+    assert parse_price(text) is None
+
+
+def test_price_range_metrics():
+    results = {
+        'website_data': {
+            'main_page': {},
+            'pricing': [{'price': '$1,299/mo'}],
+            'additional_pages': {
+                'pricing_page': {'plans': [{'price': '1 990 ₽'}, {'price': 'Free'}]}
+            }
+        }
+    }
+
+    metrics = extract_time_series_metrics(results)
+
+    assert metrics['price_min'] == 1299.0
+    assert metrics['price_max'] == 1990.0
+
+
+def test_record_stores_parsed_prices(tmp_path):
+    store = MetricsStore({'path': str(tmp_path / 'metrics.db')})
+    results = {
+        'timestamp': '2026-01-01T00:00:00',
+        'website_data': {'pricing': [{'price': 'от 2 500 руб.'}, {'price': '$1,299.99'}]}
+    }
+
+    store.record('Acme', results)
+    latest = store.latest('Acme')
+    store.close()
+
+    assert latest['price_min']['value'] == 1299.99
+    assert latest['price_max']['value'] == 2500.0
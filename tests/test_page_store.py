@@ -0,0 +1,85 @@
+"""Сегментное хранилище HTML страниц: запись, произвольное чтение, восстановление индекса"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from storage.page_store import PageStore
+
+
+def _store(tmp_path, **config) -> PageStore:
+    return PageStore({'pages_dir': str(tmp_path / 'pages'), **config})
+
+
+def test_put_get_round_trip(tmp_path):
+    store = _store(tmp_path)
+    day = datetime(2026, 1, 1, 12, 0)
+    store.put('https://acme.example/', b'<html>v1</html>', day)
+    store.put('https://acme.example/', b'<html>v2</html>', day + timedelta(days=1))
+    store.put('https://acme.example/pricing', 'Цены'.encode('utf-8') * 1000, day)
+
+    assert store.get('https://acme.example/') == b'<html>v2</html>'
+    assert store.get('https://acme.example/', at=day + timedelta(hours=1)) == b'<html>v1</html>'
+    assert store.get('https://acme.example/', at=day - timedelta(seconds=1)) is None
+    assert store.get('https://acme.example/missing') is None
+    assert store.get('https://acme.example/pricing') == 'Цены'.encode('utf-8') * 1000
+    assert store.versions('https://acme.example/') == [day, day + timedelta(days=1)]
+
+    ref = store.locate('https://acme.example/pricing')
+    view = store.view(ref)
+    assert isinstance(view, memoryview) and len(view) == ref.length < ref.raw_length
+    view.release()
+    store.close()
+
+
+def test_segment_rollover(tmp_path):
+    store = _store(tmp_path, page_segment_mb=1)
+    bodies = {f'https://acme.example/{i}': os.urandom(600 * 1024) for i in range(3)}
+    for url, body in bodies.items():
+        store.put(url, body)
+
+    segments = sorted(path.name for path in (tmp_path / 'pages').glob('pages-*.seg'))
+    assert segments == ['pages-000001.seg', 'pages-000002.seg', 'pages-000003.seg']
+    for url, body in bodies.items():
+        assert store.get(url) == body
+    store.close()
+
+    # После переоткрытия запись продолжается в последнем сегменте
+    reopened = _store(tmp_path, page_segment_mb=1)
+    reopened.put('https://acme.example/small', b'small')
+    assert reopened.locate('https://acme.example/small').segment == 3
+    reopened.close()
+
+
+def test_rebuild_index(tmp_path):
+    store = _store(tmp_path, page_segment_mb=1)
+    fetched_at = datetime(2026, 3, 1, 9, 30)
+    bodies = {f'https://acme.example/{i}': os.urandom(400 * 1024) for i in range(4)}
+    for url, body in bodies.items():
+        store.put(url, body, fetched_at)
+    store.close()
+
+    os.remove(tmp_path / 'pages' / 'index.sqlite')
+    rebuilt = _store(tmp_path, page_segment_mb=1)
+    assert rebuilt.get('https://acme.example/0') is None
+
+    assert rebuilt.rebuild_index() == 4
+    for url, body in bodies.items():
+        assert rebuilt.get(url) == body
+        assert rebuilt.versions(url) == [fetched_at]
+    rebuilt.close()
+
+
+def test_concurrent_puts_from_threads(tmp_path):
+    store = _store(tmp_path)
+
+    async def put_all():
+        await asyncio.gather(*[
+            asyncio.to_thread(store.put, f'https://acme.example/{i}', f'page {i}'.encode())
+            for i in range(50)
+        ])
+
+    asyncio.run(put_all())
+    assert all(store.get(f'https://acme.example/{i}') == f'page {i}'.encode() for i in range(50))
+    assert store.rebuild_index() == 50
+    store.close()
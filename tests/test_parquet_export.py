@@ -0,0 +1,34 @@
+"""Плоские таблицы запуска для Parquet-датасета"""
+
+from datetime import datetime
+
+from scrapers.records import PricingPlan
+from storage.parquet_export import flatten_results
+
+
+def test_pricing_plans_price_value():
+    results = {
+        'company': 'Acme',
+        'timestamp': datetime(2026, 1, 1),
+        'website_data': {
+            'pricing': [{'name': 'Pro', 'price': '$1,299/mo'}],
+            'additional_pages': {
+                'pricing_page': {
+                    'plans': [
+                        PricingPlan(name='Team', price='1 990 ₽', features=[]),
+                        {'name': 'Business', 'price': '1.299,00 €'},
+                        {'name': 'Free', 'price': 'Бесплатно'}
+                    ]
+                }
+            }
+        }
+    }
+
+    rows = flatten_results(results)['pricing_plans']
+
+    assert [(row['name'], row['price_value'], row['page_type']) for row in rows] == [
+        ('Pro', 1299.0, 'website'),
+        ('Team', 1990.0, 'pricing_page'),
+        ('Business', 1299.0, 'pricing_page'),
+        ('Free', None, 'pricing_page')
+    ]
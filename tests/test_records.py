@@ -0,0 +1,45 @@
+"""Записи сущностей: слоты и доступ как к словарю"""
+
+import pytest
+
+from scrapers.records import CTA, Form, PricingPlan, Product, SocialLink, to_plain
+
+
+def test_records_have_slots_without_dict():
+    for record in (CTA('Купить'), SocialLink('twitter', 'https://x.com/acme'), Form(),
+                   Product('CRM'), PricingPlan('Start')):
+        assert not hasattr(record, '__dict__')
+        with pytest.raises(AttributeError):
+            record.extra = 1
+
+
+def test_record_reads_like_mapping():
+    cta = CTA('Попробовать', '/trial', 'trial')
+
+    assert cta['text'] == 'Попробовать'
+    assert cta.get('url') == '/trial'
+    assert cta.get('missing', 'default') == 'default'
+    assert 'type' in cta and 'missing' not in cta
+    assert list(cta.keys()) == ['text', 'url', 'type']
+    assert dict(cta.items()) == cta.to_dict() == {'text': 'Попробовать', 'url': '/trial', 'type': 'trial'}
+    assert dict(cta) == cta.to_dict()
+    with pytest.raises(KeyError):
+        cta['missing']
+
+
+def test_record_from_dict_and_to_plain():
+    plan = PricingPlan.from_dict({'name': 'Team', 'price': '$30', 'unknown': True})
+
+    assert plan == PricingPlan('Team', '$30')
+    assert plan.features == [] and plan.features is not PricingPlan('Team').features
+    assert to_plain({'plans': [plan], 'links': (SocialLink('github', 'https://github.com/acme'),)}) == {
+        'plans': [{'name': 'Team', 'price': '$30', 'features': []}],
+        'links': [{'platform': 'github', 'url': 'https://github.com/acme'}]
+    }
+
+
+def test_category_fields_interned():
+    first = SocialLink(''.join(['link', 'edin']), 'https://linkedin.com/company/a')
+    second = SocialLink(''.join(['linked', 'in']), 'https://linkedin.com/company/b')
+
+    assert first.platform is second.platform
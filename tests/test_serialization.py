@@ -0,0 +1,115 @@
+"""Сериализация результатов: конверт msgpack/zstd, типы дат и версии схемы"""
+
+import asyncio
+import json
+from datetime import date, datetime
+
+import pytest
+
+from reports.report_generator import ReportGenerator
+from scrapers.records import PricingPlan
+from storage.serialization import (
+    SCHEMA_NAME, SCHEMA_VERSION, ZSTD_MAGIC, ResultSerializer, dumps_json, report_json
+)
+
+
+RESULTS = {
+    'company': 'Acme',
+    'timestamp': datetime(2026, 3, 1, 12, 30, 15),
+    'website_data': {
+        'founded': date(2015, 6, 1),
+        'pricing': [PricingPlan('Start', '$10', ['API'])],
+        'technologies': {'React'}
+    },
+    'market_analysis': {'scores': {1: 0.5}}
+}
+
+EXPECTED = {
+    'company': 'Acme',
+    'timestamp': datetime(2026, 3, 1, 12, 30, 15),
+    'website_data': {
+        'founded': date(2015, 6, 1),
+        'pricing': [{'name': 'Start', 'price': '$10', 'features': ['API']}],
+        'technologies': ['React']
+    },
+    'market_analysis': {'scores': {1: 0.5}}
+}
+
+
+def test_msgpack_zstd_round_trip(tmp_path):
+    serializer = ResultSerializer({'results_dir': str(tmp_path)})
+    assert serializer.extension == '.msgpack.zst'
+
+    payload = serializer.dumps(RESULTS)
+    assert payload[:4] == ZSTD_MAGIC
+
+    record = serializer.loads(payload)
+    assert record['schema'] == SCHEMA_NAME
+    assert record['version'] == SCHEMA_VERSION
+    assert isinstance(record['generated_at'], datetime)
+    # datetime и date восстанавливаются из типов расширения msgpack
+    assert record['data'] == EXPECTED
+
+    result_file = serializer.save('Acme', RESULTS)
+    assert result_file.name == '20260301T123015.msgpack.zst'
+    assert serializer.latest('Acme') == EXPECTED
+    assert serializer.companies() == ['Acme']
+
+
+def test_json_round_trip_restores_timestamps(tmp_path):
+    serializer = ResultSerializer({'results_dir': str(tmp_path), 'format': 'json', 'compression': None})
+
+    record = serializer.loads(serializer.dumps(RESULTS))
+
+    assert record['data']['timestamp'] == RESULTS['timestamp']
+    assert isinstance(record['generated_at'], datetime)
+    # В JSON даты вне DATETIME_FIELDS остаются строками
+    assert record['data']['website_data']['founded'] == '2015-06-01'
+
+
+def test_reader_detects_format_by_content(tmp_path):
+    json_payload = ResultSerializer({'format': 'json', 'compression': 'zstd'}).dumps(RESULTS)
+
+    record = ResultSerializer({}).loads(json_payload)
+
+    assert record['data']['timestamp'] == RESULTS['timestamp']
+
+
+def test_json_report_upgraded_to_current_schema():
+    report = report_json({'company': 'Acme', 'timestamp': RESULTS['timestamp']})
+
+    record = ResultSerializer({}).loads(report.encode('utf-8'))
+
+    assert record['version'] == SCHEMA_VERSION
+    assert record['data'] == {'company': 'Acme', 'timestamp': RESULTS['timestamp']}
+    assert isinstance(record['generated_at'], datetime)
+
+
+def test_newer_or_unknown_schema_rejected():
+    serializer = ResultSerializer({'format': 'json', 'compression': None})
+
+    newer = dumps_json({'schema': SCHEMA_NAME, 'version': SCHEMA_VERSION + 1, 'data': {}})
+    with pytest.raises(ValueError):
+        serializer.loads(newer)
+    with pytest.raises(ValueError):
+        serializer.loads(dumps_json({'schema': 'other', 'version': 1}))
+
+
+def test_changes_report_serializes_dates(tmp_path):
+    generator = ReportGenerator({})
+    data = {
+        'company': 'Acme',
+        'changes': {
+            'previous_timestamp': datetime(2026, 2, 1, 9, 0),
+            'first_snapshot': False,
+            'changes': [{'op': 'added', 'path': 'website_data.pricing[Start]',
+                         'new': PricingPlan('Start', '$10')}],
+            'summary': {'added': 1, 'removed': 0, 'changed': 0}
+        }
+    }
+
+    asyncio.run(generator._generate_changes_report(data, tmp_path))
+
+    saved = json.loads((tmp_path / 'Acme_changes.json').read_text(encoding='utf-8'))
+    assert saved['previous_timestamp'] == '2026-02-01T09:00:00'
+    assert saved['changes'][0]['new'] == {'name': 'Start', 'price': '$10', 'features': []}
@@ -0,0 +1,142 @@
+"""HTTP API: кеш, объединение запросов и ограничение очереди на подставном агенте"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from agents.service import INITIAL_DURATION, CompetitorService
+from storage.snapshots import company_slug
+
+
+class FakeSerializer:
+    def __init__(self, stored: dict):
+        self.stored = stored
+
+    def companies(self):
+        return list(self.stored)
+
+    def latest(self, slug):
+        return self.stored.get(slug)
+
+
+class FakeAgent:
+    """Анализ ждет release, чтобы запросы успели встретиться"""
+
+    def __init__(self, stored: dict = None):
+        self.result_serializer = FakeSerializer({
+            company_slug(results['company']): results for results in (stored or [])
+        })
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def analyze_competitor(self, company_name, output_dir):
+        self.calls.append(company_name)
+        await self.release.wait()
+        return {'company': company_name, 'timestamp': datetime.now()}
+
+    async def close(self):
+        pass
+
+
+def stored_results(company: str, age: timedelta) -> dict:
+    return {'company': company, 'timestamp': datetime.now() - age}
+
+
+def serve(service: CompetitorService, scenario):
+    async def run():
+        async with TestClient(TestServer(service.app())) as client:
+            return await scenario(client)
+    return asyncio.run(run())
+
+
+async def until(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Условие не выполнилось")
+
+
+def test_concurrent_requests_share_one_analysis():
+    agent = FakeAgent()
+    service = CompetitorService({}, agent)
+    sources = []
+    analysis = service._analysis
+
+    def tracked(slug, company_name):
+        task, source = analysis(slug, company_name)
+        sources.append(source)
+        return task, source
+
+    service._analysis = tracked
+
+    async def scenario(client):
+        requests = [
+            asyncio.create_task(client.post('/companies/Acme/analyze')) for _ in range(2)
+        ]
+        await until(lambda: len(sources) == 2)
+        agent.release.set()
+        responses = await asyncio.gather(*requests)
+        return [(r.status, r.headers['X-Cache'], await r.json()) for r in responses]
+
+    responses = serve(service, scenario)
+
+    assert agent.calls == ['Acme']
+    assert sorted(source for _, source, _ in responses) == ['coalesced', 'miss']
+    assert all(status == 200 for status, _, _ in responses)
+    assert responses[0][2] == responses[1][2]
+
+
+def test_full_queue_rejected_with_retry_after():
+    agent = FakeAgent()
+    service = CompetitorService({'max_concurrent': 1, 'max_pending': 0}, agent)
+
+    async def scenario(client):
+        running = asyncio.create_task(client.post('/companies/Acme/analyze'))
+        await until(lambda: agent.calls == ['Acme'])
+        rejected = await client.post('/companies/Beta/analyze')
+        agent.release.set()
+        return rejected.status, rejected.headers.get('Retry-After'), (await running).status
+
+    status, retry_after, running_status = serve(service, scenario)
+
+    assert status == 503
+    assert retry_after == str(int(INITIAL_DURATION))
+    assert running_status == 200
+    assert agent.calls == ['Acme']
+
+
+def test_full_queue_serves_stale_results():
+    agent = FakeAgent([stored_results('Beta', timedelta(days=2))])
+    service = CompetitorService({'max_concurrent': 1, 'max_pending': 0}, agent)
+
+    async def scenario(client):
+        running = asyncio.create_task(client.post('/companies/Acme/analyze'))
+        await until(lambda: agent.calls == ['Acme'])
+        stale = await client.post('/companies/Beta/analyze')
+        agent.release.set()
+        await running
+        return stale.status, stale.headers['X-Cache'], await stale.json()
+
+    status, source, body = serve(service, scenario)
+
+    assert status == 200
+    assert source == 'stale'
+    assert body['company'] == 'Beta'
+    assert agent.calls == ['Acme']
+
+
+def test_fresh_results_served_from_cache():
+    agent = FakeAgent([stored_results('Acme', timedelta(minutes=5))])
+    agent.release.set()
+    service = CompetitorService({'freshness_hours': 24}, agent)
+
+    async def scenario(client):
+        hit = await client.post('/companies/Acme/analyze')
+        narrow = await client.post('/companies/Acme/analyze', params={'max_age': '60'})
+        again = await client.post('/companies/Acme/analyze')
+        return [response.headers['X-Cache'] for response in (hit, narrow, again)]
+
+    assert serve(service, scenario) == ['hit', 'miss', 'hit']
+    assert agent.calls == ['Acme']
@@ -0,0 +1,186 @@
+"""Адаптеры соцсетей и скрапер на подставном HTTP-клиенте"""
+
+import asyncio
+import json
+import threading
+from urllib.parse import urlencode
+
+import pytest
+
+from scrapers.http_client import HttpResponse
+from scrapers.social_platforms import (
+    InstagramAdapter, LinkedInAdapter, MockPlatformAdapter, PlatformAdapter, create_adapter
+)
+from scrapers.social_scraper import SocialScraper
+from storage.social_history import SocialHistoryStore
+
+
+class FakeClient:
+    """Ответы по пути запроса; запросы сохраняются для проверок"""
+
+    def __init__(self, routes: dict):
+        self.routes = routes
+        self.requests = []
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append((url, params or {}))
+        path = url.split('://', 1)[1].split('/', 1)[1]
+        body = json.dumps(self.routes.get(path, {})).encode('utf-8')
+        return HttpResponse(status=200, url=f"{url}?{urlencode(params or {})}", body=body)
+
+    async def close(self):
+        pass
+
+
+def test_linkedin_vanity_name_resolved_once():
+    client = FakeClient({
+        'rest/organizations': {'elements': [{'id': 1337}]},
+        'rest/networkSizes/urn:li:organization:1337': {'firstDegreeSize': 4200},
+        'rest/posts': {'elements': [], 'paging': {'total': 0}}
+    })
+    adapter = LinkedInAdapter({'access_token': 'token'})
+    adapter.set_handle('Acme', 'acme-corp')
+
+    async def scenario():
+        profile = await adapter.fetch_profile(client, 'Acme')
+        posts, _ = await adapter.fetch_page(client, 'Acme', None, 10)
+        return profile, posts
+
+    profile, posts = asyncio.run(scenario())
+
+    assert profile['followers'] == 4200
+    lookups = [params for url, params in client.requests if url.endswith('/organizations')]
+    assert lookups == [{'q': 'vanityName', 'vanityName': 'acme-corp'}]
+    assert client.requests[-1][1]['author'] == 'urn:li:organization:1337'
+
+
+def test_linkedin_numeric_id_used_as_is():
+    client = FakeClient({'rest/networkSizes/urn:li:organization:42': {'firstDegreeSize': 7}})
+    adapter = LinkedInAdapter({'access_token': 'token', 'handle': '42'})
+
+    profile = asyncio.run(adapter.fetch_profile(client, 'Acme'))
+
+    assert profile['followers'] == 7
+    assert len(client.requests) == 1
+
+
+def test_instagram_username_from_website_not_used_as_account_id():
+    client = FakeClient({'v18.0/17841400000000000': {'followers_count': 900}})
+    scraper = SocialScraper(
+        {'platforms': ['instagram'], 'instagram': {'access_token': 'token', 'handle': '17841400000000000'}},
+        http=client
+    )
+    assert isinstance(scraper.adapters['instagram'], InstagramAdapter)
+
+    social_data = asyncio.run(scraper.scrape_social_profiles('Acme', {'instagram': 'acme'}))
+
+    assert social_data['platforms']['instagram']['followers'] == 900
+    assert social_data['platforms']['instagram']['handle_source'] == 'guess'
+    assert client.requests[0][0].endswith('/17841400000000000')
+
+
+def test_history_updated_off_event_loop(tmp_path):
+    history = SocialHistoryStore({'path': str(tmp_path / 'social.db')})
+    threads = []
+    for method in ('cursor', 'add_posts', 'recent_posts', 'statistics'):
+        original = getattr(history, method)
+
+        def tracked(*args, original=original):
+            threads.append(threading.current_thread())
+            return original(*args)
+
+        setattr(history, method, tracked)
+
+    scraper = SocialScraper(
+        {'platforms': ['twitter', 'linkedin'], 'max_posts': 10}, history, FakeClient({})
+    )
+    first = asyncio.run(scraper.scrape_social_profiles('Acme'))
+    second = asyncio.run(scraper.scrape_social_profiles('Acme'))
+    history.close()
+
+    assert threads and threading.main_thread() not in threads
+    assert first['platforms']['twitter']['new_posts'] == 10
+    assert second['platforms']['twitter']['new_posts'] == 0
+    assert second['platforms']['linkedin']['history_posts'] == 10
+
+
+def collect(adapter: PlatformAdapter, limit: int, since: dict = None) -> list:
+    async def run():
+        return [post async for post in adapter.iter_posts(None, 'Acme', limit, since)]
+    return asyncio.run(run())
+
+
+def test_adapter_requires_platform_methods():
+    with pytest.raises(TypeError):
+        PlatformAdapter({})
+
+
+def test_adapter_without_credentials_is_mock():
+    assert isinstance(create_adapter('twitter', {}), MockPlatformAdapter)
+    assert isinstance(create_adapter('linkedin', {'access_token': 'token'}), LinkedInAdapter)
+
+
+def test_iter_posts_stops_exactly_at_limit():
+    adapter = MockPlatformAdapter({'page_size': 20, 'mock_posts': 89}, name='twitter')
+
+    posts = collect(adapter, 50)
+
+    assert [post['id'] for post in posts] == [f'twitter-{index}' for index in range(50)]
+    # 20 + 20 + 10: последняя страница запрашивается только на остаток лимита
+    assert adapter.requests_made == 3
+
+
+def test_iter_posts_ends_with_last_page():
+    adapter = MockPlatformAdapter({'page_size': 20, 'mock_posts': 89}, name='twitter')
+
+    posts = collect(adapter, 500)
+
+    assert len(posts) == 89
+    assert adapter.requests_made == 5
+
+
+def test_iter_posts_stops_at_known_post():
+    adapter = MockPlatformAdapter({'page_size': 20}, name='twitter')
+
+    posts = collect(adapter, 50, {'since_id': 'twitter-25', 'last_date': None})
+
+    assert len(posts) == 25
+    assert adapter.requests_made == 2
+
+
+def test_mock_posts_independent_of_page_size():
+    small = collect(MockPlatformAdapter({'page_size': 5}, name='twitter'), 40)
+    large = collect(MockPlatformAdapter({'page_size': 40}, name='twitter'), 40)
+
+    def engagement(posts):
+        return [(post['likes'], post['comments'], post['shares']) for post in posts]
+
+    assert engagement(small) == engagement(large)
+    # Страницы не повторяют друг друга
+    assert engagement(small[:5]) != engagement(small[5:10])
+
+
+def test_platforms_scraped_concurrently():
+    platforms = ['twitter', 'linkedin', 'facebook']
+    started = []
+
+    class BarrierMock(MockPlatformAdapter):
+        """Профиль отдается, только когда запросы начаты на всех платформах"""
+
+        async def fetch_profile(self, client, company_name):
+            started.append(self.name)
+            while len(started) < len(platforms):
+                await asyncio.sleep(0.01)
+            return await super().fetch_profile(client, company_name)
+
+    scraper = SocialScraper({'platforms': platforms, 'max_posts': 30}, http=FakeClient({}))
+    scraper.adapters = {platform: BarrierMock({'page_size': 20}, name=platform) for platform in platforms}
+
+    social_data = asyncio.run(asyncio.wait_for(scraper.scrape_social_profiles('Acme'), 5))
+
+    assert set(social_data['platforms']) == set(platforms)
+    assert all(len(data['recent_posts']) == 30 for data in social_data['platforms'].values())
+    assert social_data['summary']['total_followers'] == sum(
+        data['followers'] for data in social_data['platforms'].values()
+    )
+    assert social_data['summary']['total_posts'] == 90
@@ -0,0 +1,43 @@
+"""Бюджет времени импорта агента: тяжелые бэкенды не должны загружаться при старте"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Импорт агента на типичной машине занимает десятки миллисекунд; запас на медленные CI
+IMPORT_BUDGET_SECONDS = 0.5
+
+# Модули, которые не должны загружаться при импорте агента
+HEAVY_MODULES = ['openai', 'selenium', 'pandas', 'numpy', 'aiohttp', 'bs4', 'pyarrow', 'matplotlib']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import agents.competitor_agent
+elapsed = time.perf_counter() - start
+loaded = [
+    name for name in %r
+    if name in sys.modules and type(sys.modules[name]).__name__ != '_LazyModule'
+]
+print(json.dumps({'elapsed': elapsed, 'loaded': loaded}))
+""" % HEAVY_MODULES
+
+
+def _probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_agent_import_does_not_load_heavy_backends():
+    assert _probe()['loaded'] == []
+
+
+def test_agent_import_within_budget():
+    # Лучший из нескольких запусков, чтобы не зависеть от холодного кеша файловой системы
+    elapsed = min(_probe()['elapsed'] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SECONDS, f"Импорт агента занял {elapsed:.3f} с"
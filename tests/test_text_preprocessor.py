@@ -0,0 +1,53 @@
+"""Очистка текста и пометка страниц-дубликатов между запусками"""
+
+from analyzers.similarity_index import MinHashLSHIndex
+from analyzers.text_preprocessor import TextPreprocessor
+
+
+NEWS = (
+    'Отраслевые новости недели: рынок облачных сервисов вырос на двенадцать процентов, '
+    'крупные игроки объявили о новых дата-центрах в регионах и снижении цен на хранение'
+)
+
+
+def website_data(company: str) -> dict:
+    return {
+        'company': company,
+        'main_page': {'text_blocks': [f'{company} - платформа для команд продаж и маркетинга']},
+        'additional_pages': {'news_page': {'text_blocks': [NEWS]}}
+    }
+
+
+def run(config: dict) -> dict:
+    """Один запуск: индекс загружается с диска, страницы обеих компаний готовятся по очереди"""
+
+    index = MinHashLSHIndex.load(config)
+    preprocessor = TextPreprocessor(config, index)
+    pages = {}
+    for company in ('A', 'B'):
+        data = website_data(company)
+        preprocessor.prepare(data, company)
+        pages[company] = data['additional_pages']['news_page'].get('duplicate_of')
+    index.save()
+    return pages
+
+
+def test_shared_page_stays_canonical_across_runs(tmp_path):
+    config = {'similarity_index_path': str(tmp_path / 'index.pkl')}
+
+    first = run(config)
+    second = run(config)
+
+    assert first == {'A': None, 'B': 'A:news_page'}
+    assert second == first
+
+
+def test_copy_is_not_indexed():
+    index = MinHashLSHIndex({})
+
+    assert index.add_canonical('A:news_page', NEWS, 'A') == []
+    duplicates = index.add_canonical('B:news_page', NEWS, 'B')
+
+    assert [doc_id for doc_id, _ in duplicates] == ['A:news_page']
+    assert len(index) == 1
+    assert index.most_similar_companies('B') == []
@@ -0,0 +1,66 @@
+"""Разбор ссылок: регистрируемый домен и классификация ссылок соцсетей"""
+
+import pytest
+
+from scrapers.url_utils import (
+    classify_link, host_category, normalize_host, parse_url, registered_domain, social_platform
+)
+
+
+@pytest.mark.parametrize('host, domain', [
+    ('example.com', 'example.com'),
+    ('shop.example.com', 'example.com'),
+    ('a.b.example.com', 'example.com'),
+    ('example.co.uk', 'example.co.uk'),
+    ('shop.example.co.uk', 'example.co.uk'),
+    ('blog.shop.example.com.au', 'example.com.au'),
+    ('company.msk.ru', 'company.msk.ru'),
+    ('localhost', 'localhost'),
+    ('[::1]', '[::1]')
+])
+def test_registered_domain(host, domain):
+    assert registered_domain(host) == domain
+
+
+def test_host_normalized_before_domain():
+    assert normalize_host('user:pass@WWW.Example.CO.UK:8443') == 'example.co.uk'
+    assert normalize_host('example.com.') == 'example.com'
+
+    parsed = parse_url('//www.shop.example.co.uk/pricing?plan=team')
+    assert parsed == ('https', 'shop.example.co.uk', 'example.co.uk', '/pricing', 'plan=team')
+    assert parse_url('/about').is_absolute is False
+
+
+@pytest.mark.parametrize('url, platform', [
+    ('https://twitter.com/acme', 'twitter'),
+    ('https://www.x.com/acme', 'twitter'),
+    ('https://mobile.twitter.com/acme', 'twitter'),
+    ('https://uk.linkedin.com/company/acme', 'linkedin'),
+    ('https://m.facebook.com/acme', 'facebook'),
+    ('https://www.instagram.com/acme/', 'instagram'),
+    ('https://youtu.be/abc', 'youtube'),
+    ('https://github.com/acme', 'github'),
+    # Совпадение подстроки не делает ссылку ссылкой на соцсеть
+    ('https://twitter.com.example.com/acme', None),
+    ('https://notfacebook.com/acme', None),
+    ('https://example.com/twitter.com', None)
+])
+def test_social_platform(url, platform):
+    assert social_platform(url) == platform
+
+
+def test_classify_link_relative_to_site():
+    site = parse_url('https://www.acme.co.uk/').domain
+
+    assert classify_link('/pricing', site) == ('internal', None)
+    assert classify_link('https://blog.acme.co.uk/post', site) == ('internal', None)
+    assert classify_link('https://other.co.uk/', site) == ('external', None)
+    assert classify_link('https://www.linkedin.com/company/acme', site) == ('social', 'linkedin')
+    assert classify_link('mailto:sales@acme.co.uk', site) == ('other', None)
+    assert classify_link('tel:+440000000', site) == ('other', None)
+
+
+def test_host_category():
+    assert host_category('https://en.wikipedia.org/wiki/Acme') == 'aggregator'
+    assert host_category('https://www.facebook.com/acme') == 'social'
+    assert host_category('https://acme.com/') is None
@@ -0,0 +1,67 @@
+"""Скрапер сайтов: выбор дополнительных страниц и оценка качества"""
+
+import asyncio
+
+from reports.charts import build_chart_specs
+from scrapers.enhanced_website_scraper import EnhancedWebsiteScraper
+
+
+SITE = 'https://acme.example/'
+
+LINKS = [
+    (f'{SITE}pricing', 'Тарифы'),
+    (f'{SITE}about', 'О нас'),
+    (f'{SITE}customers', 'Клиенты'),
+    (f'{SITE}blog', 'Блог')
+]
+
+
+def scrape_additional_pages(config: dict, links: list, navigation: list):
+    scraper = EnhancedWebsiteScraper(config)
+    fetched = []
+
+    async def scrape_page(url, page_type):
+        fetched.append(url)
+        return {'url': url}
+
+    scraper._scrape_page = scrape_page
+    scraper._link_candidates[SITE] = (links, navigation)
+    pages = asyncio.run(scraper._scrape_additional_pages(SITE))
+    return pages, fetched
+
+
+def test_small_budget_fetches_most_valuable_pages():
+    # Блог первым пунктом меню ценнее страниц "о компании" и клиентов
+    pages, fetched = scrape_additional_pages({'max_pages': 3}, LINKS, ['Блог'])
+
+    assert set(pages) == {'pricing_page', 'blog_page'}
+    assert fetched == [f'{SITE}pricing', f'{SITE}blog']
+
+
+def test_full_budget_fetches_every_required_type():
+    pages, fetched = scrape_additional_pages({'max_pages': 10}, LINKS, [])
+
+    assert set(pages) == {'pricing_page', 'about_page', 'customers_page', 'blog_page'}
+    assert len(fetched) == 4
+
+
+def test_pages_without_links_are_not_guessed():
+    pages, fetched = scrape_additional_pages({'max_pages': 10}, LINKS[1:], [])
+
+    assert 'pricing_page' not in pages
+    assert f'{SITE}pricing' not in fetched
+    assert len(fetched) == 3
+
+
+def test_quality_chart_matches_site_score():
+    main_page = {'title': 'Acme', 'h1_tags': ['Acme'], 'call_to_actions': [{'text': 'Купить'}]}
+    additional_pages = {'pricing_page': {'url': f'{SITE}pricing'}}
+    technical = {'https_enabled': True, 'load_time': 5.0}
+    summary = EnhancedWebsiteScraper({})._generate_summary(main_page, additional_pages, technical)
+
+    specs = build_chart_specs({'website_data': {
+        'main_page': main_page, 'additional_pages': additional_pages, 'technical': technical
+    }})
+
+    assert summary['site_quality_score'] == 55
+    assert sum(specs['quality_breakdown']['values']) == summary['site_quality_score']
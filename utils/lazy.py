@@ -0,0 +1,59 @@
+"""Отложенный импорт тяжелых зависимостей до первого обращения к модулю"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+class MissingModule(ModuleType):
+    """Заглушка неустановленного модуля: ошибка импорта возникает при первом использовании"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__missing_name__ = name
+
+    def __getattr__(self, attribute: str):
+        if attribute.startswith('__'):
+            raise AttributeError(attribute)
+        raise ImportError(
+            f"Модуль {self.__missing_name__} не установлен (pip install -r requirements.txt)"
+        )
+
+    def __bool__(self) -> bool:
+        return False
+
+
+def module_available(name: str) -> bool:
+    """Установлен ли модуль (без его импорта)"""
+
+    if name in sys.modules:
+        return not isinstance(sys.modules[name], MissingModule)
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Модуль, который загружается при первом обращении к его атрибутам
+
+    Используется для тяжелых библиотек (aiohttp, numpy, pandas, bs4), чтобы импорт
+    агента и запуск CLI не платили за бэкенды, которые в этом запуске не понадобятся.
+    """
+
+    if name in sys.modules:
+        return sys.modules[name]
+
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None:
+        return MissingModule(name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module